@@ -13,13 +13,26 @@ High-level flow
    (OpenAI by default, Groq supported) and *binds* the available tools so the model can
    reference them with function-calling syntax.
 2. **Agent node** – `agent_function` is executed first. It provides the system prompt plus
-   the running conversation to the LLM.  If the LLM decides that a tool call is needed it
-   returns the corresponding JSON payload.
-3. **Tool node** – LangGraph’s built-in `ToolNode` inspects the LLM output, calls the
-   appropriate Python callable (our tool), and feeds the result back to the agent node.
+   the running conversation to the LLM (older tool outputs are trimmed to
+   `agent.history.token_budget`, see `utils/message_window.py`) and returns only the new
+   assistant message – `MessagesState`'s `add_messages` reducer appends it.  If the LLM decides that a tool call is needed it
+   returns the corresponding JSON payload.  The prompt keeps a fixed, cache-friendly layout –
+   system prompt, tool schemas in name order, then the conversation – so providers can serve
+   the repeated prefix from their prompt cache (see `utils/prompt_prefix.py`).  `aagent_function` is the async twin used when
+   the graph is driven with `ainvoke`/`astream`, so the event loop is never blocked.
+3. **Tool node** – `ParallelToolNode` (see `agent/tool_executor.py`) inspects the LLM
+   output, runs every requested tool call concurrently under per-provider limits, and
+   feeds the results back to the agent node in the original call order.
 4. **Conditional edges** – `tools_condition` routes execution either through the tool node
    (when a tool is requested) or directly to the `END` node when no further tool calls are
    required.
+5. **Multi-destination planner** – questions naming several destinations ("10 days across
+   Rome, Florence and Venice", see `utils/response_cache.py::extract_legs`) bypass the
+   single agent loop.  `route_request` fans them out with `Send` to one `plan_leg` task per
+   leg; each runs the agent ⇄ tools loop above as its own subgraph, concurrently, under the
+   process-wide `agent.planner.max_concurrent_legs` budget.  The `merge` node then writes the
+   combined itinerary (day numbering, transfers between legs, one combined budget) with
+   `MERGE_PROMPT`.  Wall-clock time follows the slowest leg, not the number of cities.
 
 Customization guide
 ===================
@@ -32,7 +45,11 @@ Customization guide
 • **Changing the system prompt** – Edit `prompt_library/prompts.py::SYSTEM_PROMPT`.
 
 • **Changing the model provider or model name** – Pass `model_provider="groq"` (or
-  another provider) when instantiating `GraphBuilder` **or** edit `config/config.yaml`.
+  another `llm` entry) when instantiating `GraphBuilder` **or** edit `config/config.yaml`.
+  With `model_provider="router"` (`utils/llm_router.py`) each call goes to the fastest
+  healthy provider and fails over on timeouts / 429s; the `agent`, `plan_leg` and `merge`
+  nodes can each be given their own candidate models under `llm.router.nodes`, and
+  within a loop the tool-routing and answering turns can use different ones (`turns`).
 
 • **Modifying the graph topology** – Adjust `build_graph()` to add more nodes (memory,
   retrieval, etc.) or change the conditional logic.
@@ -41,23 +58,68 @@ Keeping these customization hooks in mind you can fork this repository, swap out
 re-write the prompt, and instantly spin up a bespoke "master agent" tailored to your own
 workflow.
 """
+import operator
+import time
+from contextlib import contextmanager
+from functools import partial
+from typing import Annotated, List
+
 from utils.model_loader import ModelLoader
+from utils.llm_router import LLMRouter
 
-from prompt_library.prompts import SYSTEM_PROMPT
+from prompt_library.prompts import MERGE_PROMPT, SYSTEM_PROMPT
 from langgraph.graph import StateGraph, MessagesState ,START, END
-from langgraph.prebuilt import ToolNode, tools_condition
+from langgraph.prebuilt import tools_condition
+from langgraph.types import Send
+from langchain_core.messages import HumanMessage
+from langchain_core.runnables import RunnableLambda
+from agent.tool_executor import ParallelToolNode
+from utils.concurrency import ProviderLimiter
+from utils.config_loader import load_config
+from utils.message_window import compact_messages
+from utils.prompt_prefix import sort_tools, static_prefix
+from utils.response_cache import extract_legs
+from logger.logging import get_logger, preview
+from utils.metrics import AGENT_TURN_LATENCY, LLM_PROMPT_CACHE_TOKENS, LLM_TOKENS, UPSTREAM_ERRORS
+from utils.tracing import cached_input_tokens, record_usage, span
 from tools.weather_info_tool import WeatherInfoTool
 from tools.place_search_tool import PlaceSearchTool
 from tools.expense_calculator_tool import CalculatorTool
 from tools.currency_conversion_tool import CurrencyConverterTool
 
+logger = get_logger(__name__)
+
+# Tag carried by every run inside a leg subgraph, so streaming clients can tell
+# the parallel leg research apart from the merged answer
+LEG_TAG = "planner_leg"
+# Tools the merge step may call (transfers between legs, combined budget)
+MERGE_TOOLS = ("search_transportation", "calculate_trip_budget")
+
+# Process-wide budget of leg subgraphs running at once, shared by all requests
+leg_limiter = ProviderLimiter(
+    {"planner_legs": load_config().get("agent", {}).get("planner", {}).get("max_concurrent_legs", 4)}
+)
+
+
+class PlannerState(MessagesState):
+    # One entry per finished leg; `operator.add` merges the parallel leg updates
+    leg_plans: Annotated[list, operator.add]
+
+
+def _text(content) -> str:
+    if isinstance(content, list):
+        return "".join(block.get("text", "") if isinstance(block, dict) else str(block) for block in content)
+    return str(content)
 
 
 class GraphBuilder:
 
-    def __init__(self,model_provider: str = "openai"):
-        self.model_loader = ModelLoader(model_provider=model_provider)
-        self.llm = self.model_loader.load_llm()
+    def __init__(self,model_provider: str = "openai", llm=None, model_name=None):
+        self.model_loader = ModelLoader(model_provider=model_provider, model_name=model_name)
+        # An injected chat model (e.g. the benchmarks' scripted fake) skips provider loading
+        self.llm = llm if llm is not None else self.model_loader.load_llm()
+        self.model_provider = model_provider
+        self.model_name = getattr(self.llm, "model_name", None) or getattr(self.llm, "model", model_provider)
         
         self.tools = [
 
@@ -75,58 +137,275 @@ class GraphBuilder:
                            * self.place_search_tools.place_search_tool_list,
                            * self.calculator_tools.calculator_tool_list,
                            * self.currency_converter_tools.currency_converter_tool_list])
+        # Name order keeps the bound schemas – part of the cached prompt prefix – stable
+        self.tools = sort_tools(self.tools)
         
-        self.llm_with_tools = self.llm.bind_tools(tools=self.tools)
+        self.llm_with_tools = self._node_llm("agent").bind_tools(tools=self.tools)
         
         self.graph = None
         
         self.system_prompt = SYSTEM_PROMPT
+        self.static_prefix = static_prefix(self.system_prompt, self.tools)
+        logger.info("Static prompt prefix: %d tokens (prompt-cache eligible: %s)",
+                    self.static_prefix.tokens, self.static_prefix.cacheable)
+
+        history_config = load_config().get("agent", {}).get("history", {})
+        self.history_token_budget = history_config.get("token_budget")
+        self.history_preview_chars = history_config.get("preview_chars", 400)
+
+        planner_config = load_config().get("agent", {}).get("planner", {})
+        self.planner_enabled = planner_config.get("enabled", True)
+        self.max_legs = planner_config.get("max_legs", 6)
+        self.leg_graph = None
+        self.merge_graph = None
+
+    def _node_llm(self, node: str):
+        """The chat model for graph node `node` (the router's per-node view, if routing)."""
+        return self.llm.for_node(node) if isinstance(self.llm, LLMRouter) else self.llm
+
+    def _input_messages(self, state: MessagesState, system_prompt=None) -> list:
+        """System prompt followed by the (compacted) conversation for the LLM call.
 
-    def agent_function(self, state: MessagesState):
+        The bound tool schemas travel between the two, so the prefix shared by
+        every turn (system prompt, tools) never changes and the conversation
+        only grows at the end – the layout provider-side prompt caching needs.
+        """
+        messages = state["messages"] if "messages" in state else []
+        if self.history_token_budget:
+            messages = compact_messages(messages, self.history_token_budget, self.history_preview_chars)
+        return [system_prompt or self.system_prompt, *messages]
+
+    def _served_by(self, assistant_response) -> str:
+        """Metrics label of the model that answered: the routed provider behind a router."""
+        metadata = getattr(assistant_response, "response_metadata", None) or {}
+        return metadata.get("router_provider") or self.model_name
+
+    def _annotate(self, turn: dict, assistant_response) -> None:
+        """Attach token usage and requested tool calls to the `llm` span and metrics."""
+        model = turn["model"] = self._served_by(assistant_response)
+        usage = getattr(assistant_response, "usage_metadata", None)
+        record_usage(usage)
+        if usage:
+            LLM_TOKENS.inc(model, "input", amount=usage.get("input_tokens", 0))
+            LLM_TOKENS.inc(model, "output", amount=usage.get("output_tokens", 0))
+            cached = cached_input_tokens(usage)
+            LLM_PROMPT_CACHE_TOKENS.inc(model, "cached", amount=cached)
+            LLM_PROMPT_CACHE_TOKENS.inc(model, "uncached", amount=max(0, usage.get("input_tokens", 0) - cached))
+        tool_calls = getattr(assistant_response, "tool_calls", None) or []
+        turn["span"].set_attribute("llm.tool_calls", [call["name"] for call in tool_calls])
+
+    @contextmanager
+    def _llm_turn(self, input_messages: list, prefix=None):
+        """Span, latency histogram and error counter around one LLM call.
+
+        Yields the turn (`span`, `model`); `_annotate` replaces `model` with the
+        provider that served the call, which then labels the latency.
+        """
+        attributes = {"llm.input_messages": len(input_messages), "llm.model": self.model_name,
+                      "llm.static_prefix_tokens": (prefix or self.static_prefix).tokens}
+        with span("llm", **attributes) as llm_span:
+            turn = {"span": llm_span, "model": self.model_name}
+            started = time.perf_counter()
+            try:
+                yield turn
+            except Exception:
+                UPSTREAM_ERRORS.inc(self.model_provider, "exception")
+                raise
+            finally:
+                AGENT_TURN_LATENCY.observe(time.perf_counter() - started, turn["model"])
+
+    def agent_function(self, state: MessagesState, llm_with_tools=None, system_prompt=None, prefix=None):
         """Main agent function for LangGraph.
 
         Parameters
         ----------
         state : MessagesState
             The current graph state which must contain a key ``"messages"``.
+        llm_with_tools, system_prompt, prefix : optional
+            Override the bound model, system prompt and its `StaticPrefix`
+            (used by the merge step of the multi-destination planner).
 
         Returns
         -------
         dict
-            Updated state dict with the latest assistant response appended to the
-            "messages" list so that downstream nodes can continue the
-            conversation.
+            State update holding only the new assistant response; the
+            ``add_messages`` reducer appends it to "messages" so downstream
+            nodes can continue the conversation.
         """
-        # Extract prior messages from the state
-        user_messages = state["messages"] if "messages" in state else []
-
         # Pre-pend the system prompt so the model has the right context
-        input_messages = [self.system_prompt] + user_messages
-        print("[GraphBuilder] Invoking LLM with messages:", input_messages)
+        input_messages = self._input_messages(state, system_prompt)
+        logger.debug("Invoking LLM with %d messages, last: %s", len(input_messages), preview(input_messages[-1].content))
 
         # Call the LLM (already bound with tools) to get the next response
-        assistant_response = self.llm_with_tools.invoke(input_messages)
-        print("[GraphBuilder] Assistant response:", assistant_response)
+        with self._llm_turn(input_messages, prefix) as turn:
+            assistant_response = (llm_with_tools or self.llm_with_tools).invoke(input_messages)
+            self._annotate(turn, assistant_response)
+        logger.debug("Assistant response: %s (tool calls: %s)", preview(assistant_response.content),
+                     [call["name"] for call in getattr(assistant_response, "tool_calls", None) or []])
 
-        # Return the updated state – LangGraph expects a mapping
-        return {"messages": user_messages + [assistant_response]}
+        # Return only the delta – the reducer merges it into the history
+        return {"messages": [assistant_response]}
 
-    def build_graph(self):
-        """Construct the LangGraph with the agent and tool nodes."""
+    async def aagent_function(self, state: MessagesState, llm_with_tools=None, system_prompt=None, prefix=None):
+        """Async variant of `agent_function` awaiting the LLM via ``ainvoke``."""
+        input_messages = self._input_messages(state, system_prompt)
+        logger.debug("Invoking LLM with %d messages, last: %s", len(input_messages), preview(input_messages[-1].content))
 
-        graph_builder = StateGraph(MessagesState)
+        with self._llm_turn(input_messages, prefix) as turn:
+            assistant_response = await (llm_with_tools or self.llm_with_tools).ainvoke(input_messages)
+            self._annotate(turn, assistant_response)
+        logger.debug("Assistant response: %s (tool calls: %s)", preview(assistant_response.content),
+                     [call["name"] for call in getattr(assistant_response, "tool_calls", None) or []])
 
-        # Add nodes – an agent node and a generic tool node that LangGraph
-        # understands will execute any tool returned by the agent.
-        graph_builder.add_node("agent", self.agent_function)
-        graph_builder.add_node("tools", ToolNode(tools=self.tools))
+        return {"messages": [assistant_response]}
+
+    @staticmethod
+    def _question(state) -> str:
+        """Text of the user's request (the latest human message)."""
+        messages = state["messages"] if "messages" in state else []
+        human = [message for message in messages if isinstance(message, HumanMessage)]
+        return _text(human[-1].content) if human else ""
+
+    @staticmethod
+    def _schedule(legs) -> List[dict]:
+        """Legs with consecutive day ranges (when every leg's length is known)."""
+        schedule, first_day = [], 1
+        timed = all(leg.days for leg in legs)
+        for leg in legs:
+            entry = {"destination": leg.destination.title(), "days": leg.days, "first_day": None, "last_day": None}
+            if timed:
+                entry["first_day"], entry["last_day"] = first_day, first_day + leg.days - 1
+                first_day += leg.days
+            schedule.append(entry)
+        return schedule
+
+    def route_request(self, state: PlannerState):
+        """Send multi-destination requests to one `plan_leg` task per leg, everything else to the agent."""
+        question = self._question(state)
+        legs = extract_legs(question)
+        if not 2 <= len(legs) <= self.max_legs:
+            return "agent"
+        schedule = self._schedule(legs)
+        logger.info("Planning %d legs in parallel: %s", len(schedule), [leg["destination"] for leg in schedule])
+        return [Send("plan_leg", {"question": question, "legs": schedule, "index": index})
+                for index in range(len(schedule))]
+
+    @staticmethod
+    def _leg_request(task: dict) -> HumanMessage:
+        legs, index = task["legs"], task["index"]
+        leg = legs[index]
+        length = f"{leg['days']} days" if leg["days"] else "a few days"
+        when = f" (days {leg['first_day']}-{leg['last_day']} of the trip)" if leg["first_day"] else ""
+        lines = [
+            task["question"],
+            "",
+            f"You are planning leg {index + 1} of {len(legs)} of this trip: {length} in {leg['destination']}{when}.",
+            f"Plan only {leg['destination']}: day-by-day itinerary, hotels, attractions, restaurants, activities, "
+            "weather and local transport, with a cost sheet for this leg.",
+        ]
+        if index > 0:
+            lines.append(f"Also find how to get to {leg['destination']} from {legs[index - 1]['destination']}.")
+        lines.append("Leave out the other cities and the budget of the whole trip.")
+        return HumanMessage(content="\n".join(lines))
+
+    @staticmethod
+    def _leg_plan(task: dict, result) -> dict:
+        return {**task["legs"][task["index"]], "index": task["index"], "plan": _text(result["messages"][-1].content)}
+
+    def plan_leg(self, task: dict):
+        """Run the single-destination agent for one leg under the global leg budget."""
+        destination = task["legs"][task["index"]]["destination"]
+        with leg_limiter.limit("planner_legs"), span("planner.leg", **{"planner.destination": destination}):
+            result = self.leg_graph.invoke({"messages": [self._leg_request(task)]}, config={"tags": [LEG_TAG]})
+        return {"leg_plans": [self._leg_plan(task, result)]}
+
+    async def aplan_leg(self, task: dict):
+        """Async variant of `plan_leg`."""
+        destination = task["legs"][task["index"]]["destination"]
+        async with leg_limiter.alimit("planner_legs"):
+            with span("planner.leg", **{"planner.destination": destination}):
+                result = await self.leg_graph.ainvoke({"messages": [self._leg_request(task)]},
+                                                      config={"tags": [LEG_TAG]})
+        return {"leg_plans": [self._leg_plan(task, result)]}
+
+    def _merge_request(self, state: PlannerState) -> HumanMessage:
+        plans = sorted(state["leg_plans"], key=lambda plan: plan["index"])
+        lines = [f"Request: {self._question(state)}", "", "Day schedule:"]
+        for plan in plans:
+            days = f"Days {plan['first_day']}-{plan['last_day']}" if plan["first_day"] else "Leg"
+            lines.append(f"- {days}: {plan['destination']}")
+        for plan in plans:
+            lines.extend(["", f"## Leg {plan['index'] + 1}: {plan['destination']}", plan["plan"]])
+        return HumanMessage(content="\n".join(lines))
+
+    def merge_legs(self, state: PlannerState):
+        """Combine the leg plans into one itinerary with transfers and a combined budget."""
+        with span("planner.merge", **{"planner.legs": len(state["leg_plans"])}):
+            result = self.merge_graph.invoke({"messages": [self._merge_request(state)]})
+        return {"messages": [result["messages"][-1]]}
+
+    async def amerge_legs(self, state: PlannerState):
+        """Async variant of `merge_legs`."""
+        with span("planner.merge", **{"planner.legs": len(state["leg_plans"])}):
+            result = await self.merge_graph.ainvoke({"messages": [self._merge_request(state)]})
+        return {"messages": [result["messages"][-1]]}
+
+    def _add_agent_loop(self, graph_builder: StateGraph, tool_node: ParallelToolNode, llm_with_tools=None,
+                        system_prompt=None, prefix=None) -> StateGraph:
+        """Add the agent ⇄ tools ReAct loop; the agent goes to END once it stops calling tools."""
+        # The agent node carries both implementations so `invoke` and
+        # `ainvoke` each run natively.
+        overrides = {"llm_with_tools": llm_with_tools, "system_prompt": system_prompt, "prefix": prefix}
+        graph_builder.add_node("agent", RunnableLambda(partial(self.agent_function, **overrides),
+                                                       afunc=partial(self.aagent_function, **overrides)))
+        graph_builder.add_node("tools", RunnableLambda(tool_node.run, afunc=tool_node.arun))
 
         # Define execution order and conditional branching based on whether the
         # agent decides to call a tool.
-        graph_builder.add_edge(START, "agent")
         graph_builder.add_conditional_edges("agent", tools_condition)
         graph_builder.add_edge("tools", "agent")
         graph_builder.add_edge("agent", END)
+        return graph_builder
+
+    def build_graph(self):
+        """Construct the LangGraph with the agent and tool nodes.
+
+        With the multi-destination planner enabled, requests naming two or
+        more destinations skip the agent loop: `route_request` fans them out
+        with `Send` to one `plan_leg` task per destination (each running the
+        same agent loop as its own subgraph, concurrently), and `merge`
+        stitches the leg plans into one trip.
+        """
+        graph_builder = StateGraph(PlannerState)
+
+        # Add nodes – an agent node and a generic tool node that LangGraph
+        # understands will execute any tool returned by the agent.
+        tool_node = ParallelToolNode(
+            tools=self.tools,
+            max_workers=load_config().get("tools", {}).get("max_workers", 16),
+        )
+        self._add_agent_loop(graph_builder, tool_node)
+
+        if self.planner_enabled:
+            leg_builder = self._add_agent_loop(StateGraph(MessagesState), tool_node,
+                                               self._node_llm("plan_leg").bind_tools(tools=self.tools))
+            leg_builder.add_edge(START, "agent")
+            self.leg_graph = leg_builder.compile()
+
+            merge_tools = [tool for tool in self.tools if tool.name in MERGE_TOOLS]
+            merge_builder = self._add_agent_loop(StateGraph(MessagesState), tool_node,
+                                                 self._node_llm("merge").bind_tools(tools=merge_tools), MERGE_PROMPT,
+                                                 static_prefix(MERGE_PROMPT, merge_tools))
+            merge_builder.add_edge(START, "agent")
+            self.merge_graph = merge_builder.compile()
+
+            graph_builder.add_node("plan_leg", RunnableLambda(self.plan_leg, afunc=self.aplan_leg))
+            graph_builder.add_node("merge", RunnableLambda(self.merge_legs, afunc=self.amerge_legs))
+            graph_builder.add_conditional_edges(START, self.route_request, ["agent", "plan_leg"])
+            graph_builder.add_edge("plan_leg", "merge")
+            graph_builder.add_edge("merge", END)
+        else:
+            graph_builder.add_edge(START, "agent")
 
         # Compile the graph which produces a runnable object exposing invoke()
         self.graph = graph_builder.compile()
@@ -0,0 +1,119 @@
+"""
+agent/graph_registry.py
+-----------------------
+Process-wide registry of compiled LangGraph agents.
+
+Building a `GraphBuilder` is expensive: it reads `config/config.yaml`, creates
+a fresh chat-model client, instantiates every tool class, binds the tool
+schemas to the model and compiles the `StateGraph`.  None of that depends on
+the incoming request, so the FastAPI app builds each graph **once** (at
+startup) and hands the same compiled instance to every request.
+
+Compiled LangGraph graphs are stateless between invocations (all run state
+lives in the input / checkpointer), so sharing one instance across threads and
+asyncio tasks is safe.  The registry itself only needs a lock around the
+build / swap step.
+
+Usage
+-----
+```python
+from agent.graph_registry import graph_registry
+
+graph_registry.warm_up(["openai"])          # at startup
+react_app = graph_registry.get("openai")   # per request – cheap dict lookup
+graph_registry.reload()                     # after editing config.yaml
+```
+"""
+import threading
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from agent.agentic_workflow import GraphBuilder
+from utils.config_loader import load_config
+
+RegistryKey = Tuple[str, str]
+
+
+class GraphRegistry:
+    """Thread-safe cache of compiled graphs keyed by ``(provider, model_name)``."""
+
+    def __init__(self, builder_factory: Callable[[str, str], GraphBuilder] = None):
+        self.builder_factory = builder_factory or (
+            lambda provider, model_name: GraphBuilder(model_provider=provider, model_name=model_name))
+        self._lock = threading.RLock()
+        self._config = load_config()
+        self._builders: Dict[RegistryKey, GraphBuilder] = {}
+        self._graphs: Dict[RegistryKey, object] = {}
+
+    def _model_name(self, model_provider: str) -> str:
+        return self._config["llm"][model_provider].get("model_name", model_provider)
+
+    def key_for(self, model_provider: str, model_name: Optional[str] = None) -> RegistryKey:
+        """Resolve the registry key, defaulting the model name from the config."""
+        return (model_provider, model_name or self._model_name(model_provider))
+
+    def _build(self, key: RegistryKey):
+        builder = self.builder_factory(*key)
+        react_app = builder()
+        self._builders[key] = builder
+        self._graphs[key] = react_app
+        return react_app
+
+    def get(self, model_provider: str = "openai", model_name: Optional[str] = None):
+        """Return the shared compiled graph, building it on first use."""
+        key = self.key_for(model_provider, model_name)
+        react_app = self._graphs.get(key)
+        if react_app is not None:
+            return react_app
+        with self._lock:
+            # Another thread may have finished the build while we waited.
+            react_app = self._graphs.get(key)
+            if react_app is None:
+                react_app = self._build(key)
+            return react_app
+
+    def get_builder(self, model_provider: str = "openai", model_name: Optional[str] = None) -> GraphBuilder:
+        """Return the `GraphBuilder` behind a cached graph (building it if needed)."""
+        key = self.key_for(model_provider, model_name)
+        self.get(*key)
+        return self._builders[key]
+
+    def warm_up(self, model_providers: Iterable[str] = ("openai",)) -> List[RegistryKey]:
+        """Eagerly build graphs for the given providers (call from app startup)."""
+        keys = []
+        for provider in model_providers:
+            key = self.key_for(provider)
+            self.get(*key)
+            keys.append(key)
+        return keys
+
+    def reload(self, model_provider: Optional[str] = None) -> List[RegistryKey]:
+        """Re-read the config and rebuild cached graphs without a process restart.
+
+        If `model_provider` is given only that provider's graphs are rebuilt,
+        otherwise every cached graph is.  The new graph is built before the old
+        one is swapped out so in-flight requests keep using a valid instance.
+        """
+        with self._lock:
+            self._config = load_config()
+            stale = [key for key in self._graphs if model_provider in (None, key[0])]
+            providers = sorted({key[0] for key in stale}) or ([model_provider] if model_provider else [])
+            rebuilt = []
+            for provider in providers:
+                key = self.key_for(provider)
+                self._build(key)
+                rebuilt.append(key)
+            for key in stale:
+                if key not in rebuilt:
+                    self._graphs.pop(key, None)
+                    self._builders.pop(key, None)
+            return rebuilt
+
+    def is_warm(self, model_provider: Optional[str] = None) -> bool:
+        """True once at least one graph (for `model_provider`, if given) is compiled."""
+        return any(model_provider in (None, key[0]) for key in self._graphs)
+
+    def keys(self) -> List[RegistryKey]:
+        return list(self._graphs)
+
+
+graph_registry = GraphRegistry()
@@ -0,0 +1,93 @@
+"""
+agent/graph_render.py
+---------------------
+Cached rendering of the agent topology (Mermaid source + PNG).
+
+`draw_mermaid_png()` normally calls out to a remote Mermaid renderer, so it must
+never run on the request path.  `GraphRenderer` renders a compiled graph once,
+stores the result in memory keyed by a hash of its Mermaid source (i.e. of the
+graph *structure*), and reuses it until the topology changes – for instance
+after `graph_registry.reload()` swaps in a graph with different nodes.
+
+When PNG rendering is unavailable (offline host, renderer outage) the entry
+keeps `png=None` and callers fall back to the Mermaid text, which is produced
+locally without any I/O.  The failure is remembered for
+`graph_render.png_retry_seconds` only, so a transient outage does not disable
+the PNG until the next restart.
+"""
+import hashlib
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+from utils.config_loader import load_config
+
+
+@dataclass(frozen=True)
+class RenderedGraph:
+    graph_hash: str
+    mermaid: str
+    png: Optional[bytes] = None
+    png_error: Optional[str] = None
+    failed_at: Optional[float] = None
+
+
+class GraphRenderer:
+    """Render each distinct graph topology at most once per process."""
+
+    def __init__(self, png_retry_seconds: Optional[float] = None):
+        if png_retry_seconds is None:
+            png_retry_seconds = load_config().get("graph_render", {}).get("png_retry_seconds", 300)
+        self.png_retry_seconds = png_retry_seconds
+        self._lock = threading.Lock()
+        self._cache: Dict[str, RenderedGraph] = {}
+
+    @staticmethod
+    def graph_hash(mermaid: str) -> str:
+        return hashlib.sha256(mermaid.encode("utf-8")).hexdigest()[:16]
+
+    def _usable(self, cached: Optional[RenderedGraph], with_png: bool) -> bool:
+        """True if `cached` answers the request without another PNG attempt."""
+        if cached is None:
+            return False
+        if cached.png is not None or not with_png:
+            return True
+        return cached.failed_at is not None and time.monotonic() - cached.failed_at < self.png_retry_seconds
+
+    def render(self, react_app, with_png: bool = True) -> RenderedGraph:
+        """Return the cached rendering for `react_app`, rendering it if needed.
+
+        The Mermaid source is cheap to produce and doubles as the cache key.  The
+        PNG is only attempted when `with_png` is set and the same topology has
+        neither been rendered nor failed within the last `png_retry_seconds`.
+        """
+        drawable = react_app.get_graph()
+        mermaid = drawable.draw_mermaid()
+        key = self.graph_hash(mermaid)
+
+        cached = self._cache.get(key)
+        if self._usable(cached, with_png):
+            return cached
+
+        with self._lock:
+            cached = self._cache.get(key)
+            if self._usable(cached, with_png):
+                return cached
+            png, png_error, failed_at = None, None, None
+            if with_png:
+                try:
+                    png = drawable.draw_mermaid_png()
+                except Exception as e:
+                    png_error, failed_at = str(e), time.monotonic()
+            rendered = RenderedGraph(graph_hash=key, mermaid=mermaid, png=png, png_error=png_error,
+                                     failed_at=failed_at)
+            self._cache[key] = rendered
+            return rendered
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+
+
+graph_renderer = GraphRenderer()
@@ -0,0 +1,142 @@
+"""
+agent/job_runner.py
+-------------------
+Background execution of trip-plan jobs for the `/jobs` API in `main.py`.
+
+A full plan takes tens of seconds of LLM and tool time; holding an HTTP
+connection open for all of that trips load-balancer timeouts.  `JobRunner`
+decouples the two: `submit` stores a `Job` (see `utils/job_store.py`) and
+puts its id on an asyncio queue; a fixed pool of worker tasks picks jobs up
+and runs them against the **shared compiled graph** from `graph_registry`.
+
+While a job runs the worker follows the graph with
+`astream(stream_mode="updates")` and appends a progress line for every agent
+turn ("Calling tools: search_attractions, get_current_weather") and tool
+round, so clients polling `GET /jobs/{id}` can show what is happening.
+
+Workers take their slot from the admission controller in the `batch` lane, so
+jobs share the per-worker concurrency budget with `/query` but always yield
+to interactive requests.  A rejected admission leaves the job queued and is
+retried after the Retry-After hint.  Like `/query`, a job is answered from the
+response cache when possible, and fresh answers are written back to it.
+
+Usage
+-----
+```python
+job_runner = JobRunner(build_job_store(), workers=4)
+await job_runner.start()       # in the FastAPI lifespan
+job = await job_runner.submit("Plan a 5 day trip to Goa")
+await job_runner.stop()
+```
+"""
+import asyncio
+from typing import List, Optional
+
+from agent.graph_registry import graph_registry
+from logger.logging import get_logger
+from utils.admission import AdmissionRejected, admission
+from utils.job_store import FAILED, SUCCEEDED, Job
+from utils.response_cache import response_cache
+from utils.tracing import start_trace
+
+logger = get_logger(__name__)
+
+
+def _progress(node: str, update) -> Optional[str]:
+    """One human-readable progress line for a graph `updates` chunk."""
+    messages = (update or {}).get("messages") or []
+    if node == "agent" and messages:
+        tool_calls = getattr(messages[-1], "tool_calls", None) or []
+        if tool_calls:
+            return "Calling tools: " + ", ".join(call["name"] for call in tool_calls)
+        return "Writing the travel plan"
+    if node == "tools" and messages:
+        return "Got results from: " + ", ".join(getattr(message, "name", None) or "tool" for message in messages)
+    if node == "plan_leg":
+        return "Planned leg: " + ", ".join(plan["destination"] for plan in (update or {}).get("leg_plans", []))
+    return None
+
+
+class JobRunner:
+    def __init__(self, store, workers: int = 4, model_provider: str = "openai", lane: str = "batch",
+                 stale_seconds: float = 600):
+        self.store = store
+        self.workers = workers
+        self.stale_seconds = stale_seconds
+        self.model_provider = model_provider
+        self.lane = lane
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+
+    async def start(self) -> None:
+        """Start the worker tasks and re-enqueue jobs left unfinished by a restart."""
+        self._queue = asyncio.Queue()
+        for job in await asyncio.to_thread(self.store.requeue_stale, self.stale_seconds):
+            self._queue.put_nowait(job.id)
+        self._tasks = [asyncio.create_task(self._worker(), name=f"job-worker-{index}")
+                       for index in range(self.workers)]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def submit(self, question: str) -> Job:
+        job = await asyncio.to_thread(self.store.create, Job.new(question))
+        self._queue.put_nowait(job.id)
+        return job
+
+    async def get(self, job_id: str) -> Optional[Job]:
+        return await asyncio.to_thread(self.store.get, job_id)
+
+    async def _update(self, job_id: str, progress: Optional[str] = None, **fields) -> None:
+        await asyncio.to_thread(self.store.update, job_id, progress, **fields)
+
+    async def _worker(self) -> None:
+        while True:
+            job_id = await self._queue.get()
+            try:
+                job = await self.get(job_id)
+                if job is not None:
+                    await self._run(job)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.exception("Job %s failed", job_id)
+                await self._update(job_id, status=FAILED, error=str(e))
+            finally:
+                self._queue.task_done()
+
+    async def _admit(self, job: Job):
+        while True:
+            try:
+                return await admission.acquire(self.lane)
+            except AdmissionRejected as e:
+                await self._update(job.id, progress=f"Waiting for capacity (retry in {e.retry_after}s)")
+                await asyncio.sleep(e.retry_after)
+
+    async def _run(self, job: Job) -> None:
+        if not await asyncio.to_thread(self.store.claim, job.id):
+            return  # already picked up by another worker process
+        hit = await response_cache.aget(job.question)
+        if hit is not None:
+            await self._update(job.id, status=SUCCEEDED, answer=hit.answer, progress="Answered from cache")
+            return
+        ticket = await self._admit(job)
+        try:
+            await self._update(job.id, progress="Started")
+            with start_trace("job", **{"job.id": job.id}):
+                react_app = graph_registry.get(self.model_provider)
+                answer = ""
+                async for chunk in react_app.astream({"messages": [job.question]}, stream_mode="updates"):
+                    for node, update in chunk.items():
+                        line = _progress(node, update)
+                        if line:
+                            await self._update(job.id, progress=line)
+                        if node in ("agent", "merge") and (update or {}).get("messages"):
+                            answer = update["messages"][-1].content
+        finally:
+            ticket.release()
+        await response_cache.aset(job.question, answer)
+        await self._update(job.id, status=SUCCEEDED, answer=answer, progress="Done")
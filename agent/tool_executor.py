@@ -0,0 +1,114 @@
+"""
+agent/tool_executor.py
+----------------------
+`ParallelToolNode` – drop-in replacement for LangGraph's `ToolNode` that runs
+all tool calls of one assistant turn concurrently.
+
+When the LLM asks for weather, attractions, restaurants, activities and
+transportation in the same turn, those calls are independent network requests.
+Running them one after another makes a tool round cost the *sum* of their
+latencies; fanning them out makes it cost roughly the *slowest* call.
+
+• `run` (sync graph execution) submits every call to a thread pool.
+• `arun` (`ainvoke` / `astream_events`) schedules them as asyncio tasks.
+
+Each tool declares its upstream in `metadata["provider"]`; the node holds that
+provider's slot from `utils.concurrency.provider_limiter` while the tool runs,
+so bursts stay within per-provider limits.  Every call is recorded as a
+`tool.<name>` span (`utils/tracing.py`), including time spent waiting for the
+provider slot, and counted in the `travel_planner_tool_*` metrics
+(`utils/metrics.py`).  Results are returned as
+`ToolMessage`s in the same order as the tool calls, and a failing tool yields an
+error `ToolMessage` (like `ToolNode`'s default) instead of aborting the round.
+"""
+import asyncio
+import contextvars
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+from langchain_core.messages import ToolMessage
+from langchain_core.runnables import RunnableConfig
+from langchain_core.tools import BaseTool
+from langgraph.graph import MessagesState
+
+from utils.concurrency import ProviderLimiter, provider_limiter
+from utils.metrics import TOOL_CALLS, TOOL_LATENCY
+from utils.tracing import span
+
+
+class ParallelToolNode:
+    def __init__(self, tools: List[BaseTool], limiter: ProviderLimiter = provider_limiter, max_workers: int = 16):
+        self.tools_by_name: Dict[str, BaseTool] = {tool.name: tool for tool in tools}
+        self.limiter = limiter
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="tool-node")
+
+    @staticmethod
+    def _tool_calls(state: MessagesState) -> list:
+        messages = state["messages"] if "messages" in state else []
+        return list(getattr(messages[-1], "tool_calls", None) or []) if messages else []
+
+    @staticmethod
+    def _provider(tool: BaseTool) -> Optional[str]:
+        return (tool.metadata or {}).get("provider")
+
+    @staticmethod
+    def _error_message(call: dict, error: Exception) -> ToolMessage:
+        return ToolMessage(
+            content=f"Error: {error!r}\n Please fix your mistakes.",
+            name=call["name"],
+            tool_call_id=call["id"],
+            status="error",
+        )
+
+    def _lookup(self, call: dict) -> BaseTool:
+        tool = self.tools_by_name.get(call["name"])
+        if tool is None:
+            raise ValueError(f"{call['name']} is not a valid tool, try one of [{', '.join(self.tools_by_name)}].")
+        return tool
+
+    @staticmethod
+    def _record(call: dict, result: ToolMessage, started: float) -> ToolMessage:
+        TOOL_LATENCY.observe(time.perf_counter() - started, call["name"])
+        TOOL_CALLS.inc(call["name"], "error" if getattr(result, "status", None) == "error" else "ok")
+        return result
+
+    def _run_one(self, call: dict, config: Optional[RunnableConfig]) -> ToolMessage:
+        started = time.perf_counter()
+        with span(f"tool.{call['name']}") as tool_span:
+            try:
+                tool = self._lookup(call)
+                tool_span.set_attribute("tool.provider", self._provider(tool) or "local")
+                with self.limiter.limit(self._provider(tool)):
+                    # Passing the full tool call makes the tool return a ToolMessage
+                    return self._record(call, tool.invoke({**call, "type": "tool_call"}, config), started)
+            except Exception as e:
+                tool_span.record_error(e)
+                return self._record(call, self._error_message(call, e), started)
+
+    async def _arun_one(self, call: dict, config: Optional[RunnableConfig]) -> ToolMessage:
+        started = time.perf_counter()
+        with span(f"tool.{call['name']}") as tool_span:
+            try:
+                tool = self._lookup(call)
+                tool_span.set_attribute("tool.provider", self._provider(tool) or "local")
+                async with self.limiter.alimit(self._provider(tool)):
+                    return self._record(call, await tool.ainvoke({**call, "type": "tool_call"}, config), started)
+            except Exception as e:
+                tool_span.record_error(e)
+                return self._record(call, self._error_message(call, e), started)
+
+    def run(self, state: MessagesState, config: RunnableConfig = None) -> dict:
+        """Execute the pending tool calls on the thread pool, preserving order."""
+        calls = self._tool_calls(state)
+        futures = [
+            self._executor.submit(contextvars.copy_context().run, self._run_one, call, config)
+            for call in calls
+        ]
+        return {"messages": [future.result() for future in futures]}
+
+    async def arun(self, state: MessagesState, config: RunnableConfig = None) -> dict:
+        """Execute the pending tool calls as concurrent asyncio tasks, preserving order."""
+        calls = self._tool_calls(state)
+        results = await asyncio.gather(*(self._arun_one(call, config) for call in calls))
+        return {"messages": list(results)}
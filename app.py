@@ -8,9 +8,12 @@ a complete full-stack demo to iterate on.
 How it works
 ------------
 1. User types a question (e.g. “Plan a 5-day trip to Goa”).
-2. We POST the text to `http://localhost:8000/query`.
-3. The backend returns a Markdown-formatted travel plan which we render in the
-   Streamlit page.
+2. We POST the text to `http://localhost:8000/query/stream`.
+3. The backend streams the Markdown-formatted travel plan as Server-Sent Events;
+   `st.write_stream` renders tokens as they arrive while tool progress is shown
+   in a status box.  Pick *Background job* in the sidebar to submit the
+   question to `/jobs` and poll `/jobs/{id}` for progress instead, or
+   *Blocking* to fall back to the blocking `/query` endpoint.
 
 Customisation ideas
 -------------------
@@ -28,11 +31,14 @@ streamlit run app.py
 import streamlit as st
 import requests
 import datetime
+import json
+import time
 
 
 import sys
 
 BASE_URL = "http://localhost:8000"  # Backend endpoint
+JOB_POLL_SECONDS = 2
 
 st.set_page_config(
     page_title="🌍 Travel Planner Agentic Application",
@@ -43,6 +49,54 @@ st.set_page_config(
 
 st.title("🌍 Travel Planner Agentic Application")
 
+response_mode = st.sidebar.radio("Response mode", ["Stream", "Background job", "Blocking"], index=0)
+
+
+def stream_plan(question: str, status):
+    """Yield answer tokens from `/query/stream`, reporting tool progress in `status`.
+
+    Cache hits arrive as a single `final` frame without tokens; its answer is
+    yielded instead.
+    """
+    with requests.post(f"{BASE_URL}/query/stream", json={"question": question}, stream=True) as response:
+        response.raise_for_status()
+        event = None
+        streamed = False
+        for line in response.iter_lines(decode_unicode=True):
+            if line.startswith("event:"):
+                event = line[len("event:"):].strip()
+            elif line.startswith("data:"):
+                data = json.loads(line[len("data:"):])
+                if event == "token":
+                    streamed = True
+                    yield data["content"]
+                elif event == "final" and not streamed:
+                    yield data.get("answer") or ""
+                elif event == "tool_start":
+                    status.write(f"🔧 Calling `{data['tool']}`…")
+                elif event == "tool_end":
+                    status.write(f"✅ `{data['tool']}` finished")
+                elif event == "error":
+                    raise RuntimeError(data["error"])
+
+
+def wait_for_job(question: str, status) -> str:
+    """Submit `question` to `/jobs` and poll until the plan is ready, reporting progress in `status`."""
+    response = requests.post(f"{BASE_URL}/jobs", json={"question": question})
+    response.raise_for_status()
+    status_url = f"{BASE_URL}{response.json()['status_url']}"
+    reported = 0
+    while True:
+        job = requests.get(status_url).json()
+        for line in job.get("progress", [])[reported:]:
+            status.write(f"🔧 {line}")
+        reported = len(job.get("progress", []))
+        if job.get("status") == "succeeded":
+            return job["answer"]
+        if job.get("status") == "failed" or job.get("error"):
+            raise RuntimeError(job.get("error") or "job failed")
+        time.sleep(JOB_POLL_SECONDS)
+
 
 if "messages" not in st.session_state:
     st.session_state.messages = []
@@ -55,7 +109,27 @@ with st.form(key="query_form", clear_on_submit=True):
     user_input = st.text_input("User Input", placeholder="e.g. Plan a trip to Goa for 5 days")
     submit_button = st.form_submit_button("Send")
 
-if submit_button and user_input.strip():
+if submit_button and user_input.strip() and response_mode == "Stream":
+    st.markdown(f"# 🌍 AI Travel Plan\n\n**Generated:** {datetime.datetime.now().strftime('%Y-%m-%d at %H:%M')}  \n**Created by:** Atriyo's Travel Agent\n\n---")
+    try:
+        status = st.status("Researching your trip...", expanded=False)
+        st.write_stream(stream_plan(user_input, status))
+        status.update(label="Plan ready", state="complete")
+        st.markdown("---\n\n*This travel plan was generated by AI. Please verify all information, especially prices, operating hours, and travel requirements before your trip.*")
+    except Exception as e:
+        st.error(f"The response failed due to {e}")
+
+elif submit_button and user_input.strip() and response_mode == "Background job":
+    st.markdown(f"# 🌍 AI Travel Plan\n\n**Generated:** {datetime.datetime.now().strftime('%Y-%m-%d at %H:%M')}  \n**Created by:** Atriyo's Travel Agent\n\n---")
+    try:
+        status = st.status("Queued your trip...", expanded=False)
+        st.markdown(wait_for_job(user_input, status))
+        status.update(label="Plan ready", state="complete")
+        st.markdown("---\n\n*This travel plan was generated by AI. Please verify all information, especially prices, operating hours, and travel requirements before your trip.*")
+    except Exception as e:
+        st.error(f"The response failed due to {e}")
+
+elif submit_button and user_input.strip():
     try:
 
         with st.spinner("Bot is thinking..."):
@@ -82,4 +156,4 @@ if submit_button and user_input.strip():
             st.error(" Bot failed to respond: " + response.text)
 
     except Exception as e:
-        raise f"The response failed due to {e}"
\ No newline at end of file
+        st.error(f"The response failed due to {e}")
\ No newline at end of file
@@ -0,0 +1,21 @@
+"""
+benchmarks
+==========
+Offline performance harness for the travel-planner agent.
+
+Everything an end-to-end run touches is replaced by local, deterministic
+stand-ins so the hot path can be measured on a laptop without API keys or
+network access:
+
+• `utils.fake_chat_model.ScriptedChatModel` – replays recorded tool-call
+  sequences (`fixtures/agent_scripts.json`) with a configurable latency per
+  turn; it is also the offline `fake` provider of `utils/model_loader.py`.
+• `stub_servers.StubServer` – one local HTTP server impersonating
+  OpenWeatherMap, ExchangeRate-API, Google Places and Tavily from the recorded
+  responses in `fixtures/`, each with its own latency distribution.
+• `run` – drives `GraphBuilder` directly or the FastAPI app (in process, via
+  `httpx.ASGITransport`) at a given concurrency and reports p50/p95/p99
+  latency, requests per second and peak RSS.
+
+See `benchmarks/run.py` for usage.
+"""
@@ -0,0 +1,307 @@
+"""
+benchmarks/run.py
+=================
+End-to-end latency / throughput benchmark that runs fully offline.
+
+The harness starts the stub upstreams (`stub_servers.py`), writes a config
+that points every helper at them (selected through the
+`TRAVEL_PLANNER_CONFIG` environment variable), injects `ScriptedChatModel`
+into `GraphBuilder`, and then fires `--requests` trip questions at
+`--concurrency`:
+
+• `--target graph` – calls the compiled graph directly (`ainvoke`, or `invoke`
+  on a thread pool with `--driver sync`).
+• `--target app`   – POSTs to `/query` on the FastAPI app in process via
+  `httpx.ASGITransport`, so middleware, caching headers and the event loop
+  are part of the measurement (with `X-Cache-Bypass: 1`).
+
+It reports p50/p95/p99/max latency, requests per second and peak RSS.
+
+Examples
+--------
+```
+python -m benchmarks.run                                   # graph, async, defaults
+python -m benchmarks.run --target app --requests 200 --concurrency 32
+python -m benchmarks.run --llm-latency lognormal:900:3000 --upstream-latency lognormal:150:600 \\
+    --google-latency lognormal:400:2500 --strategy hedged --json results.json
+python -m benchmarks.run --scenario sequential_tools --caches warm
+```
+
+`--caches cold` (default) disables the place-search cache and sets the
+weather / exchange-rate TTLs to zero so every run pays for its upstream
+calls; `--caches warm` keeps the configured caches (repeat destinations are
+then served locally).  The response cache is always disabled.
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+import yaml
+
+from utils.latency import LatencyModel
+from benchmarks.stub_servers import PROVIDERS, StubServer, load_fixture
+from utils.config_loader import CONFIG_ENV_VAR, DEFAULT_CONFIG_PATH
+
+FAKE_KEYS = {
+    "OPENAI_API_KEY": "sk-benchmark",
+    "GPLACES_API_KEY": "AIzaBenchmarkKey",   # googlemaps validates the "AIza" prefix
+    "TAVILY_API_KEY": "tvly-benchmark",
+    "OPENWEATHERMAP_API_KEY": "benchmark",
+    "EXCHANGE_RATE_API_KEY": "benchmark",
+}
+
+
+def _deep_merge(base: dict, overrides: dict) -> dict:
+    merged = dict(base)
+    for key, value in overrides.items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = _deep_merge(merged[key], value)
+        else:
+            merged[key] = value
+    return merged
+
+
+def write_config(args: argparse.Namespace, stubs: StubServer, workdir: str) -> str:
+    """Write the benchmark config (repo config + stub URLs + cache policy) and return its path."""
+    with open(DEFAULT_CONFIG_PATH, "r") as file:
+        config = yaml.safe_load(file)
+    cold = args.caches == "cold"
+    overrides = _deep_merge(stubs.base_urls(), {
+        "place_search": {"strategy": args.strategy},
+        "place_cache": {"enabled": not cold, "path": os.path.join(workdir, "place_search.sqlite3")},
+        "response_cache": {"enabled": False},
+        "tracing": {"exporter": "file" if args.trace_path else "none", "path": args.trace_path or ""},
+        "logging": {"level": "WARNING"},
+    })
+    if cold:
+        overrides = _deep_merge(overrides, {
+            "weather": {"current_ttl_seconds": 0, "forecast_ttl_seconds": 0,
+                        "current_from_forecast_window_seconds": 0},
+            "currency": {"rate_ttl_seconds": 0},
+        })
+    path = os.path.join(workdir, "config.yaml")
+    with open(path, "w") as file:
+        yaml.safe_dump(_deep_merge(config, overrides), file, sort_keys=False)
+    return path
+
+
+def percentile(samples: List[float], q: float) -> Optional[float]:
+    """Nearest-rank percentile (same definition as `utils.search_strategy.LatencyTracker`)."""
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    rank = max(1, min(len(ordered), math.ceil(q * len(ordered))))
+    return ordered[rank - 1]
+
+
+def peak_rss_mb() -> float:
+    import resource
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def summarize(latencies: List[float], errors: List[str], wall_seconds: float) -> dict:
+    ms = [latency * 1000 for latency in latencies]
+    return {
+        "requests": len(latencies) + len(errors),
+        "ok": len(latencies),
+        "errors": len(errors),
+        "error_samples": sorted(set(errors))[:5],
+        "wall_seconds": round(wall_seconds, 3),
+        "rps": round(len(latencies) / wall_seconds, 2) if wall_seconds else None,
+        "latency_ms": {
+            "p50": percentile(ms, 0.50), "p95": percentile(ms, 0.95), "p99": percentile(ms, 0.99),
+            "mean": sum(ms) / len(ms) if ms else None, "max": max(ms) if ms else None,
+        },
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+    }
+
+
+def build_questions(scenario: dict, count: int) -> List[str]:
+    destinations = scenario["destinations"]
+    return [
+        scenario["question"].format(destination=destinations[index % len(destinations)], days=scenario["days"])
+        for index in range(count)
+    ]
+
+
+def _answer_of(output) -> str:
+    if isinstance(output, dict) and output.get("messages"):
+        return str(output["messages"][-1].content)
+    return str(output)
+
+
+async def drive_graph_async(graph, questions: List[str], concurrency: int) -> Tuple[List[float], List[str]]:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies, errors = [], []
+
+    async def one(question: str):
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                if not _answer_of(await graph.ainvoke({"messages": [question]})):
+                    raise RuntimeError("empty answer")
+                latencies.append(time.perf_counter() - started)
+            except Exception as e:
+                errors.append(f"{type(e).__name__}: {e}")
+
+    await asyncio.gather(*(one(question) for question in questions))
+    return latencies, errors
+
+
+def drive_graph_sync(graph, questions: List[str], concurrency: int) -> Tuple[List[float], List[str]]:
+    def one(question: str):
+        started = time.perf_counter()
+        try:
+            if not _answer_of(graph.invoke({"messages": [question]})):
+                raise RuntimeError("empty answer")
+            return time.perf_counter() - started, None
+        except Exception as e:
+            return None, f"{type(e).__name__}: {e}"
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(one, questions))
+    return [latency for latency, _ in results if latency is not None], [error for _, error in results if error]
+
+
+async def drive_app(app, questions: List[str], concurrency: int) -> Tuple[List[float], List[str]]:
+    import httpx
+
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies, errors = [], []
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark", timeout=None) as client:
+        async def one(question: str):
+            async with semaphore:
+                started = time.perf_counter()
+                try:
+                    response = await client.post("/query", json={"question": question},
+                                                 headers={"X-Cache-Bypass": "1"})
+                    if response.status_code != 200 or not response.json().get("answer"):
+                        raise RuntimeError(f"HTTP {response.status_code}: {response.text[:200]}")
+                    latencies.append(time.perf_counter() - started)
+                except Exception as e:
+                    errors.append(f"{type(e).__name__}: {e}")
+
+        await asyncio.gather(*(one(question) for question in questions))
+    return latencies, errors
+
+
+async def _measure_async(drive, target, warmup: List[str], questions: List[str], concurrency: int):
+    # Warm-up and measurement share one event loop: the pooled async HTTP client is bound to it
+    await drive(target, warmup, concurrency)
+    started = time.perf_counter()
+    ok, errors = await drive(target, questions, concurrency)
+    return ok, errors, time.perf_counter() - started
+
+
+def run(args: argparse.Namespace) -> dict:
+    latencies = {provider: LatencyModel.parse(args.upstream_latency) for provider in PROVIDERS}
+    if args.google_latency:
+        latencies["google_places"] = LatencyModel.parse(args.google_latency)
+    error_rates = {"google_places": args.google_error_rate} if args.google_error_rate else {}
+
+    scenario = load_fixture("agent_scripts.json")[args.scenario]
+    with tempfile.TemporaryDirectory(prefix="travel-bench-") as workdir, \
+            StubServer(latencies=latencies, error_rates=error_rates) as stubs:
+        os.environ[CONFIG_ENV_VAR] = write_config(args, stubs, workdir)
+        for name, value in FAKE_KEYS.items():
+            os.environ[name] = value
+
+        # Imported only now: these modules read the config at import time
+        from agent.agentic_workflow import GraphBuilder
+        from utils.fake_chat_model import ScriptedChatModel
+
+        model = ScriptedChatModel(script=scenario["script"], question_template=scenario["question"],
+                                  latency=LatencyModel.parse(args.llm_latency))
+        warmup = build_questions(scenario, args.warmup)
+        questions = build_questions(scenario, args.requests)
+
+        if args.target == "app":
+            from agent.graph_registry import graph_registry
+            import main
+
+            graph_registry.builder_factory = lambda provider, model_name: GraphBuilder(model_provider=provider,
+                                                                                       llm=model)
+            graph_registry.warm_up([main.MODEL_PROVIDER])
+            ok, errors, wall = asyncio.run(_measure_async(drive_app, main.app, warmup, questions, args.concurrency))
+        else:
+            graph = GraphBuilder(llm=model)()
+            if args.driver == "sync":
+                drive_graph_sync(graph, warmup, args.concurrency)
+                started = time.perf_counter()
+                ok, errors = drive_graph_sync(graph, questions, args.concurrency)
+                wall = time.perf_counter() - started
+            else:
+                ok, errors, wall = asyncio.run(
+                    _measure_async(drive_graph_async, graph, warmup, questions, args.concurrency))
+
+        report = summarize(ok, errors, wall)
+        report["upstream_calls"] = dict(stubs.calls)
+    report["settings"] = {
+        "target": args.target, "driver": args.driver, "scenario": args.scenario, "concurrency": args.concurrency,
+        "llm_latency": args.llm_latency, "upstream_latency": args.upstream_latency,
+        "google_latency": args.google_latency, "strategy": args.strategy, "caches": args.caches,
+    }
+    return report
+
+
+def _format_report(report: dict) -> str:
+    latency = report["latency_ms"]
+    fmt = lambda value: "-" if value is None else f"{value:.1f}"
+    lines = [
+        f"{report['settings']['target']}/{report['settings']['driver']} · scenario={report['settings']['scenario']} "
+        f"· concurrency={report['settings']['concurrency']} · strategy={report['settings']['strategy']} "
+        f"· caches={report['settings']['caches']}",
+        f"requests  {report['requests']}  (ok {report['ok']}, errors {report['errors']})",
+        f"latency   p50 {fmt(latency['p50'])} ms · p95 {fmt(latency['p95'])} ms · p99 {fmt(latency['p99'])} ms "
+        f"· max {fmt(latency['max'])} ms",
+        f"throughput {report['rps']} req/s over {report['wall_seconds']} s",
+        f"peak RSS  {report['peak_rss_mb']} MB",
+        f"upstream  {report['upstream_calls']}",
+    ]
+    lines.extend(f"error     {sample}" for sample in report["error_samples"])
+    return "\n".join(lines)
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Offline end-to-end benchmark for the travel-planner agent.")
+    parser.add_argument("--target", choices=("graph", "app"), default="graph")
+    parser.add_argument("--driver", choices=("async", "sync"), default="async",
+                        help="graph target only: ainvoke on the event loop, or invoke on a thread pool")
+    parser.add_argument("--scenario", default="single_city", help="key of fixtures/agent_scripts.json")
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--warmup", type=int, default=4, help="unmeasured requests before the run")
+    parser.add_argument("--llm-latency", default="lognormal:600:1500", help="per agent turn")
+    parser.add_argument("--upstream-latency", default="lognormal:120:400", help="every stub upstream")
+    parser.add_argument("--google-latency", default=None, help="override for Google Places")
+    parser.add_argument("--google-error-rate", type=float, default=0.0, help="fraction of Google calls answering 503")
+    parser.add_argument("--strategy", choices=("sequential", "hedged", "race"), default="hedged")
+    parser.add_argument("--caches", choices=("cold", "warm"), default="cold")
+    parser.add_argument("--trace", dest="trace_path", default=None, help="export OTLP/JSON traces to this file")
+    parser.add_argument("--json", dest="json_path", default=None, help="also write the report to this file")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> Dict:
+    args = parse_args(argv)
+    report = run(args)
+    print(_format_report(report))
+    if args.json_path:
+        with open(args.json_path, "w") as file:
+            json.dump(report, file, indent=2)
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+"""
+benchmarks/stub_servers.py
+==========================
+A local HTTP server that impersonates every upstream the tools call, serving
+the recorded responses in `benchmarks/fixtures/`:
+
+| prefix           | upstream            | routes                                                  |
+|------------------|---------------------|---------------------------------------------------------|
+| `/openweathermap`| OpenWeatherMap 2.5  | `GET /weather`, `GET /forecast`                         |
+| `/exchangerate`  | ExchangeRate-API v6 | `GET /{key}/latest/{base}`                              |
+| `/google`        | Google Places       | `GET /maps/api/place/textsearch/json`, `.../details/json` |
+| `/tavily`        | Tavily              | `POST /search`                                          |
+
+Responses are adapted to the request where it matters: the city name (and a
+city id derived from it) is taken from `q`, forecast timestamps start at the
+current 3-hour slot, and rate tables are rebased to the requested currency.
+
+Every provider has its own `LatencyModel` and an optional error rate (answers
+503), so hedging, retries and timeouts can be exercised.  The server is a
+`ThreadingHTTPServer`, i.e. requests to the stubs never queue behind one
+another.
+
+```python
+with StubServer(latencies={"google_places": LatencyModel.parse("lognormal:150:600")}) as stubs:
+    stubs.base_urls()   # -> config overrides pointing every helper at the stubs
+```
+"""
+import json
+import os
+import random
+import sys
+import threading
+import time
+import zlib
+from copy import deepcopy
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+from urllib.parse import parse_qs, urlsplit
+
+from utils.latency import LatencyModel
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+
+PROVIDERS = ("openweathermap", "exchangerate_api", "google_places", "tavily")
+
+
+def load_fixture(name: str):
+    with open(os.path.join(FIXTURES_DIR, name), "r", encoding="utf-8") as file:
+        return json.load(file)
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    server: "_StubHTTPServer"
+    protocol_version = "HTTP/1.1"  # keep-alive, like the real APIs
+
+    def log_message(self, format, *args):
+        pass  # keep benchmark output clean
+
+    def _send_json(self, payload, status: int = 200) -> None:
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _simulate(self, provider: str) -> bool:
+        """Sleep for the provider's latency; False if this call should fail."""
+        stub = self.server.stub
+        stub.count(provider)
+        time.sleep(stub.latencies[provider].sample())
+        if random.random() < stub.error_rates.get(provider, 0.0):
+            self._send_json({"error": "injected failure"}, status=503)
+            return False
+        return True
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        query = {key: values[0] for key, values in parse_qs(url.query).items()}
+        parts = [part for part in url.path.split("/") if part]
+        fixtures = self.server.stub.fixtures
+
+        if parts[:1] == ["openweathermap"] and parts[-1:] in (["weather"], ["forecast"]):
+            if not self._simulate("openweathermap"):
+                return
+            city = query.get("q", "Goa").split(",")[0].strip().title()
+            if parts[-1] == "weather":
+                payload = deepcopy(fixtures["current"])
+                payload.update(name=city, id=zlib.crc32(city.encode()), dt=int(time.time()))
+            else:
+                payload = deepcopy(fixtures["forecast"])
+                start = int(time.time()) // 10800 * 10800
+                slots = payload["list"][:int(query.get("cnt", len(payload["list"])))]
+                for index, slot in enumerate(slots):
+                    slot["dt"] = start + index * 10800
+                    slot["dt_txt"] = time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime(slot["dt"]))
+                payload.update(list=slots, cnt=len(slots))
+                payload["city"].update(name=city, id=zlib.crc32(city.encode()))
+            return self._send_json(payload)
+
+        if parts[:1] == ["exchangerate"] and len(parts) >= 4 and parts[-2] == "latest":
+            if not self._simulate("exchangerate_api"):
+                return
+            payload = deepcopy(fixtures["rates"])
+            base = parts[-1].upper()
+            usd_rates = payload["conversion_rates"]
+            if base not in usd_rates:
+                return self._send_json({"result": "error", "error-type": "unsupported-code"}, status=404)
+            payload["base_code"] = base
+            payload["conversion_rates"] = {code: rate / usd_rates[base] for code, rate in usd_rates.items()}
+            return self._send_json(payload)
+
+        if parts[:1] == ["google"] and parts[-2:] == ["textsearch", "json"]:
+            if not self._simulate("google_places"):
+                return
+            return self._send_json(fixtures["places"])
+
+        if parts[:1] == ["google"] and parts[-2:] == ["details", "json"]:
+            # Detail lookups are part of the same logical search; no extra latency
+            details = fixtures["place_details"].get(query.get("place_id"))
+            return self._send_json({"result": details, "status": "OK"} if details else {"status": "NOT_FOUND"})
+
+        self._send_json({"error": f"no stub for GET {url.path}"}, status=404)
+
+    def do_POST(self):
+        url = urlsplit(self.path)
+        length = int(self.headers.get("Content-Length") or 0)
+        request = json.loads(self.rfile.read(length) or b"{}")
+        if url.path.rstrip("/") == "/tavily/search":
+            if not self._simulate("tavily"):
+                return
+            payload = deepcopy(self.server.stub.fixtures["tavily"])
+            payload["query"] = request.get("query", payload["query"])
+            return self._send_json(payload)
+        self._send_json({"error": f"no stub for POST {url.path}"}, status=404)
+
+
+class _StubHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    stub: "StubServer"
+
+    def handle_error(self, request, client_address):
+        # Hedged and raced calls hang up on the loser mid-response; that is expected
+        if isinstance(sys.exc_info()[1], (BrokenPipeError, ConnectionResetError)):
+            return
+        super().handle_error(request, client_address)
+
+
+class StubServer:
+    def __init__(self, latencies: Optional[Dict[str, LatencyModel]] = None,
+                 error_rates: Optional[Dict[str, float]] = None, host: str = "127.0.0.1", port: int = 0):
+        self.latencies = {provider: LatencyModel() for provider in PROVIDERS}
+        self.latencies.update(latencies or {})
+        self.error_rates = dict(error_rates or {})
+        self.fixtures = {
+            "current": load_fixture("openweathermap_current.json"),
+            "forecast": load_fixture("openweathermap_forecast.json"),
+            "rates": load_fixture("exchangerate_latest_usd.json"),
+            "places": load_fixture("google_places_textsearch.json"),
+            "place_details": load_fixture("google_places_details.json"),
+            "tavily": load_fixture("tavily_search.json"),
+        }
+        self.calls: Dict[str, int] = {provider: 0 for provider in PROVIDERS}
+        self._calls_lock = threading.Lock()
+        self._httpd = _StubHTTPServer((host, port), _StubHandler)
+        self._httpd.stub = self
+        self._thread: Optional[threading.Thread] = None
+
+    def count(self, provider: str) -> None:
+        with self._calls_lock:
+            self.calls[provider] += 1
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def base_urls(self) -> Dict[str, Dict[str, str]]:
+        """Config sections that point every upstream helper at this server."""
+        return {
+            "weather": {"base_url": f"{self.url}/openweathermap/data/2.5"},
+            "currency": {"base_url": f"{self.url}/exchangerate/v6"},
+            "place_search": {"google_base_url": f"{self.url}/google"},
+            "tavily": {"base_url": f"{self.url}/tavily"},
+        }
+
+    def start(self) -> "StubServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="stub-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self) -> "StubServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
@@ -1,11 +1,170 @@
 """
 logger/logging.py
 =================
-Reserved for any project-wide logging configuration.  At the moment we rely on
-FastAPI/Streamlit default loggers, but if you want structured logging (e.g.
-JSON to stdout or integrations with Logstash) this is where you would configure
-`logging.basicConfig` or set up loguru.
+Project-wide logging configuration.  Every module obtains its logger through
+`get_logger(__name__)` instead of calling `print`.
 
-Feel free to place helper functions like `get_logger(__name__)` in this file
-and import them throughout the project.
+What you get
+------------
+• **JSON lines** – one object per record (`ts`, `level`, `logger`, `msg`, plus
+  any `extra={...}` fields and `exc` for exceptions), easy to ship to
+  Logstash / Loki / CloudWatch.  Set `logging.json: false` for plain text.
+• **Non-blocking** – callers only push records onto an in-memory queue
+  (`QueueHandler`); a background `QueueListener` thread formats and writes
+  them, so a slow stdout pipe never stalls a request.
+• **Lazy formatting** – use `%`-style arguments (`logger.debug("x=%s", x)`), and
+  wrap large payloads in `preview(...)`: nothing is stringified unless the
+  record is actually emitted, and then only the first `preview_chars`
+  characters are kept.
+• **Sampling** – `logging.sample_rates` keeps only a fraction of records per
+  level (e.g. 10% of DEBUG) to bound log volume under load.
+
+Configuration lives under `logging` in `config/config.yaml`; the `LOG_LEVEL`
+environment variable overrides the level.
+
+Usage
+-----
+```python
+from logger.logging import get_logger, preview
+
+logger = get_logger(__name__)
+logger.info("Graph compiled", extra={"provider": "openai"})
+logger.debug("LLM input: %s", preview(messages))
+```
 """
+import atexit
+import copy
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+import threading
+import time
+from typing import Any, Dict, Optional
+
+ROOT_LOGGER_NAME = "travel_planner"
+
+# Attributes every LogRecord has; anything else was passed via `extra=`
+_RESERVED_ATTRS = set(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+_configure_lock = threading.Lock()
+_listener: Optional[logging.handlers.QueueListener] = None
+_preview_chars = 200
+
+
+class JsonFormatter(logging.Formatter):
+    """Render a record as a single JSON line."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload: Dict[str, Any] = {
+            "ts": time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(record.created)) + f".{int(record.msecs):03d}Z",
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED_ATTRS and not key.startswith("_"):
+                payload[key] = value
+        if record.exc_info:
+            payload["exc"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            payload["exc"] = record.exc_text
+        return json.dumps(payload, default=str, ensure_ascii=False)
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """Merge args and render tracebacks before enqueueing, but leave layout to the listener."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+class SamplingFilter(logging.Filter):
+    """Keep each record with the probability configured for its level."""
+
+    def __init__(self, sample_rates: Optional[Dict[str, float]] = None):
+        super().__init__()
+        self.sample_rates = {level.upper(): float(rate) for level, rate in (sample_rates or {}).items()}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        rate = self.sample_rates.get(record.levelname, 1.0)
+        return rate >= 1.0 or random.random() < rate
+
+
+class _Preview:
+    """Deferred, truncated `str()` of a value – evaluated only if the record is emitted."""
+
+    __slots__ = ("value", "limit")
+
+    def __init__(self, value: Any, limit: int):
+        self.value = value
+        self.limit = limit
+
+    def __str__(self) -> str:
+        text = self.value if isinstance(self.value, str) else repr(self.value)
+        if len(text) <= self.limit:
+            return text
+        return f"{text[:self.limit]}… [{len(text) - self.limit} more chars]"
+
+    __repr__ = __str__
+
+
+def preview(value: Any, limit: Optional[int] = None) -> _Preview:
+    """Wrap `value` so it is logged as a truncated preview, lazily."""
+    return _Preview(value, limit or _preview_chars)
+
+
+def _load_settings() -> dict:
+    try:
+        from utils.config_loader import load_config
+
+        return load_config().get("logging", {}) or {}
+    except Exception:
+        return {}  # logging must come up even without a readable config
+
+
+def configure_logging(level: Optional[str] = None, json_output: Optional[bool] = None,
+                      sample_rates: Optional[Dict[str, float]] = None, preview_chars: Optional[int] = None) -> None:
+    """Install the queue-based handler on the project root logger (idempotent)."""
+    global _listener, _preview_chars
+    with _configure_lock:
+        if _listener is not None:
+            return
+        settings = _load_settings()
+        level = (os.getenv("LOG_LEVEL") or level or settings.get("level", "INFO")).upper()
+        json_output = settings.get("json", True) if json_output is None else json_output
+        sample_rates = settings.get("sample_rates", {}) if sample_rates is None else sample_rates
+        _preview_chars = preview_chars or settings.get("preview_chars", 200)
+
+        stream_handler = logging.StreamHandler(sys.stdout)
+        stream_handler.setFormatter(
+            JsonFormatter() if json_output else logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s")
+        )
+
+        log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+        queue_handler = _QueueHandler(log_queue)
+        queue_handler.addFilter(SamplingFilter(sample_rates))
+
+        root = logging.getLogger(ROOT_LOGGER_NAME)
+        root.setLevel(level)
+        root.handlers[:] = [queue_handler]
+        root.propagate = False
+
+        _listener = logging.handlers.QueueListener(log_queue, stream_handler, respect_handler_level=True)
+        _listener.start()
+        atexit.register(_listener.stop)
+
+
+def get_logger(name: str) -> logging.Logger:
+    """Return a project logger (configuring logging on first use)."""
+    configure_logging()
+    return logging.getLogger(f"{ROOT_LOGGER_NAME}.{name}")
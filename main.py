@@ -16,16 +16,60 @@ Response JSON:
 ```
 
 Inside the handler we:
-1. Instantiate `GraphBuilder` (our agent) – you can swap `model_provider` here.
-2. Compile the graph (`react_app = graph()`).
-3. Render a PNG of the LangGraph topology for debugging (`my_graph.png`).
-4. Invoke the graph with the user question.
+1. Fetch the shared compiled graph from `agent.graph_registry` – it is built
+   once at startup, so requests never pay for model / tool construction.
+2. Await the graph with the user question (`ainvoke`), so a slow trip plan
+   never blocks the event loop for other requests.
+
+`POST /query/stream` takes the same payload but answers with Server-Sent Events
+(`token`, `tool_start`, `tool_end`, `final`, `error`) so clients can render the
+itinerary while it is being generated.  For multi-destination trips the legs
+are researched in parallel; their tool events are streamed, but tokens only
+once the merged plan is being written.
+
+Both query endpoints consult `utils.response_cache` first: equivalent questions
+("5 day trip to Goa" / "Plan 5 days in Goa") are answered from memory within
+the freshness window.  Responses carry `X-Cache: HIT|MISS|BYPASS`.  Send
+`Cache-Control: no-cache` to skip the lookup (the fresh answer is still
+stored), or `Cache-Control: no-store` / `X-Cache-Bypass: 1` to skip the cache
+entirely.
+
+Every request is traced (`utils/tracing.py`): LLM turns, tool calls, place
+searches and upstream HTTP calls are recorded as spans and exported as
+OTLP/JSON.  Send `X-Timing: 1` (or set `tracing.timing_header: true`) to get a
+`Server-Timing`-style breakdown back in the `X-Timing` response header; on
+`/query/stream` it is added to the `final` event as `timing`.
+
+Agent runs go through an admission controller (`utils/admission.py`): at most
+`admission.max_concurrent` run at once per worker, the rest wait in a bounded
+priority queue (short questions first).  When the queue is full or the wait
+exceeds `admission.queue_timeout_seconds` the request is answered with **503**
+and a `Retry-After` header.  Identical questions arriving while a `/query` run
+for them is in flight join that run instead of starting another one.
+
+Long plans can also run in the background (`agent/job_runner.py`):
+`POST /jobs` takes the same payload, answers **202** with a `job_id` at once,
+and `GET /jobs/{job_id}` reports `status` (`queued`, `running`, `succeeded`,
+`failed`), `progress` lines and finally the `answer`.  Jobs are kept in the
+store configured under `jobs` (memory or SQLite) until `jobs.ttl_seconds`
+after they finish.
+
+The LangGraph topology is no longer rendered per request; fetch it on demand
+from `GET /graph` (PNG, or Mermaid text with `?format=mermaid`).
+
+Operations
+----------
+• `GET /metrics` – Prometheus text format: request rate / in-flight / latency
+  per route, agent-turn and per-tool latency, upstream errors per provider and
+  LLM token counters (`utils/metrics.py`).
+• `GET /health` – liveness (the process is serving).
+• `GET /ready` – readiness: 200 once the shared graph is compiled, 503 before.
 
 Extending the API
 -----------------
-• Add new routes (e.g. `/health`, `/tools`) to expose internal status.  
-• Move agent instantiation to a *startup* event if you want to reuse the graph
-  across requests.
+• Add new routes (e.g. `/tools`) to expose internal status.  
+• `POST /reload` re-reads `config/config.yaml` and rebuilds the cached graphs
+  without restarting the process.
 
 Running locally
 ---------------
@@ -33,50 +77,347 @@ Running locally
 uvicorn main:app --reload
 ```
 """
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from utils.config_loader import load_config
+from fastapi import FastAPI, Request
 from pydantic import BaseModel
-from agent.agentic_workflow import GraphBuilder
-from fastapi.responses import JSONResponse
-import os
+from agent.graph_registry import graph_registry
+from agent.agentic_workflow import LEG_TAG
+from agent.graph_render import graph_renderer
+from agent.job_runner import JobRunner
+from utils.http_client import aclose_async_client, close_session
+from utils.persistent_cache import place_cache
+from utils.response_cache import normalize_question, response_cache
+from utils.admission import AdmissionRejected, admission
+from utils.cache import AsyncSingleFlight
+from utils.job_store import build_job_store
+from utils.tracing import TRACING_ENABLED, record_cache, start_trace
+from utils.metrics import (CONTENT_TYPE as METRICS_CONTENT_TYPE, COALESCED_REQUESTS, HTTP_IN_FLIGHT, HTTP_LATENCY,
+                           HTTP_REQUESTS, registry)
+from logger.logging import get_logger, preview
+from fastapi.responses import JSONResponse, Response, PlainTextResponse, StreamingResponse
+from fastapi.concurrency import run_in_threadpool
+from starlette.background import BackgroundTask
+from starlette.routing import Match
+from typing import Literal
+import json
+import time
 import traceback
 
-app = FastAPI()
+MODEL_PROVIDER = load_config().get("agent", {}).get("model_provider", "openai")
+TIMING_HEADER = load_config().get("tracing", {}).get("timing_header", False)
+SHORT_QUERY_CHARS = load_config().get("admission", {}).get("short_query_chars", 120)
+
+logger = get_logger(__name__)
+
+JOBS_CONFIG = load_config().get("jobs", {})
+job_runner = JobRunner(build_job_store(JOBS_CONFIG), workers=JOBS_CONFIG.get("workers", 4),
+                       model_provider=MODEL_PROVIDER, stale_seconds=JOBS_CONFIG.get("stale_seconds", 600))
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Build the agent once per worker before the first request arrives
+    await run_in_threadpool(graph_registry.warm_up, [MODEL_PROVIDER])
+    await job_runner.start()
+    yield
+    await job_runner.stop()
+    await aclose_async_client()
+    close_session()
+
+
+app = FastAPI(lifespan=lifespan)
+
+
+def _route_path(request: Request) -> str:
+    """Route template (e.g. "/query") used as the metrics label, never the raw URL."""
+    for route in app.router.routes:
+        match, _ = route.matches(request.scope)
+        if match == Match.FULL:
+            return route.path
+    return "unmatched"
+
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    # For streaming responses this measures time to the first byte
+    path = _route_path(request)
+    started = time.perf_counter()
+    status = 500
+    with HTTP_IN_FLIGHT.track_inprogress(path):
+        try:
+            response = await call_next(request)
+            status = response.status_code
+            return response
+        finally:
+            HTTP_LATENCY.observe(time.perf_counter() - started, path)
+            HTTP_REQUESTS.inc(path, str(status))
 
 
 
 class QueryRequest(BaseModel):
     question: str
 
+
+def _cache_mode(request: Request) -> str:
+    """"use" (read + write), "refresh" (write only) or "bypass" (neither)."""
+    cache_control = request.headers.get("cache-control", "").lower()
+    if request.headers.get("x-cache-bypass", "").lower() in ("1", "true", "yes") or "no-store" in cache_control:
+        return "bypass"
+    if "no-cache" in cache_control:
+        return "refresh"
+    return "use"
+
+
+def _wants_timing(request: Request) -> bool:
+    requested = request.headers.get("x-timing", "").lower() in ("1", "true", "yes")
+    return TRACING_ENABLED and (TIMING_HEADER or requested)
+
+
+def _cache_headers(hit) -> dict:
+    headers = {"X-Cache": "HIT", "X-Cache-Match": hit.match, "Age": str(int(hit.age_seconds))}
+    if hit.similarity is not None:
+        headers["X-Cache-Similarity"] = f"{hit.similarity:.3f}"
+    return headers
+
+
+def _lane(question: str) -> str:
+    """Admission lane: short questions are cheap to plan, so they go first."""
+    return "short" if len(question) <= SHORT_QUERY_CHARS else "normal"
+
+
+def _overloaded(error: AdmissionRejected) -> JSONResponse:
+    return JSONResponse(status_code=503, content={"error": str(error), "reason": error.reason},
+                        headers={"Retry-After": str(error.retry_after)})
+
+
+_agent_runs = AsyncSingleFlight()
+
+
+async def _run_agent(question: str) -> str:
+    """Run the shared graph for `question` once a slot is admitted."""
+    async with admission.admit(_lane(question)):
+        react_app = graph_registry.get(MODEL_PROVIDER)
+
+        # Assuming request is a pydantic object like: {"question": "your text"}
+        messages={"messages": [question]}
+        output = await react_app.ainvoke(messages)
+
+    # If result is dict with messages:
+    if isinstance(output, dict) and "messages" in output:
+        return output["messages"][-1].content  # Last AI response
+    return str(output)
+
+
+async def _answer(question: str, coalesce: bool = True) -> str:
+    """`_run_agent`, shared by concurrent requests for the same (normalised) question."""
+    if not coalesce:
+        return await _run_agent(question)
+    leader = False
+
+    def run():
+        nonlocal leader
+        leader = True
+        return _run_agent(question)
+
+    # Exact normalised text: slot keys would merge different questions about one place
+    answer = await _agent_runs.do(normalize_question(question), run)
+    if not leader:
+        COALESCED_REQUESTS.inc()
+    return answer
+
+
 @app.post("/query")
-async def query_travel_agent(query:QueryRequest):
+async def query_travel_agent(query:QueryRequest, request: Request, response: Response):
 
     try:
-        print(query)
-        graph = GraphBuilder(model_provider="openai")
-        react_app=graph()
-        
-        png_graph = react_app.get_graph().draw_mermaid_png()
-        with open("my_graph.png", "wb") as f:
-            f.write(png_graph)
-
-        print(f"Graph saved as 'my_graph.png' in {os.getcwd()}")
-        
-        # Assuming request is a pydantic object like: {"question": "your text"}
-        messages={"messages": [query.question]}
-        output = react_app.invoke(messages)
-
-        # If result is dict with messages:
-        if isinstance(output, dict) and "messages" in output:
-            final_output = output["messages"][-1].content  # Last AI response
-        else:
-            final_output = str(output)
-        
-        return {"answer": final_output}
+        logger.info("Received /query request")
+        logger.debug("Question: %s", preview(query.question))
+        cache_mode = _cache_mode(request)
+        with start_trace("POST /query", **{"cache.mode": cache_mode}) as trace:
+            try:
+                if cache_mode == "use":
+                    hit = await response_cache.aget(query.question)
+                    record_cache("response", "hit" if hit is not None else "miss")
+                    if hit is not None:
+                        response.headers.update(_cache_headers(hit))
+                        return {"answer": hit.answer}
+
+                final_output = await _answer(query.question, coalesce=cache_mode != "bypass")
+
+                if cache_mode != "bypass":
+                    await response_cache.aset(query.question, final_output)
+                response.headers["X-Cache"] = "MISS" if cache_mode == "use" else "BYPASS"
+                return {"answer": final_output}
+            finally:
+                if trace is not None and _wants_timing(request):
+                    response.headers["X-Timing"] = trace.summary()
+    except AdmissionRejected as e:
+        logger.warning("Rejected /query request: %s", e.reason)
+        return _overloaded(e)
     except Exception as e:
         # Capture full traceback for easier debugging
         tb_str = traceback.format_exc()
-        # Log traceback to stdout which uvicorn will capture
-        print("Error while handling /query request:\n", tb_str)
+        logger.exception("Error while handling /query request")
+        return JSONResponse(status_code=500, content={"error": str(e), "traceback": tb_str})
+
+
+
+def _sse(event: str, data: dict) -> str:
+    """Encode one Server-Sent Event frame."""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+def _text(content) -> str:
+    # Chat chunks carry either a plain string or a list of content blocks
+    if isinstance(content, str):
+        return content
+    if isinstance(content, list):
+        return "".join(block.get("text", "") if isinstance(block, dict) else str(block) for block in content)
+    return str(content)
+
+
+async def _stream_agent_events(question: str, ticket, store: bool = True, timing: bool = False):
+    """Translate LangGraph `astream_events` into SSE frames for the client.
+
+    `ticket` is the admission slot taken by the handler; it is released when
+    the stream ends.
+    """
+    try:
+        with start_trace("POST /query/stream") as trace:
+            react_app = graph_registry.get(MODEL_PROVIDER)
+            final_output = ""
+            async for event in react_app.astream_events({"messages": [question]}, version="v2"):
+                kind = event["event"]
+                if kind == "on_chat_model_stream" and LEG_TAG not in event.get("tags", []):
+                    # Tokens of parallel trip legs would interleave; only the merged plan is streamed
+                    token = _text(event["data"]["chunk"].content)
+                    if token:
+                        yield _sse("token", {"content": token})
+                elif kind == "on_tool_start":
+                    yield _sse("tool_start", {"tool": event["name"], "input": event["data"].get("input")})
+                elif kind == "on_tool_end":
+                    output = event["data"].get("output")
+                    yield _sse("tool_end", {"tool": event["name"], "output": _text(getattr(output, "content", output))[:500]})
+                elif kind == "on_chain_end" and not event.get("parent_ids"):
+                    # Root graph finished – its output holds the full message history
+                    output = event["data"].get("output")
+                    if isinstance(output, dict) and output.get("messages"):
+                        final_output = _text(output["messages"][-1].content)
+            if store:
+                await response_cache.aset(question, final_output)
+            final = {"answer": final_output}
+            if timing and trace is not None:
+                final["timing"] = trace.summary()
+        yield _sse("final", final)
+    except Exception as e:
+        logger.exception("Error while handling /query/stream request")
+        yield _sse("error", {"error": str(e)})
+    finally:
+        ticket.release()
+
+
+@app.post("/query/stream")
+async def stream_travel_agent(query: QueryRequest, request: Request):
+    """Stream LLM tokens and tool progress as Server-Sent Events."""
+    headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    cache_mode = _cache_mode(request)
+    if cache_mode == "use":
+        hit = await response_cache.aget(query.question)
+        if hit is not None:
+            async def cached_events():
+                yield _sse("final", {"answer": hit.answer})
+
+            return StreamingResponse(cached_events(), media_type="text/event-stream",
+                                     headers={**headers, **_cache_headers(hit)})
+    headers["X-Cache"] = "MISS" if cache_mode == "use" else "BYPASS"
+    # Admit before streaming starts so overload can still be answered with 503
+    try:
+        ticket = await admission.acquire(_lane(query.question))
+    except AdmissionRejected as e:
+        logger.warning("Rejected /query/stream request: %s", e.reason)
+        return _overloaded(e)
+    return StreamingResponse(
+        _stream_agent_events(query.question, ticket, store=cache_mode != "bypass", timing=_wants_timing(request)),
+        media_type="text/event-stream",
+        headers=headers,
+        # Also frees the slot if the client disconnects before the stream starts
+        background=BackgroundTask(ticket.release),
+    )
+
+
+@app.post("/jobs", status_code=202)
+async def submit_job(query: QueryRequest):
+    """Enqueue a trip plan and return immediately; poll `GET /jobs/{job_id}` for the result."""
+    job = await job_runner.submit(query.question)
+    logger.info("Queued job %s", job.id)
+    return {"job_id": job.id, "status": job.status, "status_url": f"/jobs/{job.id}"}
+
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    """Status, progress lines and – once finished – the answer (or error) of a job."""
+    job = await job_runner.get(job_id)
+    if job is None:
+        return JSONResponse(status_code=404, content={"error": f"Unknown or expired job {job_id}"})
+    return job.to_dict()
+
+
+@app.get("/metrics")
+async def metrics():
+    """Prometheus scrape endpoint (this worker's metrics)."""
+    return Response(content=registry.render(), media_type=METRICS_CONTENT_TYPE)
+
+
+@app.get("/health")
+async def health():
+    """Liveness probe – the worker is up and serving requests."""
+    return {"status": "ok"}
+
+
+@app.get("/ready")
+async def ready():
+    """Readiness probe – ready once the shared graph has been compiled."""
+    if graph_registry.is_warm(MODEL_PROVIDER):
+        return {"status": "ready", "graphs": [list(key) for key in graph_registry.keys()]}
+    return JSONResponse(status_code=503, content={"status": "warming_up"})
+
+
+@app.get("/cache/stats")
+async def cache_stats():
+    """Hit / miss / refresh counters of the on-disk place-search cache (this worker; see also `/metrics`)."""
+    return {"place_cache": place_cache.stats()}
+
+@app.post("/reload")
+async def reload_agent():
+    """Rebuild the cached graphs from the current `config/config.yaml`."""
+    try:
+        rebuilt = await run_in_threadpool(graph_registry.reload)
+        return {"reloaded": [{"provider": provider, "model_name": model_name} for provider, model_name in rebuilt]}
+    except Exception as e:
+        tb_str = traceback.format_exc()
+        logger.exception("Error while handling /reload request")
+        return JSONResponse(status_code=500, content={"error": str(e), "traceback": tb_str})
+
+
+@app.get("/graph")
+async def get_agent_graph(format: Literal["png", "mermaid"] = "png"):
+    """Serve the agent topology, rendered once per distinct graph structure.
+
+    If the PNG cannot be rendered (e.g. no outbound access to the Mermaid
+    renderer) the Mermaid source is returned instead, flagged via the
+    `X-Graph-Fallback` header.
+    """
+    try:
+        react_app = graph_registry.get(MODEL_PROVIDER)
+        rendered = await run_in_threadpool(graph_renderer.render, react_app, format == "png")
+        headers = {"ETag": rendered.graph_hash}
+        if format == "png" and rendered.png is not None:
+            return Response(content=rendered.png, media_type="image/png", headers=headers)
+        if format == "png":
+            headers["X-Graph-Fallback"] = "mermaid"
+        return PlainTextResponse(content=rendered.mermaid, headers=headers)
+    except Exception as e:
+        tb_str = traceback.format_exc()
+        logger.exception("Error while handling /graph request")
         return JSONResponse(status_code=500, content={"error": str(e), "traceback": tb_str})
-    
-    
\ No newline at end of file
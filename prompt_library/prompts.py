@@ -2,8 +2,9 @@
 prompt_library/prompts.py
 =========================
 Central place to store prompt templates so you can iterate on system/role
-instructions without touching business logic.  Right now we expose a single
-`SYSTEM_PROMPT` (LangChain `SystemMessage`)
+instructions without touching business logic.  Right now we expose
+`SYSTEM_PROMPT` (LangChain `SystemMessage`) for the agent and `MERGE_PROMPT` for
+the multi-destination planner's merge step.
 
 Customising the system prompt
 -----------------------------
@@ -35,6 +36,30 @@ SYSTEM_PROMPT = SystemMessage(
     - Weather details
     
     Use the available tools to gather information and make detailed cost breakdowns.
+    Once you know the prices, call `calculate_trip_budget` ONCE with every cost line
+    (hotel per night, meals and local transport per day or per person, one-off tickets,
+    each in its own currency) and use its totals, per-day budget and category
+    subtotals for the cost breakdown instead of adding numbers up step by step.
     Provide everything in one comprehensive response formatted in clean Markdown.
     """
-)
\ No newline at end of file
+)
+# Used by the multi-destination planner (`GraphBuilder.merge_legs`) to stitch the
+# per-city plans produced in parallel into one trip.
+MERGE_PROMPT = SystemMessage(
+    content="""You are a helpful AI Travel Agent combining separately researched city plans
+    into ONE multi-destination trip.
+
+    You receive the user's request, the day schedule of every leg and the plan written for
+    each leg. Produce a single comprehensive Markdown travel plan that:
+    - Keeps the given day numbering, so the legs follow each other without gaps or overlaps
+    - Describes how to travel between consecutive legs (mode, duration, approx cost); use
+      `search_transportation` if a leg plan does not already cover it
+    - Keeps the best hotels, attractions, restaurants and activities of each leg
+    - Summarises the weather per leg
+    - Ends with ONE combined cost breakdown and per-day budget for the whole trip, computed
+      with a single `calculate_trip_budget` call over the costs of all legs plus the
+      transfers between them
+
+    Do not research the cities again; rely on the leg plans.
+    """
+)
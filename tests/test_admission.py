@@ -0,0 +1,77 @@
+import asyncio
+
+import pytest
+
+from utils.admission import AdmissionController, AdmissionRejected
+
+
+def test_lanes_are_served_in_priority_order():
+    controller = AdmissionController(max_concurrent=1, max_queue=8)
+    order = []
+
+    async def run(lane):
+        async with controller.admit(lane):
+            order.append(lane)
+            await asyncio.sleep(0.01)
+
+    async def main():
+        first = await controller.acquire("batch")
+        waiters = [asyncio.create_task(run(lane)) for lane in ("batch", "normal", "short", "normal")]
+        await asyncio.sleep(0.01)
+        first.release()
+        await asyncio.gather(*waiters)
+
+    asyncio.run(main())
+    assert order == ["short", "normal", "normal", "batch"]
+
+
+def test_queue_timeout_is_rejected_with_retry_after():
+    controller = AdmissionController(max_concurrent=1, queue_timeout_seconds=0.05, initial_run_seconds=10)
+
+    async def main():
+        await controller.acquire()
+        with pytest.raises(AdmissionRejected) as rejected:
+            await controller.acquire("short")
+        return rejected.value
+
+    rejected = asyncio.run(main())
+    assert rejected.reason == "queue_timeout"
+    # One run of ~10s ahead of a newcomer, on a single slot
+    assert rejected.retry_after == 10
+    assert controller.queue_depth() == 0
+
+
+def test_full_queue_is_rejected_immediately():
+    controller = AdmissionController(max_concurrent=1, max_queue=1, initial_run_seconds=4, max_retry_after=5)
+
+    async def main():
+        await controller.acquire()
+        waiter = asyncio.create_task(controller.acquire())
+        await asyncio.sleep(0)
+        with pytest.raises(AdmissionRejected) as rejected:
+            await controller.acquire()
+        waiter.cancel()
+        return rejected.value
+
+    rejected = asyncio.run(main())
+    assert rejected.reason == "queue_full"
+    # (1 queued + 1) * 4s is capped by max_retry_after
+    assert rejected.retry_after == 5
+
+
+def test_ticket_release_is_idempotent():
+    controller = AdmissionController(max_concurrent=2)
+
+    async def main():
+        ticket = await controller.acquire()
+        await controller.acquire()
+        ticket.release()
+        ticket.release()
+
+    asyncio.run(main())
+    assert controller.active == 1
+
+
+def test_unknown_lane_is_an_error():
+    with pytest.raises(ValueError):
+        asyncio.run(AdmissionController().acquire("urgent"))
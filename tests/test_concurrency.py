@@ -0,0 +1,68 @@
+import asyncio
+import threading
+import time
+
+from utils.concurrency import ProviderLimiter
+
+
+class Peak:
+    """Tracks the most callers inside a block at once."""
+
+    def __init__(self):
+        self.active = self.peak = 0
+        self._lock = threading.Lock()
+
+    def enter(self):
+        with self._lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+
+    def leave(self):
+        with self._lock:
+            self.active -= 1
+
+
+def test_threads_and_event_loops_share_one_budget():
+    limiter, peak = ProviderLimiter({"google_places": 2}), Peak()
+
+    def call_in_thread():
+        with limiter.limit("google_places"):
+            peak.enter()
+            time.sleep(0.05)
+            peak.leave()
+
+    async def call_in_task():
+        async with limiter.alimit("google_places"):
+            peak.enter()
+            await asyncio.sleep(0.05)
+            peak.leave()
+
+    async def loop_main():
+        await asyncio.gather(*(call_in_task() for _ in range(4)))
+
+    workers = [threading.Thread(target=call_in_thread) for _ in range(4)]
+    workers += [threading.Thread(target=asyncio.run, args=(loop_main(),)) for _ in range(2)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    assert peak.peak == 2
+
+
+def test_cancelled_waiter_does_not_leak_a_slot():
+    limiter = ProviderLimiter({"google_places": 1})
+
+    async def main():
+        async with limiter.alimit("google_places"):
+            waiter = asyncio.create_task(limiter.alimit("google_places").__aenter__())
+            await asyncio.sleep(0.01)
+            waiter.cancel()
+        await asyncio.wait_for(limiter.alimit("google_places").__aenter__(), timeout=1)
+
+    asyncio.run(main())
+
+
+def test_unlimited_providers_are_not_throttled():
+    limiter = ProviderLimiter({"tavily": None})
+    with limiter.limit("tavily"), limiter.limit("tavily"):
+        pass
@@ -0,0 +1,89 @@
+import asyncio
+
+import pytest
+
+import utils.currency_converter as currency_converter
+from utils.cache import TTLCache
+from utils.currency_converter import CurrencyConverter, ExchangeRateAPIError, UnsupportedCurrencyError
+
+USD_RATES = {"USD": 1.0, "INR": 80.0, "EUR": 0.5, "JPY": 150.0}
+
+
+class FakeResponse:
+    def __init__(self, payload, status_code=200):
+        self.payload, self.status_code = payload, status_code
+        self.text = str(payload)
+
+    def json(self):
+        return self.payload
+
+
+@pytest.fixture
+def calls(monkeypatch):
+    """Serves USD_RATES rebased on the requested currency and records requested URLs and cache results."""
+    calls = {"urls": [], "cache": []}
+
+    def fake_get(url, params=None, **kwargs):
+        calls["urls"].append(url)
+        base = url.rsplit("/", 1)[-1]
+        if base not in USD_RATES:
+            return FakeResponse({"result": "error", "error-type": "unsupported-code"}, status_code=404)
+        return FakeResponse({"conversion_rates": {code: rate / USD_RATES[base] for code, rate in USD_RATES.items()}})
+
+    async def fake_aget(url, params=None, **kwargs):
+        return fake_get(url, params, **kwargs)
+
+    monkeypatch.setattr(currency_converter, "get", fake_get)
+    monkeypatch.setattr(currency_converter, "aget", fake_aget)
+    monkeypatch.setattr(currency_converter, "record_cache", lambda cache, status: calls["cache"].append(status))
+    return calls
+
+
+@pytest.fixture
+def converter():
+    return CurrencyConverter("key", rate_tables=TTLCache(ttl_seconds=60))
+
+
+def test_cross_rates_come_from_one_cached_table(converter, calls):
+    assert converter.convert(100, "usd", "INR") == pytest.approx(8000)
+    # EUR -> JPY is derived from the USD table: 150 / 0.5
+    assert converter.convert(2, "EUR", "JPY") == pytest.approx(600)
+    assert converter.convert(5, "INR", "INR") == 5
+    assert len(calls["urls"]) == 1
+    assert calls["cache"] == ["miss", "hit", "hit"]
+
+
+def test_convert_many_downloads_the_most_requested_base_once(converter, calls):
+    results = converter.convert_many([
+        {"amount": 1, "from_currency": "EUR", "to_currency": "INR"},
+        {"amount": 1, "from_currency": "EUR", "to_currency": "USD"},
+        {"amount": 300, "from_currency": "JPY", "to_currency": "USD"},
+    ])
+    assert results == pytest.approx([160, 2, 2])
+    assert [url.rsplit("/", 1)[-1] for url in calls["urls"]] == ["EUR"]
+
+
+def test_aconvert_many_matches_the_sync_path(converter, calls):
+    results = asyncio.run(converter.aconvert_many([{"amount": 10, "from_currency": "USD", "to_currency": "EUR"}]))
+    assert results == pytest.approx([5])
+
+
+def test_unsupported_code_on_a_cached_table_is_a_hit(converter, calls):
+    converter.convert(1, "USD", "INR")
+    with pytest.raises(UnsupportedCurrencyError) as error:
+        converter.convert(1, "USD", "XYZ")
+    assert error.value.currencies == ["XYZ"]
+    assert calls["cache"] == ["miss", "hit"]
+    assert len(calls["urls"]) == 1
+
+
+def test_unsupported_base_without_a_cached_table(converter, calls):
+    with pytest.raises(UnsupportedCurrencyError):
+        converter.convert(1, "XYZ", "USD")
+
+
+def test_api_errors_name_the_failure(converter, monkeypatch):
+    monkeypatch.setattr(currency_converter, "get",
+                        lambda url, **kwargs: FakeResponse({"result": "error", "error-type": "invalid-key"}, 403))
+    with pytest.raises(ExchangeRateAPIError, match="HTTP 403: invalid-key"):
+        converter.convert(1, "USD", "INR")
@@ -0,0 +1,57 @@
+import os
+import threading
+import time
+
+import pytest
+
+from utils.job_store import QUEUED, RUNNING, SUCCEEDED, InMemoryJobStore, Job, SQLiteJobStore
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path):
+    if request.param == "sqlite":
+        return SQLiteJobStore(os.path.join(tmp_path, "jobs.sqlite3"))
+    return InMemoryJobStore()
+
+
+def test_progress_and_result_round_trip(store):
+    job = store.create(Job.new("Plan Goa"))
+    store.update(job.id, progress="Calling tools: get_current_weather")
+    store.update(job.id, status=SUCCEEDED, answer="Pack sunscreen")
+    stored = store.get(job.id)
+    assert (stored.status, stored.answer) == (SUCCEEDED, "Pack sunscreen")
+    assert stored.progress == ["Calling tools: get_current_weather"]
+
+
+def test_only_one_claim_wins(store):
+    job = store.create(Job.new("Plan Goa"))
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(store.claim(job.id))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results.count(True) == 1
+    assert store.get(job.id).status == RUNNING
+    assert not store.claim("missing")
+
+
+def test_requeue_stale_leaves_live_runs_alone(store):
+    stale, live, waiting = (store.create(Job.new(question)) for question in ("stale", "live", "waiting"))
+    store.claim(stale.id)
+    time.sleep(0.2)
+    store.claim(live.id)
+    queued = store.requeue_stale(stale_seconds=0.1)
+    assert {job.id for job in queued} == {stale.id, waiting.id}
+    assert store.get(stale.id).status == QUEUED
+    assert store.get(live.id).status == RUNNING
+    # A re-queued job can be claimed again
+    assert store.claim(stale.id)
+
+
+def test_finished_jobs_expire(store):
+    store.ttl_seconds = 0.1
+    job = store.create(Job.new("Plan Goa"))
+    store.update(job.id, status=SUCCEEDED, answer="done")
+    time.sleep(0.2)
+    assert store.get(job.id) is None
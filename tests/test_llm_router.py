@@ -0,0 +1,90 @@
+import asyncio
+import time
+from typing import List
+
+import pytest
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, HumanMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+from utils.fake_chat_model import FakeRateLimitError
+from utils.llm_router import LLMRouter, turn_kind
+
+
+class StreamingModel(BaseChatModel):
+    """Streams `tokens`, raising a 429 after `fail_after` of them (never if None)."""
+    tokens: List[str]
+    fail_after: int = None
+    delay: float = 0.0
+
+    @property
+    def _llm_type(self) -> str:
+        return "streaming-test"
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        time.sleep(self.delay)
+        if self.fail_after is not None:
+            raise FakeRateLimitError("rate limited")
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content="".join(self.tokens)))])
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs):
+        for index, token in enumerate(self.tokens):
+            if index == self.fail_after:
+                raise FakeRateLimitError("rate limited")
+            await asyncio.sleep(self.delay)
+            yield ChatGenerationChunk(message=AIMessageChunk(content=token))
+        if self.fail_after is not None and self.fail_after >= len(self.tokens):
+            raise FakeRateLimitError("rate limited")
+
+
+def _router(**models) -> LLMRouter:
+    return LLMRouter(models=models, providers=list(models), strategy="ordered", timeout_seconds=0.5)
+
+
+async def _streamed_text(router: LLMRouter) -> str:
+    tokens = []
+    async for event in router.astream_events([HumanMessage(content="hi")], version="v2"):
+        if event["event"] == "on_chat_model_stream":
+            tokens.append(event["data"]["chunk"].content)
+    return "".join(tokens)
+
+
+def test_fails_over_before_the_first_token():
+    router = _router(flaky=StreamingModel(tokens=["alpha "], fail_after=0),
+                     backup=StreamingModel(tokens=["one ", "two"]))
+    assert asyncio.run(_streamed_text(router)) == "one two"
+
+
+def test_does_not_fail_over_after_a_token_was_streamed():
+    router = _router(flaky=StreamingModel(tokens=["alpha ", "beta "], fail_after=2),
+                     backup=StreamingModel(tokens=["one ", "two"]))
+    with pytest.raises(FakeRateLimitError):
+        asyncio.run(_streamed_text(router))
+
+
+def test_sync_calls_enforce_the_timeout():
+    router = _router(slow=StreamingModel(tokens=["late"], delay=2.0), backup=StreamingModel(tokens=["fast"]))
+    started = time.perf_counter()
+    message = router.invoke([HumanMessage(content="hi")])
+    assert message.content == "fast"
+    assert message.response_metadata["router_provider"] == "backup"
+    assert time.perf_counter() - started < 1.5
+
+
+def test_turn_kind_follows_pending_tool_calls():
+    call = {"name": "search_attractions", "args": {}, "id": "1"}
+    asked = [HumanMessage(content="Plan Goa"), AIMessage(content="", tool_calls=[call, {**call, "id": "2"}])]
+    assert turn_kind([HumanMessage(content="Plan Goa")]) == "route"
+    assert turn_kind([*asked, ToolMessage(content="{}", tool_call_id="1")]) == "route"
+    assert turn_kind([*asked, ToolMessage(content="{}", tool_call_id="1"),
+                      ToolMessage(content="{}", tool_call_id="2")]) == "answer"
+
+
+def test_turns_pick_their_own_providers():
+    router = _router(cheap=StreamingModel(tokens=["cheap"]), strong=StreamingModel(tokens=["strong"]))
+    router.turns = {"route": {"providers": ["cheap"]}, "answer": {"providers": ["strong"]}}
+    call = {"name": "search_attractions", "args": {}, "id": "1"}
+    question = [HumanMessage(content="Plan Goa")]
+    answered = [*question, AIMessage(content="", tool_calls=[call]), ToolMessage(content="{}", tool_call_id="1")]
+    assert router.invoke(question).content == "cheap"
+    assert router.invoke(answered).content == "strong"
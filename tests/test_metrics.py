@@ -0,0 +1,65 @@
+import threading
+
+import pytest
+
+from utils.metrics import MetricsRegistry
+
+
+def test_counter_renders_sorted_escaped_series():
+    registry = MetricsRegistry()
+    calls = registry.counter("tool_calls_total", "Tool calls.", ("tool", "status"))
+    calls.inc("search_restaurants", "ok")
+    calls.inc("search_attractions", "ok", amount=2)
+    calls.inc('say "hi"\n', "error")
+    assert registry.render().splitlines() == [
+        "# HELP tool_calls_total Tool calls.",
+        "# TYPE tool_calls_total counter",
+        'tool_calls_total{tool="say \\"hi\\"\\n",status="error"} 1',
+        'tool_calls_total{tool="search_attractions",status="ok"} 2',
+        'tool_calls_total{tool="search_restaurants",status="ok"} 1',
+    ]
+
+
+def test_shards_from_every_thread_are_summed():
+    registry = MetricsRegistry()
+    requests = registry.counter("requests_total", "Requests.")
+    threads = [threading.Thread(target=lambda: [requests.inc() for _ in range(100)]) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    requests.inc()
+    assert "requests_total 401" in registry.render().splitlines()
+
+
+def test_gauge_callbacks_are_read_at_scrape_time():
+    registry = MetricsRegistry()
+    depth = registry.gauge("queue_depth", "Queued runs.", ("lane",))
+    queued = {"short": 1}
+    depth.set_function(lambda: queued["short"], "short")
+    queued["short"] = 3
+    assert 'queue_depth{lane="short"} 3' in registry.render()
+
+
+def test_histogram_buckets_are_cumulative_and_inclusive():
+    registry = MetricsRegistry()
+    latency = registry.histogram("latency_seconds", "Latency.", ("node",), buckets=(0.1, 1.0))
+    for seconds in (0.05, 0.1, 0.5, 3.0):
+        latency.observe(seconds, "agent")
+    assert registry.render().splitlines()[2:] == [
+        'latency_seconds_bucket{node="agent",le="0.1"} 2',
+        'latency_seconds_bucket{node="agent",le="1"} 3',
+        'latency_seconds_bucket{node="agent",le="+Inf"} 4',
+        'latency_seconds_sum{node="agent"} 3.65',
+        'latency_seconds_count{node="agent"} 4',
+    ]
+
+
+def test_re_registration_returns_the_same_metric_or_fails():
+    registry = MetricsRegistry()
+    calls = registry.counter("calls_total", "Calls.", ("tool",))
+    assert registry.counter("calls_total", "Calls.", ("tool",)) is calls
+    with pytest.raises(ValueError):
+        registry.gauge("calls_total", "Calls.", ("tool",))
+    with pytest.raises(ValueError):
+        calls.inc("a", "b")
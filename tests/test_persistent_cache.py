@@ -0,0 +1,101 @@
+import asyncio
+import os
+import threading
+import time
+
+import pytest
+
+from utils.concurrency import ProviderLimiter
+from utils.metrics import PLACE_CACHE_EVENTS
+from utils.persistent_cache import PersistentCache
+
+
+@pytest.fixture
+def limiter():
+    return ProviderLimiter({"google_places": 1})
+
+
+@pytest.fixture
+def cache(tmp_path, limiter):
+    return PersistentCache(os.path.join(tmp_path, "places.sqlite3"), {"default": 60}, stale_ttl_seconds=600,
+                           limiter=limiter, limiter_keys={"google": "google_places"})
+
+
+def _count_reads(cache):
+    reads = []
+    read = cache._read
+    cache._read = lambda key: reads.append(key) or read(key)
+    return reads
+
+
+def test_miss_then_hit(cache):
+    assert cache.get_or_fetch("google.v2", "attractions", "Goa", lambda: ["Fort"]) == ["Fort"]
+    assert cache.get_or_fetch("google.v2", "attractions", " goa ", lambda: pytest.fail("refetched")) == ["Fort"]
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1 and cache.stats()["writes"] == 1
+
+
+def test_useless_results_are_not_stored(cache):
+    cache.get_or_fetch("google.v2", "attractions", "Goa", lambda: [])
+    assert cache.get("google.v2", "attractions", "Goa", lambda: []) is None
+
+
+def test_lookup_false_skips_the_second_read(cache):
+    reads = _count_reads(cache)
+    assert cache.get("google.v2", "attractions", "Goa", lambda: ["Fort"]) is None
+    cache.get_or_fetch("google.v2", "attractions", "Goa", lambda: ["Fort"], lookup=False)
+    assert len(reads) == 1
+
+
+def test_concurrent_misses_share_one_fetch(cache):
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        time.sleep(0.2)
+        return ["Fort"]
+
+    threads = [threading.Thread(target=cache.get_or_fetch, args=("google.v2", "attractions", "Goa", fetch))
+               for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(calls) == 1
+
+
+def test_concurrent_async_misses_share_one_fetch(cache):
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.1)
+        return ["Fort"]
+
+    async def main():
+        return await asyncio.gather(*(cache.aget_or_fetch("google.v2", "attractions", "Goa", fetch)
+                                      for _ in range(4)))
+
+    assert asyncio.run(main()) == [["Fort"]] * 4
+    assert len(calls) == 1
+
+
+def test_stale_refresh_holds_the_provider_slot(cache, limiter):
+    cache.get_or_fetch("google.v2", "attractions", "Goa", lambda: ["Old"])
+    cache.ttl_seconds["default"] = 0
+    refreshed = threading.Event()
+
+    def fetch():
+        refreshed.set()
+        return ["New"]
+
+    with limiter.limit("google_places"):
+        assert cache.get("google.v2", "attractions", "Goa", fetch) == ["Old"]
+        # The only google_places slot is held here, so the refresh must wait for it
+        assert not refreshed.wait(0.2)
+    assert refreshed.wait(2)
+
+
+def test_events_are_exported_as_metrics(cache):
+    before = PLACE_CACHE_EVENTS.values().get(("google", "restaurants", "miss"), 0)
+    cache.get_or_fetch("google.v2", "restaurants", "Goa", lambda: ["Cafe"])
+    assert PLACE_CACHE_EVENTS.values()[("google", "restaurants", "miss")] == before + 1
@@ -0,0 +1,79 @@
+import pytest
+
+from utils.response_cache import Leg, cache_slots, extract_legs, extract_slots
+
+
+@pytest.mark.parametrize("question", [
+    "Plan a trip to Paris, France for 5 days",
+    "7 day trip to Kerala, India in December",
+    "Plan a trip to New York, NY",
+    "Plan a trip to Washington, D.C.",
+    "I want to go to Bali and relax",
+    "Fly from Delhi to Goa and stay 5 days",
+    "Plan a trip to Saint-Tropez for 4 days",
+])
+def test_single_destination_is_not_split_into_legs(question):
+    assert extract_legs(question) == []
+
+
+@pytest.mark.parametrize("question, legs", [
+    ("10 days across Rome, Florence and Venice", [Leg("rome", 4), Leg("florence", 3), Leg("venice", 3)]),
+    ("3 days in Rome, 4 in Florence and 3 in Venice", [Leg("rome", 3), Leg("florence", 4), Leg("venice", 3)]),
+    ("Plan 6 days in Paris, France and Rome, Italy", [Leg("paris", 3), Leg("rome", 3)]),
+    ("Trip to Austin, TX and Denver, CO for 6 days", [Leg("austin", 3), Leg("denver", 3)]),
+    ("Visit Tokyo -> Kyoto -> Osaka in 9 days", [Leg("tokyo", 3), Leg("kyoto", 3), Leg("osaka", 3)]),
+    ("9 days across Mumbai, Goa and Kerala", [Leg("mumbai", 3), Leg("goa", 3), Leg("kerala", 3)]),
+])
+def test_multi_city_legs(question, legs):
+    assert extract_legs(question) == legs
+
+
+def test_city_region_pair_keeps_one_slot_destination():
+    slots = extract_slots("Plan a trip to Paris, France for 5 days")
+    assert (slots.destination, slots.days) == ("paris", 5)
+
+
+@pytest.mark.parametrize("question", ["I want to go to Bali and relax", "Fly from Delhi to Goa and stay 5 days"])
+def test_verb_fragments_are_not_destinations(question):
+    assert extract_slots(question) is None
+
+
+@pytest.mark.parametrize("question, key", [
+    ("Plan a trip to Goa for 5 days", "slots:goa|5|-|-"),
+    ("Plan a 5 day trip to Goa", "slots:goa|5|-|-"),
+    ("Plan a five day trip to Goa", "slots:goa|5|-|-"),
+    ("Plan a trip to Goa for five nights", "slots:goa|6|-|-"),
+    ("Plan a trip to Goa for a week", "slots:goa|7|-|-"),
+    ("Plan a 2 week trip to Japan", "slots:japan|14|-|-"),
+    ("Plan a weekend in Goa", "slots:goa|2|-|-"),
+    ("Plan a budget trip to Goa for 5 days", "slots:goa|5|budget|-"),
+    ("Plan a budget trip to Goa under $500", "slots:goa|-|amount:500|-"),
+    ("Plan a 5 day trip to Goa next December", "slots:goa|5|-|dec"),
+    ("Plan a trip to Goa for 5 days in may", "slots:goa|5|-|may"),
+    ("Plan 3 days in Rome and 4 days in Florence", "slots:rome+florence|7|-|-"),
+    ("10 days across Rome, Florence and Venice", "slots:rome+florence+venice|10|-|-"),
+])
+def test_plain_trip_requests_are_keyed_by_slots(question, key):
+    slots = cache_slots(question)
+    assert (slots.key() if slots else None) == key
+
+
+@pytest.mark.parametrize("question", [
+    # Alternatives
+    "Plan a trip to Goa or Kerala for 5 days",
+    "Plan a trip to Goa for 5 days maybe 6",
+    "Plan 5 days in Goa/Kerala",
+    # Ranges and conflicting durations
+    "5-7 days in Goa",
+    "Plan a 5 to 7 day trip to Goa",
+    "Plan a 5 day trip to Goa for 7 days",
+    # Conflicting months and budgets
+    "Plan a trip to Goa in March and in April",
+    "Plan a trip to Goa for $500 and $800",
+    "Plan a luxury trip to Goa under $500",
+    # Extra constraints
+    "Plan a trip to Goa with kids",
+    "Weather in Goa for 5 days",
+])
+def test_unsure_or_constrained_questions_fall_back_to_the_exact_key(question):
+    assert cache_slots(question) is None
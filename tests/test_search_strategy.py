@@ -0,0 +1,107 @@
+import asyncio
+import time
+
+import pytest
+
+from utils.concurrency import ProviderLimiter
+from utils.search_strategy import PlaceSearchStrategy
+
+
+class FakeProvider:
+    """Answers `result` after `delay` seconds, or raises `error`."""
+
+    def __init__(self, result=None, delay: float = 0.0, error: Exception = None):
+        self.result, self.delay, self.error = result, delay, error
+        self.calls = 0
+
+    def search(self, category, place):
+        self.calls += 1
+        time.sleep(self.delay)
+        if self.error:
+            raise self.error
+        return self.result
+
+    async def asearch(self, category, place):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.error:
+            raise self.error
+        return self.result
+
+
+def _strategy(google, tavily, strategy, hedge_delay=0.05):
+    search = PlaceSearchStrategy(google, tavily, strategy=strategy, limiter=ProviderLimiter())
+    search.initial_delay = search.min_delay = hedge_delay
+    return search
+
+
+def _run(search, mode):
+    if mode == "async":
+        return asyncio.run(search.asearch("attractions", "Goa"))
+    return search.search("attractions", "Goa")
+
+
+@pytest.fixture(params=["sync", "async"])
+def mode(request):
+    return request.param
+
+
+def test_sequential_uses_tavily_only_after_google_fails(mode):
+    google, tavily = FakeProvider(error=RuntimeError("quota")), FakeProvider({"answer": "t"})
+    outcome = _run(_strategy(google, tavily, "sequential"), mode)
+    assert outcome.provider == "tavily"
+    assert set(outcome.latencies_ms) == {"google", "tavily"}
+    assert "quota" in outcome.errors["google"]
+
+
+def test_sequential_never_calls_tavily_when_google_answers(mode):
+    google, tavily = FakeProvider([{"name": "Fort"}], delay=0.1), FakeProvider({"answer": "t"})
+    outcome = _run(_strategy(google, tavily, "sequential"), mode)
+    assert (outcome.provider, tavily.calls) == ("google", 0)
+
+
+def test_hedged_starts_tavily_after_the_delay(mode):
+    google, tavily = FakeProvider([{"name": "Fort"}], delay=0.3), FakeProvider({"answer": "t"})
+    outcome = _run(_strategy(google, tavily, "hedged"), mode)
+    assert (outcome.provider, tavily.calls) == ("tavily", 1)
+
+
+def test_hedged_skips_tavily_for_a_fast_google(mode):
+    google, tavily = FakeProvider([{"name": "Fort"}]), FakeProvider({"answer": "t"})
+    outcome = _run(_strategy(google, tavily, "hedged", hedge_delay=0.5), mode)
+    assert (outcome.provider, tavily.calls) == ("google", 0)
+
+
+def test_race_starts_both_and_the_first_useful_answer_wins(mode):
+    google, tavily = FakeProvider([], delay=0.0), FakeProvider({"answer": "t"}, delay=0.05)
+    outcome = _run(_strategy(google, tavily, "race"), mode)
+    assert (outcome.provider, google.calls, tavily.calls) == ("tavily", 1, 1)
+    assert outcome.errors == {"google": "no results"}
+
+
+def test_failed_google_calls_are_sampled(mode):
+    search = _strategy(FakeProvider(error=RuntimeError("down")), FakeProvider({"answer": "t"}), "sequential")
+    _run(search, mode)
+    assert len(search.google_latency) == 1
+
+
+def test_losing_google_call_is_sampled_when_it_finishes():
+    search = _strategy(FakeProvider([{"name": "Fort"}], delay=0.3), FakeProvider({"answer": "t"}), "hedged")
+    assert search.search("attractions", "Goa").provider == "tavily"
+    assert len(search.google_latency) == 0
+    time.sleep(0.4)
+    assert search.google_latency.quantile(0.5) >= 0.3
+
+
+def test_cancelled_google_call_is_sampled_at_the_cut_off():
+    search = _strategy(FakeProvider([{"name": "Fort"}], delay=0.3), FakeProvider({"answer": "t"}), "hedged")
+    assert asyncio.run(search.asearch("attractions", "Goa")).provider == "tavily"
+    assert search.google_latency.quantile(0.5) >= 0.05
+
+
+def test_hedge_delay_follows_the_google_p95():
+    search = _strategy(FakeProvider(), FakeProvider(), "hedged")
+    search.min_samples, search.min_delay, search.max_delay = 5, 0.01, 5.0
+    for seconds in (0.1, 0.1, 0.1, 0.1, 2.0):
+        search.google_latency.record(seconds)
+    assert search.backup_delay() == 2.0
@@ -0,0 +1,49 @@
+import json
+
+from utils.message_window import CHARS_PER_TOKEN
+from utils.tool_output import TRUNCATED, ToolOutputBudget
+
+
+def _budget(**per_tool):
+    return ToolOutputBudget({"default": {"max_items": 3, "max_text_chars": 10}, "per_tool": per_tool})
+
+
+def test_items_and_text_are_cut_and_nones_dropped():
+    payload = {"place": "Goa", "answer": "a very long Tavily answer", "rating": None,
+               "items": [{"name": f"Place {index}"} for index in range(5)]}
+    rendered = json.loads(_budget().render("search_attractions", payload))
+    assert rendered == {"place": "Goa", "answer": "a very lon…",
+                        "items": [{"name": "Place 0"}, {"name": "Place 1"}, {"name": "Place 2"}]}
+
+
+def test_per_tool_limits_override_the_default():
+    budget = _budget(search_restaurants={"max_items": 1})
+    assert budget.limits("search_restaurants") == {"max_items": 1, "max_text_chars": 10}
+    assert json.loads(budget.render("search_restaurants", {"items": [1, 2, 3]})) == {"items": [1]}
+
+
+def test_token_budget_drops_the_tail_of_the_longest_list():
+    payload = {"days": [f"day {index}" for index in range(3)], "items": [f"item {index}" for index in range(3)]}
+    budget = ToolOutputBudget({"per_tool": {"get_daily_forecast": {"max_tokens": 15}}})
+    text = budget.render("get_daily_forecast", payload)
+    assert len(text) <= 15 * CHARS_PER_TOKEN
+    rendered = json.loads(text)
+    # Items are dropped from the end, never from the front
+    assert rendered["days"][:1] == ["day 0"] and rendered["items"][:1] == ["item 0"]
+    assert len(rendered["days"]) + len(rendered["items"]) < 6
+
+
+def test_text_that_cannot_shrink_is_truncated_with_a_marker():
+    budget = ToolOutputBudget({"default": {"max_tokens": 5}})
+    text = budget.render("get_current_weather", {"summary": "x" * 200})
+    assert len(text) == 5 * CHARS_PER_TOKEN and text.endswith(TRUNCATED)
+
+
+def test_rendering_is_deterministic():
+    budget = ToolOutputBudget({"default": {"max_tokens": 20}})
+    payload = {"items": [{"name": f"Place {index}", "rating": 4.5} for index in range(20)]}
+    assert budget.render("search", payload) == budget.render("search", payload)
+
+
+def test_no_budget_renders_minified_json():
+    assert ToolOutputBudget().render("search", {"a": [1, 2]}) == '{"a":[1,2]}'
@@ -0,0 +1,31 @@
+import asyncio
+import contextvars
+import os
+
+from utils.tracing import Trace, TraceExporter, current_trace, span, start_trace
+
+
+def test_trace_closed_from_another_context_does_not_raise():
+    async def stream():
+        with start_trace("POST /query/stream"):
+            with span("llm"):
+                yield "token"
+                yield "token"
+
+    async def main():
+        events = stream()
+        await events.__anext__()
+        # Client disconnected: the loop finalises the generator in a fresh context
+        await asyncio.get_running_loop().create_task(events.aclose(), context=contextvars.Context())
+
+    asyncio.run(main())
+    assert current_trace() is None
+
+
+def test_file_exporter_rotates_at_max_bytes(tmp_path):
+    path = os.path.join(tmp_path, "traces.jsonl")
+    exporter = TraceExporter(path=path, max_bytes=2000, backup_count=2)
+    for _ in range(20):
+        exporter._export(Trace("request", {}))
+    assert sorted(os.listdir(tmp_path)) == ["traces.jsonl", "traces.jsonl.1", "traces.jsonl.2"]
+    assert all(os.path.getsize(os.path.join(tmp_path, name)) <= 2000 for name in os.listdir(tmp_path))
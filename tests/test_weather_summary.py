@@ -0,0 +1,56 @@
+from datetime import datetime, timezone
+
+from utils.weather_info import summarize_forecast
+
+IST = 5 * 3600 + 1800
+
+
+def _slot(utc: str, temp=None, pop=0.0, condition=None):
+    slot = {"dt": int(datetime.fromisoformat(utc).replace(tzinfo=timezone.utc).timestamp()), "pop": pop,
+            "main": {} if temp is None else {"temp": temp}}
+    if condition:
+        slot["weather"] = [{"description": condition}]
+    return slot
+
+
+def test_days_follow_the_city_utc_offset():
+    forecast = {"city": {"timezone": IST}, "list": [
+        _slot("2026-01-01T12:00:00", 20, condition="clear sky"),
+        _slot("2026-01-01T18:00:00", 18, pop=0.4, condition="light rain"),  # 23:30 local
+        _slot("2026-01-01T18:30:00", 16, condition="clear sky"),            # 00:00 local, next day
+    ]}
+    days = summarize_forecast(forecast)
+    assert [day["date"] for day in days] == ["2026-01-01", "2026-01-02"]
+    assert days[0] == {"date": "2026-01-01", "min_c": 18.0, "max_c": 20.0, "mean_c": 19.0, "pop_pct": 40,
+                       "condition": "clear sky"}
+    assert days[1]["min_c"] == days[1]["max_c"] == 16.0
+
+
+def test_without_an_offset_days_are_utc():
+    forecast = {"list": [_slot("2026-01-01T23:00:00", 10), _slot("2026-01-02T01:00:00", 12)]}
+    assert [day["date"] for day in summarize_forecast(forecast)] == ["2026-01-01", "2026-01-02"]
+
+
+def test_dominant_condition_ties_go_to_the_alphabetically_first():
+    forecast = {"list": [
+        _slot("2026-01-01T00:00:00", 10, condition="overcast clouds"),
+        _slot("2026-01-01T03:00:00", 10, condition="broken clouds"),
+        _slot("2026-01-01T06:00:00", 10, condition="overcast clouds"),
+        _slot("2026-01-01T09:00:00", 10, condition="broken clouds"),
+        _slot("2026-01-01T12:00:00", 10, condition="light rain"),
+    ]}
+    assert summarize_forecast(forecast)[0]["condition"] == "broken clouds"
+
+
+def test_missing_temperatures_and_conditions_become_none():
+    forecast = {"list": [_slot("2026-01-01T00:00:00"), _slot("2026-01-02T00:00:00", 5.04, condition="snow"),
+                         _slot("2026-01-02T03:00:00")]}
+    first, second = summarize_forecast(forecast)
+    assert (first["min_c"], first["max_c"], first["mean_c"], first["condition"]) == (None, None, None, None)
+    assert first["pop_pct"] == 0
+    assert (second["min_c"], second["mean_c"], second["condition"]) == (5.0, 5.0, "snow")
+
+
+def test_empty_forecast():
+    assert summarize_forecast({}) == []
+    assert summarize_forecast({"list": []}) == []
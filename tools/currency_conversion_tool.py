@@ -1,8 +1,11 @@
 """
 tools/currency_conversion_tool.py
 ================================
-Provides a single `convert_currency` LangChain tool that turns an amount from
-one currency into another using *ExchangeRate-API*.
+Provides LangChain tools that turn amounts from one currency into another using
+*ExchangeRate-API*:
+• `convert_currency` – a single amount.
+• `convert_currencies` – a batch of amounts in one call; the whole batch costs at
+  most one rate-table download (see `utils/currency_converter.py`).
 
 Configuration
 -------------
@@ -11,17 +14,25 @@ your cloud secret manager) before running the agent.
 
 Extending
 ---------
-If you’d like to support bulk conversions or display the exchange rate table:
+If you’d like to expose more helpers (e.g. display the exchange rate table):
 1. Expand `utils/currency_converter.py` with a new helper method.
-2. Add an `@tool` decorated callable inside `_setup_tools()` that wraps the new
-   helper.
+2. Add a callable (plus an async twin) inside `_setup_tools()` that wraps the
+   new helper and register it with `StructuredTool.from_function`.
 """
 import os
 from utils.currency_converter import CurrencyConverter
 from typing import List
-from langchain.tools import tool
+from pydantic import BaseModel
+from langchain_core.tools import StructuredTool
 from dotenv import load_dotenv
 
+
+class CurrencyConversion(BaseModel):
+    amount: float
+    from_currency: str
+    to_currency: str
+
+
 class CurrencyConverterTool:
     def __init__(self):
         load_dotenv()
@@ -31,9 +42,25 @@ class CurrencyConverterTool:
 
     def _setup_tools(self) -> List:
         """Setup all tools for the currency converter tool"""
-        @tool
         def convert_currency(amount:float, from_currency:str, to_currency:str):
             """Convert amount from one currency to another"""
             return self.currency_service.convert(amount, from_currency, to_currency)
+
+        async def aconvert_currency(amount:float, from_currency:str, to_currency:str):
+            return await self.currency_service.aconvert(amount, from_currency, to_currency)
         
-        return [convert_currency]
\ No newline at end of file
+        def convert_currencies(conversions: List[CurrencyConversion]) -> List[float]:
+            """Convert several amounts at once; prefer this over repeated convert_currency calls"""
+            return self.currency_service.convert_many([self._as_dict(c) for c in conversions])
+
+        async def aconvert_currencies(conversions: List[CurrencyConversion]) -> List[float]:
+            return await self.currency_service.aconvert_many([self._as_dict(c) for c in conversions])
+        
+        return [StructuredTool.from_function(func=convert_currency, coroutine=aconvert_currency,
+                                              metadata={"provider": "exchangerate_api"}),
+                StructuredTool.from_function(func=convert_currencies, coroutine=aconvert_currencies,
+                                              metadata={"provider": "exchangerate_api"})]
+
+    @staticmethod
+    def _as_dict(conversion) -> dict:
+        return conversion.model_dump() if isinstance(conversion, BaseModel) else dict(conversion)
@@ -4,6 +4,13 @@ tools/expense_calculator_tool.py
 Simple arithmetic utilities (multiply, add, divide) exposed as LangChain tools
 so the agent can perform on-the-fly cost estimations without leaving the graph.
 
+`calculate_trip_budget` is the one-call alternative: it takes the whole cost
+sheet (line items priced per night / day / person, in any currency) and returns
+the grand total, per-day and per-person budget and per-category subtotals.
+Foreign-currency items are normalised with a single batched rate lookup (see
+`utils/currency_converter.py::convert_many`), so a full breakdown costs one
+agent → tools → agent round instead of one round per sum.
+
 Why a separate tool?
 --------------------
 The LLM is great at reasoning but unreliable at exact arithmetic. Delegating
@@ -17,13 +24,31 @@ Adding more math helpers
 • Decorate a new callable inside `_setup_tools()` with `@tool` and return it so
   it becomes available to the LLM.
 """
+import os
 from utils.expense_calculator import Calculator
-from typing import List
+from utils.currency_converter import CurrencyConverter
+from utils.tool_output import render
+from typing import List, Literal, Optional
+from pydantic import BaseModel, Field
 from langchain.tools import tool
+from langchain_core.tools import StructuredTool
+from dotenv import load_dotenv
+
+
+class CostItem(BaseModel):
+    name: str = Field(description="What is paid for, e.g. 'Hotel Mandovi' or 'Dinner'")
+    category: str = Field(description="accommodation, food, transport, activities, ...")
+    amount: float = Field(description="Price of one unit")
+    currency: Optional[str] = Field(default=None, description="ISO code of `amount`; defaults to the budget currency")
+    unit: Literal["total", "per_night", "per_day", "per_person", "per_person_per_night", "per_person_per_day"] = "total"
+    quantity: float = Field(default=1, description="Multiplier such as the number of rooms")
+
 
 class CalculatorTool:
     def __init__(self):
+        load_dotenv()
         self.calculator = Calculator()
+        self.currency_service = CurrencyConverter(os.environ.get("EXCHANGE_RATE_API_KEY"))
         self.calculator_tool_list = self._setup_tools()
 
     def _setup_tools(self) -> List:
@@ -32,15 +57,47 @@ class CalculatorTool:
         def estimate_total_hotel_cost(price_per_night:str, total_days:float) -> float:
             """Calculate total hotel cost"""
             return self.calculator.multiply(price_per_night, total_days)
-        
+
         @tool
         def calculate_total_expense(*costs: float) -> float:
             """Calculate total expense of the trip"""
             return self.calculator.calculate_total(*costs)
-        
+
         @tool
         def calculate_daily_expense_budget(total_cost: float, days: int) -> float:
             """Calculate daily expense"""
             return self.calculator.calculate_daily_budget(total_cost, days)
-        
-        return [estimate_total_hotel_cost, calculate_total_expense, calculate_daily_expense_budget]
\ No newline at end of file
+
+        def calculate_trip_budget(items: List[CostItem], nights: int, days: int, travellers: int = 1,
+                                  currency: str = "USD") -> str:
+            """Price a whole cost sheet at once: total, per-day and per-person budget and per-category subtotals.
+            Prefer this over chaining the hotel / total / daily calculators."""
+            sheet = self._as_dicts(items)
+            foreign = self._conversions(sheet, currency)
+            converted = self.currency_service.convert_many(foreign) if foreign else []
+            rates = {c["from_currency"]: rate for c, rate in zip(foreign, converted)}
+            return render("calculate_trip_budget",
+                          self.calculator.budget_breakdown(sheet, nights, days, travellers, currency, rates))
+
+        async def acalculate_trip_budget(items: List[CostItem], nights: int, days: int, travellers: int = 1,
+                                         currency: str = "USD") -> str:
+            sheet = self._as_dicts(items)
+            foreign = self._conversions(sheet, currency)
+            converted = await self.currency_service.aconvert_many(foreign) if foreign else []
+            rates = {c["from_currency"]: rate for c, rate in zip(foreign, converted)}
+            return render("calculate_trip_budget",
+                          self.calculator.budget_breakdown(sheet, nights, days, travellers, currency, rates))
+
+        return [estimate_total_hotel_cost, calculate_total_expense, calculate_daily_expense_budget,
+                StructuredTool.from_function(func=calculate_trip_budget, coroutine=acalculate_trip_budget,
+                                             metadata={"provider": "exchangerate_api"})]
+
+    @staticmethod
+    def _as_dicts(items) -> List[dict]:
+        return [item.model_dump() if isinstance(item, BaseModel) else dict(item) for item in items]
+
+    @staticmethod
+    def _conversions(sheet: List[dict], currency: str) -> List[dict]:
+        """One unit conversion per foreign currency on the sheet."""
+        foreign = sorted({item["currency"].upper() for item in sheet if item.get("currency")} - {currency.upper()})
+        return [{"amount": 1, "from_currency": code, "to_currency": currency.upper()} for code in foreign]
@@ -8,24 +8,43 @@ transportation options for a given location.
 Environment variables
 ---------------------
 • `GPLACES_API_KEY` – required for Google Places API access. If the key is *not*
-  available or the request fails, the tool automatically falls back to Tavily so
-  the agent still produces an answer.
+  available, the request fails or Google returns nothing, the tool falls back to
+  Tavily so the agent still produces an answer.
+
+Search strategy
+---------------
+How Google and Tavily are combined (sequential / hedged / race) is decided by
+`utils/search_strategy.py` and `place_search.strategy` in `config/config.yaml`.
+Output
+------
+Each tool returns compact JSON rather than prose: `{"place", "category",
+"source", "items": [{"name", "rating", "reviews", "price_level", "address",
+"lat", "lng"}, ...]}` for Google, or `{"answer", "sources": [...]}` in place
+of `items` for Tavily, plus `latency_ms` (milliseconds per provider that was
+tried) and `errors` for providers that failed.  Item count and size follow the
+tool's budget in `tool_output` (`utils/tool_output.py`).
 
 Extending / Customizing
 -----------------------
 1. Implement additional methods in `utils/place_info_search.py` for new search
    categories (e.g. nightlife, coworking spaces).
-2. Inside `_setup_tools()` add a new `@tool` decorated function that calls the
-   corresponding helper and append it to the returned list.
+2. Inside `_setup_tools()` add a sync function and its async twin that call the
+   corresponding helper, wrap them with `StructuredTool.from_function` and
+   append the result to the returned list.
 3. Register the updated tool list in `agent/agentic_workflow.py`.
 
+Every tool is registered with both a sync implementation and an async
+`coroutine`, so LangGraph's `ainvoke` path never blocks the event loop.
+
 The design goal is to make it trivial to plug in alternative data providers or
 add new endpoints with minimal code changes.
 """
 import os
 from utils.place_info_search import GooglePlaceSearchTool, TavilyPlaceSearchTool
 from typing import List
-from langchain.tools import tool
+from langchain_core.tools import StructuredTool
+from utils.search_strategy import PlaceSearchStrategy, SearchOutcome
+from utils.tool_output import render
 from dotenv import load_dotenv
 
 class PlaceSearchTool:
@@ -34,52 +53,59 @@ class PlaceSearchTool:
         self.google_api_key = os.environ.get("GPLACES_API_KEY")
         self.google_places_search = GooglePlaceSearchTool(self.google_api_key)
         self.tavily_search = TavilyPlaceSearchTool()
+        # Provider limits are applied per upstream call inside the strategy
+        self.search_strategy = PlaceSearchStrategy(self.google_places_search, self.tavily_search)
         self.place_search_tool_list = self._setup_tools()
 
+    @staticmethod
+    def _format(category: str, place: str, outcome: SearchOutcome) -> str:
+        payload = {"place": place, "category": category, "source": outcome.provider,
+                   "latency_ms": outcome.latencies_ms}
+        if outcome.provider == "google":
+            payload["items"] = outcome.result
+        elif outcome.provider == "tavily":
+            payload.update(outcome.result)
+        if outcome.errors:
+            payload["errors"] = outcome.errors
+        return render(f"search_{category}", payload)
+
+    def _search(self, category: str, place: str) -> str:
+        return self._format(category, place, self.search_strategy.search(category, place))
+
+    async def _asearch(self, category: str, place: str) -> str:
+        return self._format(category, place, await self.search_strategy.asearch(category, place))
+
     def _setup_tools(self) -> List:
         """Setup all tools for the place search tool"""
-        @tool
         def search_attractions(place:str) -> str:
             """Search attractions of a place"""
-            try:
-                attraction_result = self.google_places_search.google_search_attractions(place)
-                if attraction_result:
-                    return f"Following are the attractions of {place} as suggested by google: {attraction_result}"
-            except Exception as e:
-                tavily_result = self.tavily_search.tavily_search_attractions(place)
-                return f"Google cannot find the details due to {e}. \nFollowing are the attractions of {place}: {tavily_result}"  ## Fallback search using tavily in case google places fail
+            return self._search("attractions", place)
+
+        async def asearch_attractions(place:str) -> str:
+            return await self._asearch("attractions", place)
         
-        @tool
         def search_restaurants(place:str) -> str:
             """Search restaurants of a place"""
-            try:
-                restaurants_result = self.google_places_search.google_search_restaurants(place)
-                if restaurants_result:
-                    return f"Following are the restaurants of {place} as suggested by google: {restaurants_result}"
-            except Exception as e:
-                tavily_result = self.tavily_search.tavily_search_restaurants(place)
-                return f"Google cannot find the details due to {e}. \nFollowing are the restaurants of {place}: {tavily_result}"  ## Fallback search using tavily in case google places fail
+            return self._search("restaurants", place)
+
+        async def asearch_restaurants(place:str) -> str:
+            return await self._asearch("restaurants", place)
         
-        @tool
         def search_activities(place:str) -> str:
             """Search activities of a place"""
-            try:
-                restaurants_result = self.google_places_search.google_search_activity(place)
-                if restaurants_result:
-                    return f"Following are the activities in and around {place} as suggested by google: {restaurants_result}"
-            except Exception as e:
-                tavily_result = self.tavily_search.tavily_search_activity(place)
-                return f"Google cannot find the details due to {e}. \nFollowing are the activities of {place}: {tavily_result}"  ## Fallback search using tavily in case google places fail
+            return self._search("activities", place)
+
+        async def asearch_activities(place:str) -> str:
+            return await self._asearch("activities", place)
         
-        @tool
         def search_transportation(place:str) -> str:
             """Search transportation of a place"""
-            try:
-                restaurants_result = self.google_places_search.google_search_transportation(place)
-                if restaurants_result:
-                    return f"Following are the modes of transportation available in {place} as suggested by google: {restaurants_result}"
-            except Exception as e:
-                tavily_result = self.tavily_search.tavily_search_transportation(place)
-                return f"Google cannot find the details due to {e}. \nFollowing are the modes of transportation available in {place}: {tavily_result}"  ## Fallback search using tavily in case google places fail
+            return self._search("transportation", place)
+
+        async def asearch_transportation(place:str) -> str:
+            return await self._asearch("transportation", place)
         
-        return [search_attractions, search_restaurants, search_activities, search_transportation]
\ No newline at end of file
+        return [StructuredTool.from_function(func=search_attractions, coroutine=asearch_attractions),
+                StructuredTool.from_function(func=search_restaurants, coroutine=asearch_restaurants),
+                StructuredTool.from_function(func=search_activities, coroutine=asearch_activities),
+                StructuredTool.from_function(func=search_transportation, coroutine=asearch_transportation)]
@@ -14,15 +14,23 @@ Extending this tool
 -------------------
 • Add additional helper methods to `utils/weather_info.py` for other endpoints
   (air-quality, UV index, etc.).
-• Decorate new callables inside `_setup_tools()` with `@tool` and return them in
-the list so LangGraph can surface them to the LLM.
+• Define new callables inside `_setup_tools()` – a sync function plus an async
+  twin – wrap them with `StructuredTool.from_function(func=..., coroutine=...)`
+  and return them in the list so LangGraph can surface them to the LLM.
+
+Both tools answer with compact JSON (`utils/tool_output.py`): the current
+temperature, feel, humidity, condition and wind, and – for the forecast – one
+entry per day of the full 5-day horizon (min / max / mean temperature,
+precipitation probability, dominant condition) built by
+`WeatherForecastTool.get_daily_forecast` instead of a line per 3-hour slot.
 
 The class is intentionally lightweight and stateless so you can duplicate the
 pattern for other third-party APIs with minimal effort.
 """
 import os
 from utils.weather_info import WeatherForecastTool
-from langchain.tools import tool
+from utils.tool_output import render
+from langchain_core.tools import StructuredTool
 from typing import List
 from dotenv import load_dotenv
 
@@ -32,32 +40,44 @@ class WeatherInfoTool:
         self.api_key = os.environ.get("OPENWEATHERMAP_API_KEY")
         self.weather_service = WeatherForecastTool(self.api_key)
         self.weather_tool_list = self._setup_tools()
-    
+
+    @staticmethod
+    def _format_current(city: str, weather_data: dict) -> str:
+        if not weather_data:
+            return render("get_current_weather", {"city": city, "error": "could not fetch current weather"})
+        main = weather_data.get("main", {})
+        return render("get_current_weather", {
+            "city": city,
+            "temp_c": main.get("temp"),
+            "feels_like_c": main.get("feels_like"),
+            "humidity": main.get("humidity"),
+            "condition": weather_data.get("weather", [{}])[0].get("description"),
+            "wind_ms": weather_data.get("wind", {}).get("speed"),
+        })
+
+    @staticmethod
+    def _format_forecast(city: str, summary: dict) -> str:
+        if not summary or not summary.get("days"):
+            return render("get_weather_forecast", {"city": city, "error": "could not fetch forecast"})
+        return render("get_weather_forecast", {"city": city, "days": summary["days"]})
+
     def _setup_tools(self) -> List:
         """Setup all tools for the weather forecast tool"""
-        @tool
         def get_current_weather(city: str) -> str:
             """Get current weather for a city"""
-            weather_data = self.weather_service.get_current_weather(city)
-            if weather_data:
-                temp = weather_data.get('main', {}).get('temp', 'N/A')
-                desc = weather_data.get('weather', [{}])[0].get('description', 'N/A')
-                return f"Current weather in {city}: {temp}°C, {desc}"
-            return f"Could not fetch weather for {city}"
+            return self._format_current(city, self.weather_service.get_current_weather(city))
+
+        async def aget_current_weather(city: str) -> str:
+            return self._format_current(city, await self.weather_service.aget_current_weather(city))
         
-        @tool
         def get_weather_forecast(city: str) -> str:
-            """Get weather forecast for a city"""
-            forecast_data = self.weather_service.get_forecast_weather(city)
-            if forecast_data and 'list' in forecast_data:
-                forecast_summary = []
-                for i in range(len(forecast_data['list'])):
-                    item = forecast_data['list'][i]
-                    date = item['dt_txt'].split(' ')[0]
-                    temp = item['main']['temp']
-                    desc = item['weather'][0]['description']
-                    forecast_summary.append(f"{date}: {temp} degree celcius , {desc}")
-                return f"Weather forecast for {city}:\n" + "\n".join(forecast_summary)
-            return f"Could not fetch forecast for {city}"
+            """Get the day-by-day weather outlook (up to 5 days) for a city in one call"""
+            return self._format_forecast(city, self.weather_service.get_daily_forecast(city))
+
+        async def aget_weather_forecast(city: str) -> str:
+            return self._format_forecast(city, await self.weather_service.aget_daily_forecast(city))
     
-        return [get_current_weather, get_weather_forecast]
\ No newline at end of file
+        return [StructuredTool.from_function(func=get_current_weather, coroutine=aget_current_weather,
+                                             metadata={"provider": "openweathermap"}),
+                StructuredTool.from_function(func=get_weather_forecast, coroutine=aget_weather_forecast,
+                                             metadata={"provider": "openweathermap"})]
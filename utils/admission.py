@@ -0,0 +1,168 @@
+"""
+utils/admission.py
+==================
+Admission control for agent runs in the FastAPI layer.
+
+Without it uvicorn starts an agent run for every `/query` it accepts; under a
+spike all of them open LLM and tool connections at once, everything slows
+down together and requests start timing out en masse.  `AdmissionController`
+keeps the work per worker bounded instead:
+
+• at most `max_concurrent` agent runs execute at a time;
+• up to `max_queue` more wait in a **priority queue** – lanes are served
+  strictly in order (`short` before `normal` before `batch`), FIFO within a
+  lane;
+• a waiter that is not admitted within `queue_timeout_seconds`, or a request
+  that finds the queue full, is rejected with `AdmissionRejected`, which
+  `main.py` turns into **503 + Retry-After**.  The Retry-After hint is derived
+  from the smoothed run time and the current queue length.
+
+Answers served from the response cache never reach the controller, so cached
+questions bypass the queue entirely.
+
+The controller is driven from one event loop (one per uvicorn worker) and
+needs no locks.  Queue depth, active runs, queue wait time and rejections are
+exported through `utils/metrics.py`.
+
+Usage
+-----
+```python
+async with admission.admit("short"):
+    output = await react_app.ainvoke(...)
+
+ticket = await admission.acquire("normal")   # when the run outlives the handler
+...
+ticket.release()                              # idempotent
+```
+"""
+import asyncio
+import heapq
+import itertools
+import math
+import time
+from contextlib import asynccontextmanager
+from typing import Dict, List, Optional
+
+from utils.config_loader import load_config
+from utils.metrics import ADMISSION_ACTIVE, ADMISSION_QUEUE_DEPTH, ADMISSION_REJECTED, ADMISSION_WAIT
+
+LANES = ("short", "normal", "batch")
+
+
+class AdmissionRejected(Exception):
+    """Raised when a run cannot be admitted; carries a Retry-After hint in seconds."""
+
+    def __init__(self, reason: str, retry_after: int):
+        super().__init__(f"Agent run rejected ({reason}); retry after {retry_after}s")
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class Ticket:
+    """One admitted run; `release` frees its slot (safe to call more than once)."""
+
+    def __init__(self, controller: "AdmissionController", lane: str):
+        self.controller = controller
+        self.lane = lane
+        self.admitted_at = time.monotonic()
+        self._released = False
+
+    def release(self) -> None:
+        if not self._released:
+            self._released = True
+            self.controller._release(time.monotonic() - self.admitted_at)
+
+
+class AdmissionController:
+    def __init__(self, max_concurrent: int = 8, max_queue: int = 64, queue_timeout_seconds: float = 20.0,
+                 initial_run_seconds: float = 30.0, max_retry_after: int = 120):
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout_seconds = queue_timeout_seconds
+        self.max_retry_after = max_retry_after
+        self.active = 0
+        self._run_seconds = initial_run_seconds  # EWMA of recent run durations
+        self._waiters: List[list] = []           # heap of [lane rank, sequence, future]
+        self._queued: Dict[str, int] = {lane: 0 for lane in LANES}
+        self._sequence = itertools.count()
+
+    def queue_depth(self, lane: Optional[str] = None) -> int:
+        return self._queued[lane] if lane else sum(self._queued.values())
+
+    def retry_after(self) -> int:
+        """Seconds until a slot is likely to free up for a new arrival."""
+        estimate = self._run_seconds * (self.queue_depth() + 1) / max(1, self.max_concurrent)
+        return max(1, min(self.max_retry_after, math.ceil(estimate)))
+
+    def _reject(self, lane: str, reason: str) -> AdmissionRejected:
+        ADMISSION_REJECTED.inc(lane, reason)
+        return AdmissionRejected(reason, self.retry_after())
+
+    async def acquire(self, lane: str = "normal") -> Ticket:
+        """Wait for a slot in `lane`; raises `AdmissionRejected` if none is granted in time."""
+        if lane not in self._queued:
+            raise ValueError(f"Unknown admission lane {lane!r}; expected one of {LANES}")
+        if self.active < self.max_concurrent and not self._waiters:
+            self.active += 1
+            ADMISSION_WAIT.observe(0.0, lane)
+            return Ticket(self, lane)
+        if self.queue_depth() >= self.max_queue:
+            raise self._reject(lane, "queue_full")
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, [LANES.index(lane), next(self._sequence), future])
+        self._queued[lane] += 1
+        started = time.monotonic()
+        try:
+            await asyncio.wait_for(future, timeout=self.queue_timeout_seconds)
+        except asyncio.TimeoutError:
+            pass
+        except BaseException:
+            # Cancelled after the slot was handed over: give it back
+            if future.done() and not future.cancelled():
+                self._release(None)
+            raise
+        finally:
+            self._queued[lane] -= 1
+            ADMISSION_WAIT.observe(time.monotonic() - started, lane)
+        if future.cancelled():
+            # Rejected only after leaving the queue, so the hint does not count us
+            raise self._reject(lane, "queue_timeout")
+        return Ticket(self, lane)
+
+    def _release(self, run_seconds: Optional[float]) -> None:
+        if run_seconds is not None:
+            self._run_seconds = 0.8 * self._run_seconds + 0.2 * run_seconds
+        # Hand the slot straight to the best live waiter; skip ones that gave up
+        while self._waiters:
+            _, _, future = heapq.heappop(self._waiters)
+            if not future.done():
+                future.set_result(None)
+                return
+        self.active -= 1
+
+    @asynccontextmanager
+    async def admit(self, lane: str = "normal"):
+        ticket = await self.acquire(lane)
+        try:
+            yield ticket
+        finally:
+            ticket.release()
+
+
+def _build_admission_controller() -> AdmissionController:
+    config = load_config().get("admission", {})
+    controller = AdmissionController(
+        max_concurrent=config.get("max_concurrent", 8),
+        max_queue=config.get("max_queue", 64),
+        queue_timeout_seconds=config.get("queue_timeout_seconds", 20),
+        initial_run_seconds=config.get("initial_run_seconds", 30),
+        max_retry_after=config.get("max_retry_after_seconds", 120),
+    )
+    for lane in LANES:
+        ADMISSION_QUEUE_DEPTH.set_function(lambda lane=lane: controller.queue_depth(lane), lane)
+    ADMISSION_ACTIVE.set_function(lambda: controller.active)
+    return controller
+
+
+admission = _build_admission_controller()
@@ -0,0 +1,135 @@
+"""
+utils/cache.py
+==============
+Small in-process caching primitives shared by the API helpers in `utils/`.
+
+`TTLCache` is a thread-safe dictionary whose entries expire after a fixed
+time-to-live.  It is deliberately tiny – no background sweeper, expired entries
+are dropped lazily on access – because the helpers only keep a handful of keys
+(one exchange-rate table per base currency, one forecast per city, ...).
+
+Usage
+-----
+```
+rates = TTLCache(ttl_seconds=6 * 3600, maxsize=64)
+rates.set("USD", {...})
+rates.get("USD")          # -> {...} until the TTL elapses, then None
+```
+
+`normalize_location` turns free-text place names into stable cache keys
+("Paris , FR" → "paris,fr").  `SingleFlight` / `AsyncSingleFlight` coalesce concurrent identical lookups so a
+burst of requests for the same key results in a single upstream call.
+"""
+import asyncio
+import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Hashable, Iterator, Optional, Tuple
+
+
+def normalize_location(place: str) -> str:
+    """Lower-case, trim and collapse whitespace around comma-separated parts."""
+    parts = [re.sub(r"\s+", " ", part).strip().lower() for part in place.split(",")]
+    return ",".join(part for part in parts if part)
+
+
+class TTLCache:
+    def __init__(self, ttl_seconds: float, maxsize: Optional[int] = None, clock: Callable[[], float] = time.monotonic):
+        self.ttl_seconds = ttl_seconds
+        self.maxsize = maxsize
+        self.clock = clock
+        self._data: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the cached value for `key`, or `default` if missing / expired."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return default
+            expires_at, value = entry
+            if expires_at <= self.clock():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl_seconds: Optional[float] = None) -> None:
+        """Store `value` under `key` for `ttl_seconds` (defaults to the cache TTL)."""
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        with self._lock:
+            self._data[key] = (self.clock() + ttl, value)
+            self._data.move_to_end(key)
+            if self.maxsize is not None:
+                while len(self._data) > self.maxsize:
+                    self._data.popitem(last=False)
+
+    def items(self) -> Iterator[Tuple[Hashable, Any]]:
+        """Snapshot of the non-expired `(key, value)` pairs."""
+        now = self.clock()
+        with self._lock:
+            return iter([(key, value) for key, (expires_at, value) in self._data.items() if expires_at > now])
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.pop(key, None)
+        return default if entry is None else entry[1]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class SingleFlight:
+    """Coalesce concurrent identical calls (threads) into one in-flight execution.
+
+    The first caller for a key runs `fn`; callers arriving while it is still
+    running wait for – and share – its result or exception.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: dict = {}
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._calls[key] = future
+        if not leader:
+            return future.result()
+        try:
+            result = fn()
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+
+
+class AsyncSingleFlight:
+    """Async counterpart of `SingleFlight`: concurrent awaiters share one task."""
+
+    def __init__(self):
+        self._tasks: dict = {}
+
+    async def do(self, key: Hashable, coro_fn: Callable[[], Awaitable[Any]]) -> Any:
+        # Tasks belong to one event loop, so the loop is part of the key
+        flight_key = (id(asyncio.get_running_loop()), key)
+        task = self._tasks.get(flight_key)
+        if task is None:
+            task = asyncio.ensure_future(coro_fn())
+            self._tasks[flight_key] = task
+            task.add_done_callback(lambda _: self._tasks.pop(flight_key, None))
+        # Shield so one cancelled waiter does not cancel the shared request
+        return await asyncio.shield(task)
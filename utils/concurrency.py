@@ -0,0 +1,136 @@
+"""
+utils/concurrency.py
+====================
+Per-provider concurrency limits for outbound API calls.
+
+When the agent asks for weather, attractions, restaurants, ... in a single turn
+the tool node runs those calls at the same time.  `ProviderLimiter` keeps that
+fan-out polite: each upstream (Google Places, Tavily, OpenWeatherMap,
+ExchangeRate-API) gets its own semaphore so a burst of tool calls cannot exceed
+the provider's rate limits or exhaust the connection pool.
+
+Both faces share the same limits:
+```
+with provider_limiter.limit("google_places"):          # threads
+    ...
+async with provider_limiter.alimit("google_places"):   # asyncio tasks
+    ...
+```
+The two faces draw on one counter per provider, so the cap holds across worker
+threads and every event loop in the process (the API loop, `asyncio.run` in a
+benchmark thread, ...) rather than per loop.  Providers without a configured
+limit (or `None`) run unthrottled.  Limits are read from the
+`tools.concurrency` section of `config/config.yaml`.
+"""
+import asyncio
+import threading
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from typing import Dict, Optional
+
+from utils.config_loader import load_config
+
+
+class _Slots:
+    """One provider's budget, shared by threads and every event loop.
+
+    A plain counter under a `threading.Lock`.  Waiters queue in FIFO order; a
+    release hands its slot straight to the oldest waiter, waking a thread through
+    its `threading.Event` or a coroutine by resolving its future on its own loop.
+    """
+
+    def __init__(self, size: int):
+        self.size = size
+        self._in_use = 0
+        self._waiters = deque()
+        self._lock = threading.Lock()
+
+    def _try_take(self) -> bool:
+        if self._in_use < self.size and not self._waiters:
+            self._in_use += 1
+            return True
+        return False
+
+    def acquire(self) -> None:
+        with self._lock:
+            if self._try_take():
+                return
+            event = threading.Event()
+            self._waiters.append(event)
+        event.wait()
+
+    async def aacquire(self) -> None:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if self._try_take():
+                return
+            waiter = (loop, loop.create_future())
+            self._waiters.append(waiter)
+        try:
+            await waiter[1]
+        except asyncio.CancelledError:
+            with self._lock:
+                queued = waiter in self._waiters
+                if queued:
+                    self._waiters.remove(waiter)
+            # Already handed over but cancelled before we resumed: pass it on
+            if not queued and waiter[1].done() and not waiter[1].cancelled():
+                self.release()
+            raise
+
+    def release(self) -> None:
+        with self._lock:
+            while self._waiters:
+                waiter = self._waiters.popleft()
+                if isinstance(waiter, threading.Event):
+                    waiter.set()
+                    return
+                loop, future = waiter
+                try:
+                    loop.call_soon_threadsafe(self._hand_over, future)
+                    return
+                except RuntimeError:
+                    continue  # the waiter's loop is closed
+            self._in_use -= 1
+
+    def _hand_over(self, future: asyncio.Future) -> None:
+        # Runs on the waiter's loop; a waiter cancelled in the meantime passes it on
+        if future.cancelled():
+            self.release()
+        else:
+            future.set_result(None)
+
+
+class ProviderLimiter:
+    def __init__(self, limits: Optional[Dict[str, int]] = None):
+        self.limits = {name: n for name, n in (limits or {}).items() if n is not None}
+        self._slots = {name: _Slots(n) for name, n in self.limits.items()}
+
+    @contextmanager
+    def limit(self, provider: Optional[str]):
+        """Hold one of `provider`'s slots for the duration of the block (threads)."""
+        slots = self._slots.get(provider)
+        if slots is None:
+            yield
+            return
+        slots.acquire()
+        try:
+            yield
+        finally:
+            slots.release()
+
+    @asynccontextmanager
+    async def alimit(self, provider: Optional[str]):
+        """Async counterpart of `limit`; draws on the same slots without blocking the loop."""
+        slots = self._slots.get(provider)
+        if slots is None:
+            yield
+            return
+        await slots.aacquire()
+        try:
+            yield
+        finally:
+            slots.release()
+
+
+provider_limiter = ProviderLimiter(load_config().get("tools", {}).get("concurrency", {}))
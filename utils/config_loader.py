@@ -7,14 +7,22 @@ about YAML semantics or file paths.
 
 Default behaviour
 -----------------
-If no `config_path` argument is supplied we default to `config/config.yaml`
-(relative to the repository root).  Feel free to pass an absolute path when
-running scripts from outside the repo.
+If no `config_path` argument is supplied we read the file named by the
+`TRAVEL_PLANNER_CONFIG` environment variable, falling back to
+`config/config.yaml` (relative to the repository root).  Feel free to pass an
+absolute path when running scripts from outside the repo; the benchmarks point
+the environment variable at a generated config to redirect every upstream to
+local stubs.
 """
 import yaml
 import os
+from typing import Optional
 
-def load_config(config_path: str = "config/config.yaml") -> dict:
+CONFIG_ENV_VAR = "TRAVEL_PLANNER_CONFIG"
+DEFAULT_CONFIG_PATH = "config/config.yaml"
+
+def load_config(config_path: Optional[str] = None) -> dict:
+    config_path = config_path or os.getenv(CONFIG_ENV_VAR, DEFAULT_CONFIG_PATH)
     with open(config_path, "r") as file:
         config = yaml.safe_load(file)
         # print(config)
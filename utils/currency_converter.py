@@ -2,16 +2,33 @@
 utils/currency_converter.py
 ===========================
 A minimal wrapper around the **ExchangeRate-API** REST endpoint.  The helper is
-kept slim (single request & multiply) because accuracy is handled by the remote
-service.
+kept slim (rate-table lookup & multiply) because accuracy is handled by the
+remote service.
 
 Usage
 -----
 ```
 converter = CurrencyConverter(os.getenv("EXCHANGE_RATE_API_KEY"))
 converter.convert(100, "USD", "INR")
+await converter.aconvert(100, "USD", "INR")   # non-blocking variant
+converter.convert_many([{"amount": 100, "from_currency": "USD", "to_currency": "INR"},
+                        {"amount": 20, "from_currency": "EUR", "to_currency": "INR"}])
 ```
 
+Rate-table cache
+----------------
+Every `latest/{base}` response contains the rates of *all* supported currencies
+against `base`, so one table is enough to derive any pair through cross rates
+(`rate(A→B) = table[B] / table[A]`).  Tables are cached per base currency for
+`currency.rate_ttl_seconds` (see `config/config.yaml`) in a process-wide
+`TTLCache` shared by every converter instance.  A conversion – or a whole
+`convert_many` batch – therefore costs at most one HTTPS round trip per TTL.
+
+Because any table lists every supported currency, a code missing from a cached
+table is unsupported: the batch is answered from the cache (recorded as a
+`hit`) and fails with `UnsupportedCurrencyError` without a download.  Errors
+returned by the API itself raise `ExchangeRateAPIError`.
+
 Notes
 -----
 • ExchangeRate-API free tier caches results for ~24 h.  If you require
@@ -19,19 +36,143 @@ Notes
 • All amounts are converted as `float` – if you need higher precision wrap the
   output in `Decimal`.
 """
-import requests
+from collections import Counter
+from typing import Dict, Iterable, List, Optional
+
+from utils.cache import TTLCache
+from utils.config_loader import load_config
+from utils.http_client import aget, get
+from utils.tracing import record_cache
+
+_CURRENCY_CONFIG = load_config().get("currency", {})
+
+# Shared by all CurrencyConverter instances: base currency -> {currency: rate}
+_rate_tables = TTLCache(
+    ttl_seconds=_CURRENCY_CONFIG.get("rate_ttl_seconds", 6 * 3600),
+    maxsize=_CURRENCY_CONFIG.get("max_cached_tables", 32),
+)
+
+
+class UnsupportedCurrencyError(ValueError):
+    """Raised for currency codes ExchangeRate-API does not quote."""
+
+    def __init__(self, currencies: Iterable[str]):
+        self.currencies = sorted(set(currencies))
+        super().__init__(f"Unsupported currency code(s): {', '.join(self.currencies)}")
+
+
+class ExchangeRateAPIError(Exception):
+    """Raised when ExchangeRate-API answers a rate-table request with an error."""
+
 
 class CurrencyConverter:
-    def __init__(self, api_key: str):
-        self.base_url = f"https://v6.exchangerate-api.com/v6/{api_key}/latest/"
-    
+    def __init__(self, api_key: str, rate_tables: Optional[TTLCache] = None):
+        root = _CURRENCY_CONFIG.get("base_url", "https://v6.exchangerate-api.com/v6").rstrip("/")
+        self.base_url = f"{root}/{api_key}/latest"
+        self.rate_tables = _rate_tables if rate_tables is None else rate_tables
+
+    @staticmethod
+    def _normalize(currency: str) -> str:
+        return currency.strip().upper()
+
+    def _cached_rate(self, from_currency: str, to_currency: str) -> Optional[float]:
+        """Derive `from -> to` from any cached table, or None if none covers the pair."""
+        if from_currency == to_currency:
+            return 1.0
+        for base, rates in self.rate_tables.items():
+            if from_currency in rates and to_currency in rates:
+                return rates[to_currency] / rates[from_currency]
+        return None
+
+    @staticmethod
+    def _payload(response, base: str) -> dict:
+        """Return the JSON body of a `latest/{base}` response, raising on API errors."""
+        try:
+            payload = response.json()
+        except ValueError:
+            payload = {}
+        if response.status_code == 200 and "conversion_rates" in payload:
+            return payload
+        reason = payload.get("error-type") or response.text[:200]
+        if reason == "unsupported-code":
+            raise UnsupportedCurrencyError([base])
+        raise ExchangeRateAPIError(f"ExchangeRate-API latest/{base} failed with HTTP {response.status_code}: {reason}")
+
+    def _store(self, base: str, payload: dict) -> Dict[str, float]:
+        rates = dict(payload["conversion_rates"])
+        rates.setdefault(base, 1.0)
+        self.rate_tables.set(base, rates)
+        return rates
+
+    def fetch_rates(self, base: str) -> Dict[str, float]:
+        """Return the rate table for `base`, downloading it on a cache miss."""
+        base = self._normalize(base)
+        rates = self.rate_tables.get(base)
+        if rates is not None:
+            return rates
+        response = get(f"{self.base_url}/{base}")
+        return self._store(base, self._payload(response, base))
+
+    async def afetch_rates(self, base: str) -> Dict[str, float]:
+        """Async variant of `fetch_rates` using the shared async HTTP client."""
+        base = self._normalize(base)
+        rates = self.rate_tables.get(base)
+        if rates is not None:
+            return rates
+        response = await aget(f"{self.base_url}/{base}")
+        return self._store(base, self._payload(response, base))
+
+    @staticmethod
+    def _cross_rate(rates: Dict[str, float], from_currency: str, to_currency: str) -> float:
+        unsupported = [currency for currency in (from_currency, to_currency) if currency not in rates]
+        if unsupported:
+            raise UnsupportedCurrencyError(unsupported)
+        return rates[to_currency] / rates[from_currency]
+
     def convert(self, amount:float, from_currency:str, to_currency:str):
         """Convert the amount from one currency to another"""
-        url = f"{self.base_url}/{from_currency}"
-        response = requests.get(url)
-        if response.status_code != 200:
-            raise Exception("API call failed:", response.json())
-        rates = response.json()["conversion_rates"]
-        if to_currency not in rates:
-            raise ValueError(f"{to_currency} not found in exchange rates.")
-        return amount * rates[to_currency]
\ No newline at end of file
+        return self.convert_many([{"amount": amount, "from_currency": from_currency, "to_currency": to_currency}])[0]
+
+    async def aconvert(self, amount:float, from_currency:str, to_currency:str):
+        """Async variant of `convert` using the shared async HTTP client"""
+        return (await self.aconvert_many([{"amount": amount, "from_currency": from_currency, "to_currency": to_currency}]))[0]
+
+    def _plan(self, conversions: Iterable[dict]):
+        """Normalise the batch and pick the single base table needed for cache misses."""
+        items = [(float(c["amount"]), self._normalize(c["from_currency"]), self._normalize(c["to_currency"]))
+                 for c in conversions]
+        missing = [(src, dst) for _, src, dst in items if self._cached_rate(src, dst) is None]
+        table = next((rates for _, rates in self.rate_tables.items()), None)
+        unsupported = [code for pair in missing for code in pair if table is not None and code not in table]
+        if unsupported:
+            # A cached table already lists every supported code: nothing to download
+            record_cache("exchange_rates", "hit")
+            raise UnsupportedCurrencyError(unsupported)
+        # Any table contains every currency, so fetch the most requested source base once
+        base = Counter(src for src, _ in missing).most_common(1)[0][0] if missing else None
+        return items, base
+
+    def _apply(self, items, rates: Optional[Dict[str, float]]) -> List[float]:
+        results = []
+        for amount, src, dst in items:
+            rate = self._cached_rate(src, dst)
+            if rate is None:
+                rate = self._cross_rate(rates or {}, src, dst)
+            results.append(amount * rate)
+        return results
+
+    def convert_many(self, conversions: Iterable[dict]) -> List[float]:
+        """Convert a batch of `{amount, from_currency, to_currency}` items.
+
+        Pairs already derivable from a cached table are free; all others are
+        resolved from a single freshly fetched table.
+        """
+        items, base = self._plan(conversions)
+        record_cache("exchange_rates", "miss" if base else "hit")
+        return self._apply(items, self.fetch_rates(base) if base else None)
+
+    async def aconvert_many(self, conversions: Iterable[dict]) -> List[float]:
+        """Async variant of `convert_many`."""
+        items, base = self._plan(conversions)
+        record_cache("exchange_rates", "miss" if base else "hit")
+        return self._apply(items, await self.afetch_rates(base) if base else None)
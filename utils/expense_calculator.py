@@ -1,10 +1,12 @@
 """
 utils/expense_calculator.py
 ==========================
-Pure-Python arithmetic helper used by `tools/expense_calculator_tool.py`.
-Provides methods for basic math needed in travel cost estimation.  We keep the
-implementation small on purpose—if you need spreadsheet-grade functionality
-consider importing *NumPy* or *Pandas* instead.
+Arithmetic helper used by `tools/expense_calculator_tool.py`.  Provides
+methods for basic math needed in travel cost estimation, plus
+`Calculator.budget_breakdown`, which prices a whole cost sheet (hotel per
+night, meals per day, one-off tickets, ...) with *Pandas* in one pass so the
+agent gets totals, per-day budget and per-category subtotals from a single tool
+call instead of one call per sum.
 
 Adding new operations
 ---------------------
@@ -13,6 +15,14 @@ Adding new operations
 2. Expose it to the LLM by wrapping it inside a new `@tool` decorator in
    `tools/expense_calculator_tool.py`.
 """
+from typing import Dict, Iterable, Optional
+
+import pandas as pd
+
+# How many times a line item is paid over the trip, per `unit`
+UNITS = ("total", "per_night", "per_day", "per_person", "per_person_per_night", "per_person_per_day")
+
+
 class Calculator:
     @staticmethod
     def multiply(a: int, b: int) -> int:
@@ -54,5 +64,56 @@ class Calculator:
             float: Expense for a single day
         """
         return total / days if days > 0 else 0
-    
-    
\ No newline at end of file
+
+    @staticmethod
+    def budget_breakdown(items: Iterable[dict], nights: int, days: int, travellers: int = 1,
+                         currency: str = "USD", rates: Optional[Dict[str, float]] = None) -> dict:
+        """
+        Price a cost sheet in one vectorised pass
+
+        Args:
+            items (list): Line items with `name`, `category`, `amount`, `currency`,
+                `unit` (one of `UNITS`) and optional `quantity` (e.g. rooms)
+            nights (int): Number of hotel nights
+            days (int): Number of trip days
+            travellers (int): Number of travellers
+            currency (str): Currency of the result
+            rates (dict): Multiplier from each item currency to `currency`
+
+        Returns:
+            dict: Grand total, per-day and per-person budget, subtotals per
+            category and the priced line items, all in `currency`
+        """
+        sheet = pd.DataFrame(list(items), columns=["name", "category", "amount", "currency", "unit", "quantity"])
+        if sheet.empty:
+            return {"currency": currency, "total": 0.0, "per_day": 0.0, "per_person": 0.0,
+                    "by_category": {}, "items": []}
+        unknown = set(sheet["unit"].dropna()) - set(UNITS)
+        if unknown:
+            raise ValueError(f"Unknown cost units {sorted(unknown)}; expected one of {UNITS}")
+
+        sheet["unit"] = sheet["unit"].fillna("total")
+        sheet["quantity"] = sheet["quantity"].fillna(1).astype(float)
+        sheet["currency"] = sheet["currency"].fillna(currency).str.upper()
+        sheet["category"] = sheet["category"].fillna("other")
+        per_person = sheet["unit"].str.startswith("per_person")
+        sheet["times"] = (
+            sheet["unit"].map(lambda unit: nights if unit.endswith("night") else days if unit.endswith("day") else 1)
+            * per_person.map({True: travellers, False: 1})
+            * sheet["quantity"]
+        )
+        rate = sheet["currency"].map({**(rates or {}), currency.upper(): 1.0})
+        if rate.isna().any():
+            raise ValueError(f"No exchange rate for {sorted(set(sheet.loc[rate.isna(), 'currency']))}")
+        sheet["total"] = (sheet["amount"].astype(float) * sheet["times"] * rate).round(2)
+
+        total = round(float(sheet["total"].sum()), 2)
+        by_category = sheet.groupby("category", sort=False)["total"].sum().round(2)
+        return {
+            "currency": currency.upper(),
+            "total": total,
+            "per_day": round(total / days, 2) if days > 0 else total,
+            "per_person": round(total / travellers, 2) if travellers > 0 else total,
+            "by_category": {category: float(amount) for category, amount in by_category.items()},
+            "items": sheet[["name", "category", "total"]].to_dict(orient="records"),
+        }
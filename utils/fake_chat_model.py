@@ -0,0 +1,136 @@
+"""
+utils/fake_chat_model.py
+========================
+`ScriptedChatModel` – a LangChain chat model that replays a recorded
+conversation instead of calling a provider.
+
+A script is a list of turns (see `benchmarks/fixtures/agent_scripts.json`): every turn
+but the last requests one or more tool calls, the last one returns the final
+answer.  The model is stateless – the turn to replay is the number of
+assistant messages already in the conversation – so one instance can serve
+any number of concurrent graph runs, exactly like a real client.
+
+Placeholders such as `{destination}` in tool arguments and in the final answer
+are filled from the user question by matching it against the scenario's
+`question` template, so "Plan a 5 day trip to Lisbon" makes the agent search
+Lisbon.  Each turn sleeps for a sample of `latency` and reports
+`usage_metadata` (~4 characters per token) so token metrics and traces are
+exercised too.
+
+It doubles as the offline `fake` provider of `utils/model_loader.py`
+(`ScriptedChatModel.from_config`, configured under `llm.fake`), so the LLM
+router can be exercised without API keys: `failure_rate` makes that share of
+turns fail with a `FakeRateLimitError` (HTTP 429), which the router treats
+like a real provider's rate limit.
+"""
+import asyncio
+import json
+import os
+import random
+import re
+import time
+import uuid
+from typing import Any, Dict, List, Optional
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from pydantic import ConfigDict, Field
+
+from utils.latency import LatencyModel
+
+# Recorded scenarios shared with the benchmarks; `llm.<name>.scripts_path` overrides it
+SCRIPTS_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "benchmarks", "fixtures", "agent_scripts.json")
+
+
+class FakeRateLimitError(Exception):
+    """Stand-in for a provider's HTTP 429 response."""
+    status_code = 429
+
+
+def _template_regex(template: str) -> "re.Pattern":
+    parts = re.split(r"\{(\w+)\}", template)
+    pattern = "".join(
+        f"(?P<{part}>.+?)" if index % 2 else re.escape(part) for index, part in enumerate(parts)
+    )
+    return re.compile(f"^{pattern}$", re.IGNORECASE | re.DOTALL)
+
+
+def _fill(value: Any, variables: Dict[str, str]) -> Any:
+    """Substitute `{name}` placeholders in strings nested inside `value`."""
+    if isinstance(value, str):
+        return re.sub(r"\{(\w+)\}", lambda match: variables.get(match.group(1), match.group(0)), value)
+    if isinstance(value, list):
+        return [_fill(item, variables) for item in value]
+    if isinstance(value, dict):
+        return {key: _fill(item, variables) for key, item in value.items()}
+    return value
+
+
+class ScriptedChatModel(BaseChatModel):
+    script: List[Dict[str, Any]]
+    question_template: str = "{question}"
+    latency: LatencyModel = Field(default_factory=LatencyModel)
+    model_name: str = "scripted-fake"
+    failure_rate: float = 0.0
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> "ScriptedChatModel":
+        """Build the model from an `llm.<name>` entry with `provider: fake`."""
+        with open(config.get("scripts_path", SCRIPTS_PATH), "r", encoding="utf-8") as file:
+            scenario = json.load(file)[config.get("scenario", "single_city")]
+        return cls(script=scenario["script"], question_template=scenario["question"],
+                   latency=LatencyModel.parse(config.get("latency", "fixed:0")),
+                   model_name=config.get("model_name", "scripted-fake"),
+                   failure_rate=config.get("failure_rate", 0.0))
+
+    @property
+    def _llm_type(self) -> str:
+        return "scripted-fake"
+
+    def bind_tools(self, tools, **kwargs) -> "ScriptedChatModel":
+        # Tool schemas are irrelevant to a replay; the script already names the tools
+        return self
+
+    def _variables(self, messages: List[BaseMessage]) -> Dict[str, str]:
+        question = next((message.content for message in messages if isinstance(message, HumanMessage)), "")
+        match = _template_regex(self.question_template).match(str(question).strip())
+        return {key: value.strip() for key, value in match.groupdict().items()} if match else {}
+
+    def _next_message(self, messages: List[BaseMessage]) -> AIMessage:
+        turn = sum(isinstance(message, AIMessage) for message in messages)
+        step = self.script[min(turn, len(self.script) - 1)]
+        variables = self._variables(messages)
+        if step.get("tool_calls") and turn < len(self.script) - 1:
+            tool_calls = [
+                {"name": call["name"], "args": _fill(call.get("args", {}), variables),
+                 "id": f"call_{uuid.uuid4().hex[:12]}", "type": "tool_call"}
+                for call in step["tool_calls"]
+            ]
+            message = AIMessage(content="", tool_calls=tool_calls)
+        else:
+            message = AIMessage(content=_fill(step.get("content", ""), variables))
+        input_tokens = sum(len(str(m.content)) for m in messages) // 4
+        output_tokens = (len(str(message.content)) + len(str(message.tool_calls))) // 4
+        message.usage_metadata = {"input_tokens": input_tokens, "output_tokens": output_tokens,
+                                  "total_tokens": input_tokens + output_tokens}
+        message.response_metadata = {"model_name": self.model_name}
+        return message
+
+    def _maybe_fail(self) -> None:
+        if self.failure_rate and random.random() < self.failure_rate:
+            raise FakeRateLimitError(f"{self.model_name}: rate limited (simulated)")
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                  run_manager=None, **kwargs) -> ChatResult:
+        time.sleep(self.latency.sample())
+        self._maybe_fail()
+        return ChatResult(generations=[ChatGeneration(message=self._next_message(messages))])
+
+    async def _agenerate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                         run_manager=None, **kwargs) -> ChatResult:
+        await asyncio.sleep(self.latency.sample())
+        self._maybe_fail()
+        return ChatResult(generations=[ChatGeneration(message=self._next_message(messages))])
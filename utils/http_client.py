@@ -0,0 +1,189 @@
+"""
+utils/http_client.py
+====================
+Shared outbound HTTP client layer for the helpers in `utils/`.
+
+Every helper used to call the module-level `requests.get`: no connection reuse
+(a fresh TCP + TLS handshake per call) and no timeout (a hung upstream could
+stall a worker forever).  This module gives the whole process one pooled client
+per face:
+
+• **sync**  – a `requests.Session` with a keep-alive `HTTPAdapter` pool per host
+  (`get`).
+• **async** – an `httpx.AsyncClient` with bounded keep-alive connections
+  (`aget`), used by the tools when the graph runs on the event loop.
+
+Both faces share the same policy, read from the `http` section of
+`config/config.yaml`:
+• connect / read timeouts,
+• bounded retries on connection errors, timeouts and retryable status codes
+  (429 / 5xx) with exponential backoff and full jitter, honouring a numeric
+  `Retry-After` header.
+
+After the last attempt the final response is returned as-is (callers keep
+checking `status_code`), or the last transport error is raised.
+
+Each call records an `http.<host>` span (see `utils/tracing.py`) with the final
+status code and the number of retries; URLs are not recorded since some
+providers embed the API key in the path.  Every failed attempt (transport
+error or HTTP status >= 400) increments `travel_planner_upstream_errors_total`.
+
+Usage
+-----
+```
+from utils.http_client import get, aget
+
+response = get("https://api.openweathermap.org/data/2.5/weather", params={...})
+response = await aget("https://api.openweathermap.org/data/2.5/weather", params={...})
+```
+Call `close_session()` / `aclose_async_client()` on application shutdown to
+release the pools.
+"""
+import asyncio
+import random
+import threading
+import time
+from typing import Any, Dict, Optional
+from urllib.parse import urlsplit
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+
+from utils.config_loader import load_config
+from utils.metrics import UPSTREAM_ERRORS
+from utils.tracing import span
+
+_HTTP_CONFIG = load_config().get("http", {})
+
+CONNECT_TIMEOUT: float = _HTTP_CONFIG.get("connect_timeout", 3.05)
+READ_TIMEOUT: float = _HTTP_CONFIG.get("read_timeout", 15.0)
+POOL_CONNECTIONS: int = _HTTP_CONFIG.get("pool_connections", 16)
+POOL_MAXSIZE: int = _HTTP_CONFIG.get("pool_maxsize", 32)
+MAX_RETRIES: int = _HTTP_CONFIG.get("max_retries", 2)
+BACKOFF_BASE: float = _HTTP_CONFIG.get("backoff_base", 0.25)
+BACKOFF_MAX: float = _HTTP_CONFIG.get("backoff_max", 4.0)
+RETRY_STATUSES = frozenset(_HTTP_CONFIG.get("retry_statuses", [429, 500, 502, 503, 504]))
+
+# Host -> provider label used in metrics (matches the tools' `metadata["provider"]`)
+PROVIDER_BY_HOST = {
+    "api.openweathermap.org": "openweathermap",
+    "v6.exchangerate-api.com": "exchangerate_api",
+}
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+_async_client: Optional[httpx.AsyncClient] = None
+
+
+def _backoff(attempt: int, retry_after: Optional[str] = None) -> float:
+    """Seconds to wait before retry number `attempt` (0-based)."""
+    if retry_after:
+        try:
+            return min(float(retry_after), BACKOFF_MAX)
+        except ValueError:
+            pass  # HTTP-date form – fall back to jittered backoff
+    return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * (2 ** attempt)))
+
+
+def _host(url: str) -> str:
+    return urlsplit(url).hostname or "unknown"
+
+
+def _span_name(url: str) -> str:
+    return f"http.{_host(url)}"
+
+
+def _provider(url: str) -> str:
+    host = _host(url)
+    return PROVIDER_BY_HOST.get(host, host)
+
+
+def get_session() -> requests.Session:
+    """Return the shared pooled `requests.Session`, creating it on first use."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE, max_retries=0)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                _session = session
+    return _session
+
+
+def get(url: str, params: Optional[Dict[str, Any]] = None, **kwargs) -> requests.Response:
+    """GET through the shared session with timeouts and bounded, jittered retries."""
+    kwargs.setdefault("timeout", (CONNECT_TIMEOUT, READ_TIMEOUT))
+    with span(_span_name(url), **{"http.method": "GET"}) as http_span:
+        for attempt in range(MAX_RETRIES + 1):
+            http_span.set_attribute("http.retries", attempt)
+            last_attempt = attempt == MAX_RETRIES
+            try:
+                response = get_session().get(url, params=params, **kwargs)
+            except (requests.ConnectionError, requests.Timeout):
+                UPSTREAM_ERRORS.inc(_provider(url), "transport")
+                if last_attempt:
+                    raise
+                time.sleep(_backoff(attempt))
+                continue
+            if response.status_code >= 400:
+                UPSTREAM_ERRORS.inc(_provider(url), "status")
+            if response.status_code in RETRY_STATUSES and not last_attempt:
+                time.sleep(_backoff(attempt, response.headers.get("Retry-After")))
+                continue
+            http_span.set_attribute("http.status_code", response.status_code)
+            return response
+
+
+def close_session() -> None:
+    """Close the shared sync session (safe to call more than once)."""
+    global _session
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+        _session = None
+
+
+def get_async_client() -> httpx.AsyncClient:
+    """Return the shared `httpx.AsyncClient`, creating it on first use."""
+    global _async_client
+    if _async_client is None or _async_client.is_closed:
+        _async_client = httpx.AsyncClient(
+            timeout=httpx.Timeout(READ_TIMEOUT, connect=CONNECT_TIMEOUT),
+            limits=httpx.Limits(max_connections=POOL_CONNECTIONS * POOL_MAXSIZE,
+                                max_keepalive_connections=POOL_MAXSIZE),
+        )
+    return _async_client
+
+
+async def aget(url: str, params: Optional[Dict[str, Any]] = None, **kwargs) -> httpx.Response:
+    """Async counterpart of `get` using the shared async client."""
+    with span(_span_name(url), **{"http.method": "GET"}) as http_span:
+        for attempt in range(MAX_RETRIES + 1):
+            http_span.set_attribute("http.retries", attempt)
+            last_attempt = attempt == MAX_RETRIES
+            try:
+                response = await get_async_client().get(url, params=params, **kwargs)
+            except httpx.TransportError:
+                UPSTREAM_ERRORS.inc(_provider(url), "transport")
+                if last_attempt:
+                    raise
+                await asyncio.sleep(_backoff(attempt))
+                continue
+            if response.status_code >= 400:
+                UPSTREAM_ERRORS.inc(_provider(url), "status")
+            if response.status_code in RETRY_STATUSES and not last_attempt:
+                await asyncio.sleep(_backoff(attempt, response.headers.get("Retry-After")))
+                continue
+            http_span.set_attribute("http.status_code", response.status_code)
+            return response
+
+
+async def aclose_async_client() -> None:
+    """Close the shared async client (safe to call more than once)."""
+    global _async_client
+    if _async_client is not None and not _async_client.is_closed:
+        await _async_client.aclose()
+    _async_client = None
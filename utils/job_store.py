@@ -0,0 +1,217 @@
+"""
+utils/job_store.py
+==================
+Storage for background trip-plan jobs (`POST /jobs`, `GET /jobs/{id}` in
+`main.py`).
+
+A `Job` moves through `queued → running → succeeded | failed`.  While it runs
+the worker appends human-readable progress events ("Calling tools: ...") so
+clients polling the job can show what the agent is doing.
+
+Two interchangeable stores are provided (`jobs.store` in
+`config/config.yaml`):
+
+• `memory` (default) – a dict guarded by a lock.  Fast, but jobs are visible
+  only to the worker process that accepted them and are lost on restart.
+• `sqlite` – one row per job in a local SQLite file (WAL mode, one connection
+  per thread, like `utils/persistent_cache.py`).  Jobs survive restarts and
+  can be polled through any uvicorn worker on the host.
+
+Finished jobs are evicted `ttl_seconds` after their last update; eviction
+runs lazily on writes, so no background thread is needed.  A worker starts a
+job only after `claim` flips it from queued to running, so a job shared
+through SQLite runs once even if several processes see it; running jobs with
+no progress for `stale_seconds` (their process died) are re-queued at startup.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from dataclasses import asdict, dataclass, field
+from typing import Dict, List, Optional
+
+from utils.config_loader import load_config
+
+QUEUED, RUNNING, SUCCEEDED, FAILED = "queued", "running", "succeeded", "failed"
+FINISHED = (SUCCEEDED, FAILED)
+
+
+@dataclass
+class Job:
+    id: str
+    question: str
+    status: str = QUEUED
+    created_at: float = field(default_factory=time.time)
+    updated_at: float = field(default_factory=time.time)
+    progress: List[str] = field(default_factory=list)
+    answer: Optional[str] = None
+    error: Optional[str] = None
+
+    @classmethod
+    def new(cls, question: str) -> "Job":
+        return cls(id=uuid.uuid4().hex, question=question)
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+class InMemoryJobStore:
+    def __init__(self, ttl_seconds: float = 3600):
+        self.ttl_seconds = ttl_seconds
+        self._jobs: Dict[str, Job] = {}
+        self._lock = threading.Lock()
+
+    def _evict(self, now: float) -> None:
+        expired = [job_id for job_id, job in self._jobs.items()
+                   if job.status in FINISHED and now - job.updated_at > self.ttl_seconds]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+    def create(self, job: Job) -> Job:
+        with self._lock:
+            self._evict(time.time())
+            self._jobs[job.id] = job
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or (job.status in FINISHED and time.time() - job.updated_at > self.ttl_seconds):
+                return None
+            # Hand out a copy so callers never observe a half-applied update
+            return Job(**{**asdict(job), "progress": list(job.progress)})
+
+    def update(self, job_id: str, progress: Optional[str] = None, **fields) -> None:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return
+            for name, value in fields.items():
+                setattr(job, name, value)
+            if progress:
+                job.progress.append(progress)
+            job.updated_at = time.time()
+
+    def claim(self, job_id: str) -> bool:
+        """Atomically move a queued job to running; False if someone else got it."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job.status != QUEUED:
+                return False
+            job.status, job.updated_at = RUNNING, time.time()
+            return True
+
+    def requeue_stale(self, stale_seconds: float) -> List[Job]:
+        """Re-queue running jobs without progress for `stale_seconds`; return all queued jobs."""
+        with self._lock:
+            now = time.time()
+            for job in self._jobs.values():
+                if job.status == RUNNING and now - job.updated_at > stale_seconds:
+                    job.status, job.updated_at = QUEUED, now
+            return [job for job in self._jobs.values() if job.status == QUEUED]
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    question TEXT NOT NULL,
+    status TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    progress TEXT NOT NULL,
+    answer TEXT,
+    error TEXT
+)
+"""
+
+
+class SQLiteJobStore:
+    def __init__(self, path: str, ttl_seconds: float = 3600):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self._local = threading.local()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connection() as conn:
+            conn.execute(_SCHEMA)
+
+    def _connection(self) -> sqlite3.Connection:
+        # sqlite3 connections must not be shared between threads
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def _row_to_job(row) -> Job:
+        return Job(id=row[0], question=row[1], status=row[2], created_at=row[3], updated_at=row[4],
+                   progress=json.loads(row[5]), answer=row[6], error=row[7])
+
+    def create(self, job: Job) -> Job:
+        with self._connection() as conn:
+            conn.execute("DELETE FROM jobs WHERE status IN (?, ?) AND updated_at < ?",
+                         (*FINISHED, time.time() - self.ttl_seconds))
+            conn.execute(
+                "INSERT INTO jobs (id, question, status, created_at, updated_at, progress, answer, error) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (job.id, job.question, job.status, job.created_at, job.updated_at,
+                 json.dumps(job.progress), job.answer, job.error),
+            )
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        row = self._connection().execute(
+            "SELECT id, question, status, created_at, updated_at, progress, answer, error FROM jobs WHERE id = ?",
+            (job_id,),
+        ).fetchone()
+        if row is None:
+            return None
+        job = self._row_to_job(row)
+        if job.status in FINISHED and time.time() - job.updated_at > self.ttl_seconds:
+            return None
+        return job
+
+    def update(self, job_id: str, progress: Optional[str] = None, **fields) -> None:
+        with self._connection() as conn:
+            if progress:
+                row = conn.execute("SELECT progress FROM jobs WHERE id = ?", (job_id,)).fetchone()
+                if row is None:
+                    return
+                fields["progress"] = json.dumps(json.loads(row[0]) + [progress])
+            fields["updated_at"] = time.time()
+            assignments = ", ".join(f"{name} = ?" for name in fields)
+            conn.execute(f"UPDATE jobs SET {assignments} WHERE id = ?", (*fields.values(), job_id))
+
+    def claim(self, job_id: str) -> bool:
+        """Atomically move a queued job to running; False if another process got it."""
+        with self._connection() as conn:
+            cursor = conn.execute("UPDATE jobs SET status = ?, updated_at = ? WHERE id = ? AND status = ?",
+                                  (RUNNING, time.time(), job_id, QUEUED))
+            return cursor.rowcount == 1
+
+    def requeue_stale(self, stale_seconds: float) -> List[Job]:
+        """Re-queue running jobs without progress for `stale_seconds`; return all queued jobs."""
+        now = time.time()
+        with self._connection() as conn:
+            conn.execute("UPDATE jobs SET status = ?, updated_at = ? WHERE status = ? AND updated_at < ?",
+                         (QUEUED, now, RUNNING, now - stale_seconds))
+        rows = self._connection().execute(
+            "SELECT id, question, status, created_at, updated_at, progress, answer, error FROM jobs "
+            "WHERE status = ? ORDER BY created_at",
+            (QUEUED,),
+        ).fetchall()
+        return [self._row_to_job(row) for row in rows]
+
+
+def build_job_store(config: Optional[dict] = None):
+    config = load_config().get("jobs", {}) if config is None else config
+    ttl_seconds = config.get("ttl_seconds", 3600)
+    if config.get("store", "memory") == "sqlite":
+        return SQLiteJobStore(config.get("path", ".cache/jobs.sqlite3"), ttl_seconds=ttl_seconds)
+    return InMemoryJobStore(ttl_seconds=ttl_seconds)
@@ -0,0 +1,58 @@
+"""
+utils/latency.py
+================
+Latency distributions for the offline fake model (`utils/fake_chat_model.py`)
+and the benchmark stub upstreams (`benchmarks/stub_servers.py`).
+
+Distributions are written as compact specs so they fit on a command line:
+
+| spec                     | meaning                                             |
+|--------------------------|-----------------------------------------------------|
+| `fixed:80`               | always 80 ms                                        |
+| `uniform:50:150`         | uniformly between 50 and 150 ms                     |
+| `lognormal:120:400`      | log-normal with median 120 ms and p95 400 ms        |
+
+Log-normal is the usual shape of network and LLM latencies: most calls are
+close to the median, with a long right tail.
+"""
+import math
+import random
+from dataclasses import dataclass
+from typing import Optional
+
+# z-score of the 95th percentile of a standard normal distribution
+_Z95 = 1.6448536269514722
+
+
+@dataclass(frozen=True)
+class LatencyModel:
+    kind: str = "fixed"
+    low_ms: float = 0.0     # fixed value / uniform lower bound / log-normal median
+    high_ms: float = 0.0    # uniform upper bound / log-normal p95
+
+    @classmethod
+    def parse(cls, spec: str) -> "LatencyModel":
+        kind, *values = spec.split(":")
+        numbers = [float(value) for value in values]
+        if kind == "fixed" and len(numbers) == 1:
+            return cls(kind, numbers[0], numbers[0])
+        if kind in ("uniform", "lognormal") and len(numbers) == 2 and numbers[0] <= numbers[1]:
+            return cls(kind, numbers[0], numbers[1])
+        raise ValueError(f"Invalid latency spec {spec!r}; expected fixed:MS, uniform:LOW:HIGH or lognormal:MEDIAN:P95")
+
+    def sample(self, rng: Optional[random.Random] = None) -> float:
+        """Draw one latency, in seconds."""
+        rng = rng or random
+        if self.kind == "uniform":
+            ms = rng.uniform(self.low_ms, self.high_ms)
+        elif self.kind == "lognormal" and self.low_ms > 0:
+            sigma = (math.log(self.high_ms) - math.log(self.low_ms)) / _Z95
+            ms = rng.lognormvariate(math.log(self.low_ms), sigma)
+        else:
+            ms = self.low_ms
+        return max(0.0, ms) / 1000
+
+    def __str__(self) -> str:
+        if self.kind == "fixed":
+            return f"fixed:{self.low_ms:g}"
+        return f"{self.kind}:{self.low_ms:g}:{self.high_ms:g}"
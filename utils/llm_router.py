@@ -0,0 +1,393 @@
+"""
+utils/llm_router.py
+===================
+Latency-aware routing and failover across several configured chat models.
+
+`LLMRouter` is itself a LangChain chat model, so `GraphBuilder` binds tools to
+it and calls it like any other LLM.  Behind it sit the chat models named in
+`llm.router.providers` (entries of the `llm` section of `config/config.yaml`,
+e.g. `openai`, `openai_mini`, `groq` or the offline `fake`).  For every call:
+
+1. **Rank** – candidates in their cooldown are skipped; with
+   `strategy: fastest` the healthy ones are ordered by their rolling median
+   latency (providers without samples yet are tried first, so each one gets
+   measured), with `strategy: ordered` they keep the configured order.
+2. **Call** – the first candidate is called with `timeout_seconds`.
+3. **Fail over** – a timeout, a 429 or an unavailable provider (5xx,
+   connection error) puts that provider into cooldown (`Retry-After` when the
+   provider sends one, else `cooldown_seconds`) and the same request moves on
+   to the next candidate.  Any other error is raised unchanged – it would
+   fail on every provider.  Providers whose error rate over the last `window`
+   calls exceeds `max_error_rate` are also cooled down.
+
+If every candidate is cooling down they are still tried, soonest-available
+first, rather than failing outright.
+
+`timeout_seconds` bounds every attempt, sync or async, whether or not the
+member's client enforces a timeout of its own.
+
+Streaming
+---------
+Members are called without the caller's callbacks; the router's own run
+reports the tokens and the result of the attempt it keeps.  When streamed
+(`astream_events`), an attempt may fail over only until its first token has
+been sent – after that its error is raised, since another provider's answer
+would be appended to the tokens the client already has.
+
+Per-node and per-turn models
+----------------------------
+`llm.router.nodes` narrows the candidates for one graph node, e.g. a cheap,
+fast model for the per-leg research loops (`plan_leg`) and a stronger model
+for the merged itinerary (`merge`).  `GraphBuilder` asks for the node's view
+with `router.for_node(name)`; all views share the same latency / health
+statistics.
+
+Within one agent loop, `turns` (at the top level or under a node) picks the
+candidates by what the turn is for (`turn_kind`):
+
+• `route` – the conversation does not end in tool results yet (the user's
+  question has just arrived): the model only has to pick tools;
+• `answer` – every tool call of the last assistant message has its result:
+  the model writes the itinerary from them (or asks for more tools).
+
+Each entry takes `providers` / `strategy` like a node; a kind without an entry
+uses the node's (or router's) candidates.  The kind is on the `llm` span as
+`llm.turn`.
+
+The members are built with `max_retries` (default 0) so SDK-level retries do
+not hide a rate-limited provider from the router.  Statistics are per
+process.  Routing decisions are visible on the `llm` span (`llm.provider`,
+`llm.failovers`) and failed attempts on `/metrics` as upstream errors of the
+member provider.
+"""
+import asyncio
+import contextvars
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import aclosing
+from statistics import median
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessageChunk, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from pydantic import ConfigDict, Field
+
+from logger.logging import get_logger
+from utils.metrics import UPSTREAM_ERRORS
+from utils.tracing import set_attribute
+
+logger = get_logger(__name__)
+
+STRATEGIES = ("fastest", "ordered")
+
+# Runs synchronous member calls when `timeout_seconds` has to be enforced
+_executor = ThreadPoolExecutor(thread_name_prefix="llm-router")
+
+
+def failover_reason(error: BaseException) -> Optional[str]:
+    """Why `error` should be retried on another provider ("rate_limited" | "timeout" | "unavailable"), else None."""
+    response = getattr(error, "response", None)
+    status = getattr(error, "status_code", None) or getattr(response, "status_code", None)
+    name = type(error).__name__
+    if status == 429 or "RateLimit" in name:
+        return "rate_limited"
+    if isinstance(error, (TimeoutError, asyncio.TimeoutError)) or "Timeout" in name:
+        return "timeout"
+    if (isinstance(status, int) and status >= 500) or "Connection" in name:
+        return "unavailable"
+    return None
+
+
+def turn_kind(messages) -> str:
+    """"answer" once every tool call of the last assistant message has its result, else "route"."""
+    if not messages or not isinstance(messages[-1], ToolMessage):
+        return "route"
+    for index in range(len(messages) - 1, -1, -1):
+        if isinstance(messages[index], AIMessage):
+            answered = {message.tool_call_id for message in messages[index + 1:] if isinstance(message, ToolMessage)}
+            pending = [call for call in messages[index].tool_calls if call.get("id") not in answered]
+            return "route" if pending else "answer"
+    return "answer"
+
+
+def _retry_after(error: BaseException) -> Optional[float]:
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+class ProviderStats:
+    """Rolling latency and error rate of one provider."""
+
+    def __init__(self, window: int = 20):
+        self.latencies = deque(maxlen=window)
+        self.outcomes = deque(maxlen=window)
+        self.cooldown_until = 0.0
+
+    @property
+    def latency(self) -> Optional[float]:
+        return median(self.latencies) if self.latencies else None
+
+    @property
+    def error_rate(self) -> float:
+        return self.outcomes.count(False) / len(self.outcomes) if self.outcomes else 0.0
+
+    def to_dict(self) -> dict:
+        return {"latency_seconds": self.latency, "error_rate": round(self.error_rate, 3), "calls": len(self.outcomes),
+                "cooling_down_for": max(0.0, round(self.cooldown_until - time.monotonic(), 1))}
+
+
+class RouterStats:
+    """Health bookkeeping shared by all views of one router."""
+
+    def __init__(self, window: int = 20, max_error_rate: float = 0.5, min_samples: int = 5,
+                 cooldown_seconds: float = 30.0):
+        self.window = window
+        self.max_error_rate = max_error_rate
+        self.min_samples = min_samples
+        self.cooldown_seconds = cooldown_seconds
+        self._providers: Dict[str, ProviderStats] = {}
+        self._lock = threading.Lock()
+
+    def __getitem__(self, provider: str) -> ProviderStats:
+        with self._lock:
+            stats = self._providers.get(provider)
+            if stats is None:
+                stats = self._providers[provider] = ProviderStats(self.window)
+            return stats
+
+    def rank(self, providers: List[str], strategy: str = "fastest") -> List[str]:
+        """Healthy providers first (fastest first, or in order), then the cooling ones, soonest first."""
+        now = time.monotonic()
+        with self._lock:
+            stats = {provider: self._providers.get(provider) or ProviderStats(self.window) for provider in providers}
+            healthy = [provider for provider in providers if stats[provider].cooldown_until <= now]
+            if strategy == "fastest":
+                # Stable sort: unmeasured providers (latency None) first, in configured order
+                healthy.sort(key=lambda provider: stats[provider].latency or 0.0)
+            cooling = sorted((provider for provider in providers if provider not in healthy),
+                             key=lambda provider: stats[provider].cooldown_until)
+        return healthy + cooling
+
+    def record_success(self, provider: str, seconds: float) -> None:
+        stats = self[provider]
+        with self._lock:
+            stats.latencies.append(seconds)
+            stats.outcomes.append(True)
+
+    def record_failure(self, provider: str, reason: Optional[str], retry_after: Optional[float] = None) -> None:
+        stats = self[provider]
+        with self._lock:
+            stats.outcomes.append(False)
+            unhealthy = len(stats.outcomes) >= self.min_samples and stats.error_rate > self.max_error_rate
+            if reason is not None or unhealthy:
+                cooldown = retry_after if retry_after is not None else self.cooldown_seconds
+                stats.cooldown_until = max(stats.cooldown_until, time.monotonic() + cooldown)
+
+    def snapshot(self) -> Dict[str, dict]:
+        with self._lock:
+            return {provider: stats.to_dict() for provider, stats in self._providers.items()}
+
+
+class LLMRouter(BaseChatModel):
+    models: Dict[str, Any]
+    providers: List[str]
+    strategy: str = "fastest"
+    timeout_seconds: Optional[float] = None
+    nodes: Dict[str, dict] = Field(default_factory=dict)
+    turns: Dict[str, dict] = Field(default_factory=dict)
+    stats: RouterStats = Field(default_factory=RouterStats)
+    model_name: str = "router"
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    @property
+    def _llm_type(self) -> str:
+        return "llm-router"
+
+    def bind_tools(self, tools, **kwargs) -> "LLMRouter":
+        # Bind on every member; the view keeps sharing `stats`
+        return self.model_copy(update={"models": {name: model.bind_tools(tools, **kwargs)
+                                                  for name, model in self.models.items()}})
+
+    def for_node(self, node: str) -> "LLMRouter":
+        """The router restricted to the candidates configured for graph node `node`."""
+        config = self.nodes.get(node)
+        if not config:
+            return self
+        return self.model_copy(update={"providers": config.get("providers", self.providers),
+                                       "strategy": config.get("strategy", self.strategy),
+                                       "turns": config.get("turns", self.turns)})
+
+    def _candidates(self, messages) -> List[str]:
+        """Providers to try for this call, best first, for the kind of turn `messages` ends in."""
+        kind = turn_kind(messages)
+        set_attribute("llm.turn", kind)
+        turn = self.turns.get(kind) or {}
+        return self.stats.rank(turn.get("providers", self.providers), turn.get("strategy", self.strategy))
+
+    def _failed(self, provider: str, error: BaseException, failovers: int, streamed: bool = False) -> bool:
+        """
+        Record a failed attempt; True when the request should move on to the next provider.
+
+        An attempt that already streamed tokens never fails over: the next
+        provider's answer would be appended to what the client has received.
+        """
+        reason = failover_reason(error)
+        self.stats.record_failure(provider, reason, _retry_after(error) if reason == "rate_limited" else None)
+        UPSTREAM_ERRORS.inc(provider, reason or "exception")
+        if reason is None or streamed:
+            return False
+        logger.warning("LLM provider %s failed (%s), failing over: %r", provider, reason, error)
+        set_attribute("llm.failovers", failovers + 1)
+        return True
+
+    def _succeeded(self, provider: str, started: float) -> None:
+        self.stats.record_success(provider, time.perf_counter() - started)
+        set_attribute("llm.provider", provider)
+
+    def _result(self, provider: str, message, started: float) -> ChatResult:
+        self._succeeded(provider, started)
+        message.response_metadata = {**(message.response_metadata or {}), "router_provider": provider}
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _remaining(self, started: float) -> Optional[float]:
+        if not self.timeout_seconds:
+            return None
+        return max(0.0, self.timeout_seconds - (time.perf_counter() - started))
+
+    def _within(self, started: float, fn: Callable, *args, **kwargs):
+        """`fn(*args, **kwargs)` within what is left of `timeout_seconds` since `started`."""
+        remaining = self._remaining(started)
+        if remaining is None:
+            return fn(*args, **kwargs)
+        # A member that overruns keeps its worker thread until it returns
+        return _executor.submit(contextvars.copy_context().run, fn, *args, **kwargs).result(timeout=remaining)
+
+    # Members are called with no callbacks of their own: only the router's run
+    # reports tokens and results, so a failed attempt never reaches astream_events.
+    def _generate(self, messages, stop: Optional[List[str]] = None, run_manager=None, **kwargs) -> ChatResult:
+        last_error = None
+        for failovers, provider in enumerate(self._candidates(messages)):
+            started = time.perf_counter()
+            try:
+                message = self._within(started, self.models[provider].invoke, messages,
+                                       config={"callbacks": []}, stop=stop, **kwargs)
+            except Exception as error:
+                if not self._failed(provider, error, failovers):
+                    raise
+                last_error = error
+                continue
+            return self._result(provider, message, started)
+        raise last_error or RuntimeError("LLM router has no providers configured")
+
+    async def _agenerate(self, messages, stop: Optional[List[str]] = None, run_manager=None,
+                         **kwargs) -> ChatResult:
+        last_error = None
+        for failovers, provider in enumerate(self._candidates(messages)):
+            started = time.perf_counter()
+            try:
+                message = await asyncio.wait_for(
+                    self.models[provider].ainvoke(messages, config={"callbacks": []}, stop=stop, **kwargs),
+                    self.timeout_seconds)
+            except Exception as error:
+                if not self._failed(provider, error, failovers):
+                    raise
+                last_error = error
+                continue
+            return self._result(provider, message, started)
+        raise last_error or RuntimeError("LLM router has no providers configured")
+
+    def _stream(self, messages, stop: Optional[List[str]] = None, run_manager=None,
+                **kwargs) -> Iterator[ChatGenerationChunk]:
+        last_error = None
+        for failovers, provider in enumerate(self._candidates(messages)):
+            started = time.perf_counter()
+            chunks = self.models[provider].stream(messages, config={"callbacks": []}, stop=stop, **kwargs)
+            streamed = False
+            try:
+                while (chunk := self._within(started, next, chunks, None)) is not None:
+                    yield self._chunk(provider, chunk, first=not streamed)
+                    streamed = True
+            except Exception as error:
+                if not self._failed(provider, error, failovers, streamed):
+                    raise
+                last_error = error
+                continue
+            self._succeeded(provider, started)
+            return
+        raise last_error or RuntimeError("LLM router has no providers configured")
+
+    async def _astream(self, messages, stop: Optional[List[str]] = None, run_manager=None,
+                       **kwargs) -> AsyncIterator[ChatGenerationChunk]:
+        last_error = None
+        for failovers, provider in enumerate(self._candidates(messages)):
+            started = time.perf_counter()
+            streamed = False
+            try:
+                async with aclosing(self.models[provider].astream(
+                        messages, config={"callbacks": []}, stop=stop, **kwargs)) as chunks:
+                    while (chunk := await asyncio.wait_for(anext(chunks, None), self._remaining(started))) is not None:
+                        yield self._chunk(provider, chunk, first=not streamed)
+                        streamed = True
+            except Exception as error:
+                if not self._failed(provider, error, failovers, streamed):
+                    raise
+                last_error = error
+                continue
+            self._succeeded(provider, started)
+            return
+        raise last_error or RuntimeError("LLM router has no providers configured")
+
+    @staticmethod
+    def _chunk(provider: str, chunk, first: bool) -> ChatGenerationChunk:
+        if not isinstance(chunk, BaseMessageChunk):
+            # Members without native streaming yield their whole answer as one message
+            chunk = AIMessageChunk(**chunk.model_dump(exclude={"type"}))
+        if first:
+            # Chunk metadata is merged by concatenation, so the provider is named once
+            chunk.response_metadata = {**(chunk.response_metadata or {}), "router_provider": provider}
+        return ChatGenerationChunk(message=chunk)
+
+
+def build_router(config: Dict[str, Any], load_member: Callable[..., Any]) -> LLMRouter:
+    """
+    Build an `LLMRouter` from the `llm.router` config section.
+
+    Args:
+        config (dict): `providers`, `strategy`, `timeout_seconds`, `max_retries`,
+            `window`, `max_error_rate`, `min_samples`, `cooldown_seconds`, `nodes`, `turns`
+        load_member (callable): `(name, **client_options) -> chat model` for one `llm` entry
+
+    Returns:
+        LLMRouter: Router over every provider named in `providers`, `nodes` or `turns`
+    """
+    providers = list(config.get("providers", []))
+    nodes = config.get("nodes", {}) or {}
+    turns = config.get("turns", {}) or {}
+    # Every candidate list: the router's, each node's and each turn kind's (top level or per node)
+    views = [config, *nodes.values(), *turns.values(),
+             *(turn for node in nodes.values() for turn in (node.get("turns") or {}).values())]
+    strategies = {view.get("strategy", "fastest") for view in views}
+    if not providers or not strategies <= set(STRATEGIES):
+        raise ValueError(f"llm.router needs `providers` and a strategy in {STRATEGIES}")
+    names = dict.fromkeys(name for view in views for name in view.get("providers", []))
+    timeout = config.get("timeout_seconds")
+    client_options = {"max_retries": config.get("max_retries", 0), **({"timeout": timeout} if timeout else {})}
+    return LLMRouter(
+        models={name: load_member(name, **client_options) for name in names},
+        providers=providers,
+        strategy=config.get("strategy", "fastest"),
+        timeout_seconds=timeout,
+        nodes=nodes,
+        turns=turns,
+        stats=RouterStats(window=config.get("window", 20), max_error_rate=config.get("max_error_rate", 0.5),
+                          min_samples=config.get("min_samples", 5),
+                          cooldown_seconds=config.get("cooldown_seconds", 30)),
+        model_name=config.get("model_name", "router"),
+    )
@@ -0,0 +1,77 @@
+"""
+utils/message_window.py
+=======================
+History windowing for the agent's LLM calls.
+
+A trip plan is a long tool loop: every turn re-sends the full conversation,
+including multi-kilobyte place-search and forecast payloads from earlier
+rounds that the model has already digested.  `compact_messages` keeps the
+prompt under a token budget by replacing the content of *older* tool outputs
+with a short preview, oldest first, until the estimate fits.
+
+Guarantees
+----------
+• Only the copy sent to the LLM is compacted – the graph state keeps the full
+  history.
+• Tool results answering the latest assistant turn are never touched, so the
+  model always sees the data it just asked for in full.
+• Message order and `tool_call_id` pairing are preserved; only `content`
+  changes.
+• Compaction is deterministic, so a message that has been truncated once is
+  truncated identically on every later turn (the prompt prefix stays stable).
+
+Token counts are estimated at ~4 characters per token, which is accurate
+enough for budgeting and costs nothing to compute.
+"""
+from typing import List, Sequence
+
+from langchain_core.messages import AIMessage, BaseMessage, ToolMessage
+
+CHARS_PER_TOKEN = 4
+
+
+def _content_text(message: BaseMessage) -> str:
+    content = message.content
+    return content if isinstance(content, str) else str(content)
+
+
+def estimate_tokens(message: BaseMessage) -> int:
+    """Cheap token estimate for one message (content plus tool-call arguments)."""
+    chars = len(_content_text(message))
+    for call in getattr(message, "tool_calls", None) or []:
+        chars += len(str(call.get("args", "")))
+    return chars // CHARS_PER_TOKEN + 4
+
+
+def _latest_turn_start(messages: Sequence[BaseMessage]) -> int:
+    """Index of the last assistant message; tool outputs after it are protected."""
+    for index in range(len(messages) - 1, -1, -1):
+        if isinstance(messages[index], AIMessage):
+            return index
+    return len(messages)
+
+
+def compact_messages(messages: Sequence[BaseMessage], token_budget: int, preview_chars: int = 400) -> List[BaseMessage]:
+    """Return `messages` with older tool outputs truncated to fit `token_budget`.
+
+    If the history already fits, the input sequence is returned unchanged
+    (as a list) without copying any message.
+    """
+    total = sum(estimate_tokens(message) for message in messages)
+    if token_budget is None or total <= token_budget:
+        return list(messages)
+
+    compacted = list(messages)
+    protected_from = _latest_turn_start(compacted)
+    for index in range(protected_from):
+        if total <= token_budget:
+            break
+        message = compacted[index]
+        text = _content_text(message)
+        if not isinstance(message, ToolMessage) or len(text) <= preview_chars:
+            continue
+        preview = f"{text[:preview_chars]}… [truncated {len(text) - preview_chars} chars of earlier {message.name or 'tool'} output]"
+        shortened = message.model_copy(update={"content": preview})
+        total -= estimate_tokens(message) - estimate_tokens(shortened)
+        compacted[index] = shortened
+    return compacted
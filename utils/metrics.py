@@ -0,0 +1,273 @@
+"""
+utils/metrics.py
+================
+In-process metrics registry rendered in the Prometheus text exposition format
+by `GET /metrics` (see `main.py`).
+
+Hot paths (every request, agent turn, tool call and upstream call) update
+these metrics, so updates never take a lock: each thread writes to its own
+**shard** (a plain dict owned by that thread) and a scrape sums the shards.
+Only the first update from a new thread registers its shard under a lock.
+asyncio code runs on the event-loop thread and therefore shares one shard.
+
+Metric types
+------------
+• `Counter`   – monotonically increasing (`inc`).
+• `Gauge`     – goes up and down (`inc` / `dec`), or is read from a callback
+  at scrape time (`set_function`).
+• `Histogram` – cumulative buckets plus `_sum` / `_count` (`observe`, or
+  `time()` as a context manager).
+
+All metrics take label values positionally in the order of `labelnames`:
+```
+TOOL_CALLS.inc("search_attractions", "ok")
+with TOOL_LATENCY.time("search_attractions"):
+    ...
+```
+The application metrics used across the project are defined at the bottom of
+this module.
+"""
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(f'{extra[0]}="{extra[1]}"')
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._local = threading.local()
+        self._shards: List[dict] = []
+        self._shards_lock = threading.Lock()
+
+    def _shard(self) -> dict:
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = {}
+            with self._shards_lock:
+                self._shards.append(shard)
+            self._local.shard = shard
+        return shard
+
+    def _snapshot_shards(self) -> List[dict]:
+        with self._shards_lock:
+            shards = list(self._shards)
+        # Copy each shard so a concurrent first-time insert cannot break iteration
+        return [dict(shard) for shard in shards]
+
+    def _check(self, labels: LabelValues) -> LabelValues:
+        if len(labels) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {labels}")
+        return labels
+
+    def _header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+    def render(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        shard = self._shard()
+        key = self._check(labels)
+        shard[key] = shard.get(key, 0) + amount
+
+    def values(self) -> Dict[LabelValues, float]:
+        totals: Dict[LabelValues, float] = {}
+        for shard in self._snapshot_shards():
+            for key, value in shard.items():
+                totals[key] = totals.get(key, 0) + value
+        return totals
+
+    def render(self) -> List[str]:
+        lines = self._header()
+        for labels, value in sorted(self.values().items()):
+            lines.append(f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}")
+        return lines
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._functions: Dict[LabelValues, Callable[[], float]] = {}
+
+    def dec(self, *labels: str, amount: float = 1) -> None:
+        self.inc(*labels, amount=-amount)
+
+    @contextmanager
+    def track_inprogress(self, *labels: str) -> Iterator[None]:
+        self.inc(*labels)
+        try:
+            yield
+        finally:
+            self.dec(*labels)
+
+    def set_function(self, function: Callable[[], float], *labels: str) -> None:
+        """Read the value from `function` at scrape time instead of tracking it."""
+        self._functions[self._check(labels)] = function
+
+    def values(self) -> Dict[LabelValues, float]:
+        totals = super().values()
+        for labels, function in list(self._functions.items()):
+            totals[labels] = function()
+        return totals
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, *labels: str) -> None:
+        shard = self._shard()
+        key = self._check(labels)
+        state = shard.get(key)
+        if state is None:
+            # [per-bucket counts..., +Inf count, sum]
+            state = shard[key] = [0] * (len(self.buckets) + 1) + [0.0]
+        state[bisect_left(self.buckets, value)] += 1
+        state[-1] += value
+
+    @contextmanager
+    def time(self, *labels: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, *labels)
+
+    def values(self) -> Dict[LabelValues, List[float]]:
+        totals: Dict[LabelValues, List[float]] = {}
+        for shard in self._snapshot_shards():
+            for key, state in shard.items():
+                total = totals.setdefault(key, [0] * (len(self.buckets) + 1) + [0.0])
+                for index, value in enumerate(list(state)):
+                    total[index] += value
+        return totals
+
+    def render(self) -> List[str]:
+        lines = self._header()
+        for labels, state in sorted(self.values().items()):
+            cumulative = 0
+            for bound, count in zip((*self.buckets, float("inf")), state[:-1]):
+                cumulative += count
+                le = ("le", _format_value(bound))
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}")
+            label_text = _format_labels(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{label_text} {_format_value(state[-1])}")
+            lines.append(f"{self.name}_count{label_text} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                if type(existing) is not type(metric) or existing.labelnames != metric.labelnames:
+                    raise ValueError(f"Metric {metric.name} already registered with a different shape")
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines: List[str] = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+registry = MetricsRegistry()
+
+# -- application metrics ------------------------------------------------------------
+HTTP_REQUESTS = registry.counter(
+    "travel_planner_http_requests_total", "HTTP requests handled, by route and status code.", ("path", "status"))
+HTTP_IN_FLIGHT = registry.gauge(
+    "travel_planner_http_requests_in_flight", "HTTP requests currently being handled, by route.", ("path",))
+HTTP_LATENCY = registry.histogram(
+    "travel_planner_http_request_duration_seconds", "End-to-end HTTP request latency, by route.", ("path",),
+    buckets=(0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0))
+AGENT_TURN_LATENCY = registry.histogram(
+    "travel_planner_agent_turn_duration_seconds", "Latency of one agent (LLM) turn.", ("model",))
+TOOL_CALLS = registry.counter(
+    "travel_planner_tool_calls_total", "Tool calls executed, by tool and outcome (ok|error).", ("tool", "status"))
+TOOL_LATENCY = registry.histogram(
+    "travel_planner_tool_duration_seconds", "Latency of one tool call, including provider queueing.", ("tool",))
+UPSTREAM_ERRORS = registry.counter(
+    "travel_planner_upstream_errors_total",
+    "Failed upstream calls, by provider and kind (transport|status|exception|empty).", ("provider", "kind"))
+LLM_TOKENS = registry.counter(
+    "travel_planner_llm_tokens_total", "LLM tokens consumed, by model and direction (input|output).",
+    ("model", "direction"))
+LLM_PROMPT_CACHE_TOKENS = registry.counter(
+    "travel_planner_llm_prompt_cache_tokens_total",
+    "LLM input tokens by provider prompt-cache status (cached|uncached).", ("model", "status"))
+ADMISSION_QUEUE_DEPTH = registry.gauge(
+    "travel_planner_admission_queue_depth", "Agent runs waiting for admission, by lane.", ("lane",))
+ADMISSION_ACTIVE = registry.gauge(
+    "travel_planner_admission_active_runs", "Agent runs currently admitted (this worker).")
+ADMISSION_WAIT = registry.histogram(
+    "travel_planner_admission_wait_seconds", "Time spent waiting for admission, by lane.", ("lane",),
+    buckets=(0.001, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0))
+ADMISSION_REJECTED = registry.counter(
+    "travel_planner_admission_rejected_total", "Agent runs rejected with 503, by lane and reason.",
+    ("lane", "reason"))
+PLACE_CACHE_EVENTS = registry.counter(
+    "travel_planner_place_cache_events_total",
+    "Place-search cache events, by provider, category and result "
+    "(hit|stale|miss|refresh|refresh_error|write).", ("provider", "category", "result"))
+COALESCED_REQUESTS = registry.counter(
+    "travel_planner_coalesced_requests_total", "Requests that joined an identical in-flight agent run.")
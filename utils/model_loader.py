@@ -10,39 +10,54 @@ Supported providers (out of the box):
 • **OpenAI** – default; controlled via `OPENAI_API_KEY`.  
 • **Groq** – experimental high-throughput chat completion endpoint; controlled
   via `GROQ_API_KEY`.
+• **Fake** – offline replay of a recorded agent script
+  (`utils/fake_chat_model.py`); no key, no network.
+• **Router** – several of the above behind one latency-aware, failing-over
+  model (`utils/llm_router.py`).
 
 How provider selection works
 ---------------------------
-1. When you create `ModelLoader(model_provider="openai")` (or omit the argument)
-   the class trivially passes.
-2. Internally we read `config/config.yaml` to fetch the model name for that
-   provider so you can keep hard-coded strings out of your code.
+1. `ModelLoader(model_provider=...)` takes the *name* of an entry of the `llm`
+   section of `config/config.yaml` (`openai` when omitted).  Several entries
+   may use the same provider – e.g. `openai` and `openai_mini` for a strong
+   and a cheap model.
+2. The entry's `provider` field picks the client class and `model_name` the
+   model, so you can keep hard-coded strings out of your code.
+   `ModelLoader(model_provider="openai", model_name="gpt-4o")` overrides the
+   model of a single entry (not of the router).
 
 Adding a new provider
 ---------------------
 Subclassing `ModelLoader` isn’t necessary; just extend the `load_llm` method
-with an `elif` block and—optionally—update the YAML schema to include model
+with an `elif` block (and `PROVIDERS`) and—optionally—update the YAML schema to include model
 parameters for the new provider.
 """
 import os
 from dotenv import load_dotenv
-from typing import Literal, Optional, Any
+from typing import Optional, Any
 from pydantic import BaseModel, Field
 from utils.config_loader import load_config
 from langchain_groq import ChatGroq
 from langchain_openai import ChatOpenAI
+from logger.logging import get_logger
+
+logger = get_logger(__name__)
+
+PROVIDERS = ("openai", "groq", "fake", "router")
 
 
 class ConfigLoader:
     def __init__(self):
-        print(f"Loaded config.....")
         self.config = load_config()
+        logger.debug("Loaded config")
     
     def __getitem__(self, key):
         return self.config[key]
 
 class ModelLoader(BaseModel):
-    model_provider: Literal["openai"] = "openai"
+    model_provider: str = "openai"
+    # Overrides the entry's `model_name` (e.g. "gpt-4o" for the `openai` entry)
+    model_name: Optional[str] = None
     config: Optional[ConfigLoader] = Field(default=None, exclude=True)
 
     def model_post_init(self, __context: Any) -> None:
@@ -51,22 +66,38 @@ class ModelLoader(BaseModel):
     class Config:
         arbitrary_types_allowed = True
     
-    def load_llm(self):
+    def load_llm(self, **client_options):
         """
         Load and return the LLM model.
+
+        `client_options` (e.g. `timeout`, `max_retries`) are passed to the
+        provider's client.
         """
-        print("LLM loading...")
-        print(f"Loading model from provider: {self.model_provider}")
-        if self.model_provider == "groq":
-            print("Loading LLM from Groq..............")
+        entry = self.config["llm"].get(self.model_provider)
+        if entry is None:
+            raise ValueError(f"No `llm.{self.model_provider}` entry in config/config.yaml")
+        provider = entry.get("provider", self.model_provider)
+        if self.model_name:
+            entry = {**entry, "model_name": self.model_name} if provider != "router" else entry
+            if provider == "router" and self.model_name != entry.get("model_name", "router"):
+                raise ValueError("`model_name` cannot override a router; name its member models instead")
+        logger.info("Loading LLM %s from provider: %s", self.model_provider, provider)
+        if provider == "groq":
             groq_api_key = os.getenv("GROQ_API_KEY")
-            model_name = self.config["llm"]["groq"]["model_name"]
-            llm=ChatGroq(model=model_name, api_key=groq_api_key)
-        elif self.model_provider == "openai":
-            print("Loading LLM from OpenAI..............")
+            model_name = entry["model_name"]
+            llm=ChatGroq(model=model_name, api_key=groq_api_key, **client_options)
+        elif provider == "openai":
             openai_api_key = os.getenv("OPENAI_API_KEY")
-            model_name = self.config["llm"]["openai"]["model_name"]
-            llm = ChatOpenAI(model=model_name, api_key=openai_api_key)
+            model_name = entry["model_name"]
+            llm = ChatOpenAI(model=model_name, api_key=openai_api_key, **client_options)
+        elif provider == "fake":
+            from utils.fake_chat_model import ScriptedChatModel
+            llm = ScriptedChatModel.from_config(entry)
+        elif provider == "router":
+            from utils.llm_router import build_router
+            llm = build_router(entry, lambda name, **options: ModelLoader(model_provider=name).load_llm(**options))
+        else:
+            raise ValueError(f"Unknown LLM provider {provider!r} for `llm.{self.model_provider}`; "
+                             f"expected one of {PROVIDERS}")
         
         return llm
-    
\ No newline at end of file
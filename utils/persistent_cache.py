@@ -0,0 +1,303 @@
+"""
+utils/persistent_cache.py
+=========================
+Disk-backed cache for place-search results (attractions, restaurants,
+activities, transportation), stored in a local **SQLite** database.
+
+Why on disk?
+------------
+These lists barely change from one day to the next, yet every lookup used to
+hit a paid API.  An in-memory cache would be lost on restart and duplicated per
+uvicorn worker; a SQLite file in WAL mode survives restarts and is shared by all
+workers on the host (WAL lets readers proceed while one writer commits).
+
+Freshness model
+---------------
+• Entries younger than the category TTL (`place_cache.ttl_seconds`) are served
+  directly – a **hit**.
+• With `stale_while_revalidate` enabled, entries past their TTL but within
+  `stale_ttl_seconds` are still served immediately – a **stale hit** – while a
+  background refresh fetches a new value (at most one refresh per key in
+  flight per process).
+• Anything older, or missing, is fetched inline – a **miss**.
+
+Only useful results are written (see `should_store`), so an error string or an
+empty answer never pins a bad value into the cache.
+
+`get` / `aget` only look an entry up (serving hits and stale hits) and return
+None on a miss, so a caller can answer from disk before starting upstream
+work; `get_or_fetch` / `aget_or_fetch` also fetch and store on a miss (pass
+`lookup=False` when `get` has just missed, so SQLite is read once).  Concurrent
+misses for one key share a single fetch (`SingleFlight` / `AsyncSingleFlight`),
+background refreshes hold the provider's `provider_limiter` slot like any
+other upstream call, and the async face runs its SQLite I/O on worker threads.
+
+Every lookup, refresh and write is counted on `/metrics` as
+`travel_planner_place_cache_events_total{provider,category,result}` (result
+`hit`, `stale`, `miss`, `refresh`, `refresh_error` or `write`), so the cache
+can be sized per category.  The same counters, summed over providers and
+categories, are returned by `stats()` (`GET /cache/stats`); both are per
+process.
+"""
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from utils.cache import AsyncSingleFlight, SingleFlight, normalize_location
+from utils.concurrency import ProviderLimiter, provider_limiter
+from utils.config_loader import load_config
+from utils.metrics import PLACE_CACHE_EVENTS
+from utils.search_strategy import LIMITER_KEYS, is_useful
+from utils.tracing import record_cache
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS place_cache (
+    key TEXT PRIMARY KEY,
+    category TEXT NOT NULL,
+    value TEXT NOT NULL,
+    stored_at REAL NOT NULL
+)
+"""
+
+# `stats()` name -> `result` label of PLACE_CACHE_EVENTS
+_RESULTS = {"hits": "hit", "stale_hits": "stale", "misses": "miss", "refreshes": "refresh",
+            "refresh_errors": "refresh_error", "writes": "write"}
+
+
+class PersistentCache:
+    def __init__(self, path: str, ttl_seconds: Dict[str, float], stale_ttl_seconds: float = 0,
+                 stale_while_revalidate: bool = True, should_store: Callable[[Any], bool] = bool,
+                 enabled: bool = True, limiter: Optional[ProviderLimiter] = None,
+                 limiter_keys: Optional[Dict[str, str]] = None):
+        self.path = path
+        self.ttl_seconds = dict(ttl_seconds)
+        self.stale_ttl_seconds = stale_ttl_seconds
+        self.stale_while_revalidate = stale_while_revalidate
+        self.should_store = should_store
+        self.enabled = enabled
+        self.limiter = limiter or ProviderLimiter()
+        self.limiter_keys = dict(limiter_keys or {})
+        self._flights = SingleFlight()
+        self._async_flights = AsyncSingleFlight()
+        self._local = threading.local()
+        self._counters = Counter()
+        self._counter_lock = threading.Lock()
+        self._refreshing = set()
+        self._refresh_lock = threading.Lock()
+        self._refresh_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="cache-refresh")
+        self._refresh_tasks = set()
+        if enabled:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with self._connection() as conn:
+                conn.execute(_SCHEMA)
+
+    # -- storage -----------------------------------------------------------------
+    def _connection(self) -> sqlite3.Connection:
+        # sqlite3 connections must not be shared between threads
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def make_key(provider: str, category: str, place: str) -> str:
+        return f"{provider}:{category}:{normalize_location(place)}"
+
+    def ttl_for(self, category: str) -> float:
+        return self.ttl_seconds.get(category, self.ttl_seconds.get("default", 86400))
+
+    def _read(self, key: str):
+        row = self._connection().execute("SELECT value, stored_at FROM place_cache WHERE key = ?", (key,)).fetchone()
+        return (json.loads(row[0]), row[1]) if row else (None, None)
+
+    def _write(self, key: str, provider: str, category: str, value: Any) -> None:
+        if not self.should_store(value):
+            return
+        with self._connection() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO place_cache (key, category, value, stored_at) VALUES (?, ?, ?, ?)",
+                (key, category, json.dumps(value, default=str), time.time()),
+            )
+        self._count("writes", provider, category)
+
+    @staticmethod
+    def _provider_name(provider: str) -> str:
+        # "google.v2" -> "google": the version only namespaces the stored payloads
+        return provider.split(".", 1)[0]
+
+    def _limiter_key(self, provider: str) -> Optional[str]:
+        return self.limiter_keys.get(self._provider_name(provider))
+
+    def _count(self, name: str, provider: str, category: str) -> None:
+        with self._counter_lock:
+            self._counters[name] += 1
+        PLACE_CACHE_EVENTS.inc(self._provider_name(provider), category, _RESULTS[name])
+
+    def stats(self) -> Dict[str, int]:
+        with self._counter_lock:
+            counters = dict(self._counters)
+        return {name: counters.get(name, 0) for name in _RESULTS}
+
+    def _lookup(self, key: str, category: str):
+        """Classify the cached entry as ("hit" | "stale" | "miss", value)."""
+        value, stored_at = self._read(key)
+        if stored_at is None:
+            return "miss", None
+        age = time.time() - stored_at
+        if age <= self.ttl_for(category):
+            return "hit", value
+        if self.stale_while_revalidate and age <= self.ttl_for(category) + self.stale_ttl_seconds:
+            return "stale", value
+        return "miss", None
+
+    def _claim_refresh(self, key: str) -> bool:
+        with self._refresh_lock:
+            if key in self._refreshing:
+                return False
+            self._refreshing.add(key)
+            return True
+
+    def _release_refresh(self, key: str) -> None:
+        with self._refresh_lock:
+            self._refreshing.discard(key)
+
+    # -- sync face -----------------------------------------------------------------
+    def _refresh(self, key: str, provider: str, category: str, fetch: Callable[[], Any]) -> None:
+        try:
+            with self.limiter.limit(self._limiter_key(provider)):
+                value = fetch()
+            self._write(key, provider, category, value)
+            self._count("refreshes", provider, category)
+        except Exception:
+            self._count("refresh_errors", provider, category)
+        finally:
+            self._release_refresh(key)
+
+    def get(self, provider: str, category: str, place: str, fetch: Callable[[], Any]) -> Optional[Any]:
+        """
+        The cached value for `provider`/`category`/`place`, or None on a miss.
+
+        A stale entry is returned too, with a background refresh through `fetch`.
+        """
+        if not self.enabled:
+            return None
+        key = self.make_key(provider, category, place)
+        state, value = self._lookup(key, category)
+        if state == "miss":
+            return None
+        record_cache("place_search", state)
+        if state == "hit":
+            self._count("hits", provider, category)
+            return value
+        self._count("stale_hits", provider, category)
+        if self._claim_refresh(key):
+            self._refresh_executor.submit(self._refresh, key, provider, category, fetch)
+        return value
+
+    def get_or_fetch(self, provider: str, category: str, place: str, fetch: Callable[[], Any],
+                     lookup: bool = True) -> Any:
+        """
+        Serve `provider`/`category`/`place` from disk, calling `fetch` as needed.
+
+        With `lookup=False` the caller has already missed in `get`, so the
+        value is fetched (once for all concurrent callers) and stored directly.
+        """
+        if not self.enabled:
+            return fetch()
+        if lookup:
+            value = self.get(provider, category, place, fetch)
+            if value is not None:
+                return value
+        record_cache("place_search", "miss")
+        self._count("misses", provider, category)
+        key = self.make_key(provider, category, place)
+
+        def fetch_and_store():
+            value = fetch()
+            self._write(key, provider, category, value)
+            return value
+
+        return self._flights.do(key, fetch_and_store)
+
+    # -- async face ----------------------------------------------------------------
+    # SQLite reads and writes run on worker threads so they never block the event loop.
+    async def _arefresh(self, key: str, provider: str, category: str,
+                        afetch: Callable[[], Awaitable[Any]]) -> None:
+        try:
+            async with self.limiter.alimit(self._limiter_key(provider)):
+                value = await afetch()
+            await asyncio.to_thread(self._write, key, provider, category, value)
+            self._count("refreshes", provider, category)
+        except Exception:
+            self._count("refresh_errors", provider, category)
+        finally:
+            self._release_refresh(key)
+
+    async def aget(self, provider: str, category: str, place: str,
+                   afetch: Callable[[], Awaitable[Any]]) -> Optional[Any]:
+        """Async counterpart of `get`; refreshes run as background tasks."""
+        if not self.enabled:
+            return None
+        key = self.make_key(provider, category, place)
+        state, value = await asyncio.to_thread(self._lookup, key, category)
+        if state == "miss":
+            return None
+        record_cache("place_search", state)
+        if state == "hit":
+            self._count("hits", provider, category)
+            return value
+        self._count("stale_hits", provider, category)
+        if self._claim_refresh(key):
+            # Keep a reference so the background task is not garbage-collected
+            task = asyncio.ensure_future(self._arefresh(key, provider, category, afetch))
+            self._refresh_tasks.add(task)
+            task.add_done_callback(self._refresh_tasks.discard)
+        return value
+
+    async def aget_or_fetch(self, provider: str, category: str, place: str,
+                            afetch: Callable[[], Awaitable[Any]], lookup: bool = True) -> Any:
+        """Async counterpart of `get_or_fetch`."""
+        if not self.enabled:
+            return await afetch()
+        if lookup:
+            value = await self.aget(provider, category, place, afetch)
+            if value is not None:
+                return value
+        record_cache("place_search", "miss")
+        self._count("misses", provider, category)
+        key = self.make_key(provider, category, place)
+
+        async def fetch_and_store():
+            value = await afetch()
+            await asyncio.to_thread(self._write, key, provider, category, value)
+            return value
+
+        return await self._async_flights.do(key, fetch_and_store)
+
+
+def _build_place_cache() -> PersistentCache:
+    config = load_config().get("place_cache", {})
+    return PersistentCache(
+        path=config.get("path", ".cache/place_search.sqlite3"),
+        ttl_seconds=config.get("ttl_seconds", {"default": 86400}),
+        stale_ttl_seconds=config.get("stale_ttl_seconds", 7 * 86400),
+        stale_while_revalidate=config.get("stale_while_revalidate", True),
+        should_store=is_useful,
+        enabled=config.get("enabled", True),
+        limiter=provider_limiter,
+        limiter_keys=LIMITER_KEYS,
+    )
+
+
+place_cache = _build_place_cache()
@@ -15,89 +15,253 @@ logic.
 Fallback strategy
 -----------------
 If Google Places fails (missing API key, quota exceeded, etc.) the agent falls
-back to Tavily so users still receive an answer.
+back to Tavily so users still receive an answer.  Whether Tavily is tried only
+after a failure, hedged after a p95 delay, or raced against Google is decided
+by `utils/search_strategy.py`.
 
 Extending
 ---------
 • Implement additional `google_search_*` or `tavily_search_*` methods for new
   categories (night-life, museums, etc.).  
 • Update `tools/place_search_tool.py` to surface them to the LLM.
+
+Tavily clients
+--------------
+`TavilySearch` objects are built once per process and per distinct parameter
+set (see `get_tavily_client`) and shared across threads and asyncio tasks, all
+on top of the API wrapper of the first client, so the fallback path no longer
+pays for client construction and key lookup on every query.  They are created
+lazily on the first Tavily search: a missing `TAVILY_API_KEY` only fails the
+fallback, never `GraphBuilder` or app start-up.  Query parameters are
+configured per category under `tavily` in `config/config.yaml`.
+
+Both upstreams can be redirected (e.g. to the stub servers in `benchmarks/`)
+with `place_search.google_base_url` and `tavily.base_url`.
+
+Persistent cache
+----------------
+Both helpers read through `utils.persistent_cache.place_cache`, a SQLite-backed
+cache keyed by provider, category and normalised place, with per-category TTLs
+and stale-while-revalidate.  Repeat lookups for a city cost no API call.
+`GooglePlaceSearchTool.cached` looks the cache up without fetching, so the
+search strategy can answer a hit before it starts (and times) any upstream call.
+
+Compact results
+---------------
+Both helpers return small structured payloads instead of formatted text:
+Google yields a ranked list of places (`compact_places`: name, rating, review
+count, price level, address, coordinates) straight from one Text Search call –
+no per-place details lookups – and Tavily yields its answer plus short
+`sources`.  `tools/place_search_tool.py` renders them within the tool's token
+budget (`utils/tool_output.py`).  Cached payloads are namespaced with
+`CACHE_VERSION`, so entries in an older shape are never served.
+
+Async variants
+--------------
+`asearch(category, place)` is the non-blocking counterpart of the
+`*_search_*` methods.  Tavily is called through its native async client; the
+`googlemaps` client is sync-only, so it runs in a worker thread instead of
+blocking the event loop.
 """
 import os
 import json
+import asyncio
+import threading
+from typing import Dict, List, Optional
+import googlemaps
 from langchain_tavily import TavilySearch
-from langchain_google_community import GooglePlacesTool, GooglePlacesAPIWrapper 
+from langchain_google_community import GooglePlacesAPIWrapper
+from utils.config_loader import load_config
+from utils.persistent_cache import place_cache
+
+_TAVILY_CONFIG = load_config().get("tavily", {})
+_GOOGLE_BASE_URL = load_config().get("place_search", {}).get("google_base_url")
+_tavily_lock = threading.Lock()
+_tavily_clients: Dict[str, TavilySearch] = {}
+
+# Bump when the shape of cached payloads changes
+CACHE_VERSION = "v2"
+# Places kept per search in the cache; the tool output budget picks the top N
+MAX_CACHED_PLACES = 20
+
+
+def compact_places(results: List[dict]) -> List[dict]:
+    """Reduce Google Places results to the fields the planner needs, in Google's ranking order."""
+    places = []
+    for result in results[:MAX_CACHED_PLACES]:
+        location = result.get("geometry", {}).get("location", {})
+        places.append({
+            "name": result.get("name"),
+            "rating": result.get("rating"),
+            "reviews": result.get("user_ratings_total"),
+            "price_level": result.get("price_level"),
+            "address": result.get("formatted_address") or result.get("vicinity"),
+            "lat": location.get("lat"),
+            "lng": location.get("lng"),
+        })
+    return places
+
+
+def compact_tavily(result) -> dict:
+    """Tavily's answer plus title / url / snippet of each source."""
+    if not isinstance(result, dict):
+        return {"answer": str(result)} if result else {}
+    sources = [{"title": item.get("title"), "url": item.get("url"), "snippet": item.get("content")}
+               for item in result.get("results", [])]
+    return {"answer": result.get("answer"), "sources": sources} if result.get("answer") or sources else {}
+
+
+def get_tavily_client(**params) -> TavilySearch:
+    """Return the process-wide `TavilySearch` client for this parameter set."""
+    key = json.dumps(params, sort_keys=True)
+    client = _tavily_clients.get(key)
+    if client is None:
+        with _tavily_lock:
+            client = _tavily_clients.get(key)
+            if client is None:
+                if _tavily_clients:
+                    shared = {"api_wrapper": next(iter(_tavily_clients.values())).api_wrapper}
+                else:
+                    base_url = _TAVILY_CONFIG.get("base_url")
+                    shared = {"api_base_url": base_url} if base_url else {}
+                client = TavilySearch(**shared, **params)
+                _tavily_clients[key] = client
+    return client
+
 
 class GooglePlaceSearchTool:
+    QUERIES = {
+        "attractions": "top attractive places in and around {place}",
+        "restaurants": "what are the top 10 restaurants and eateries in and around {place}?",
+        "activities": "Activities in and around {place}",
+        "transportation": "What are the different modes of transportations available in {place}",
+    }
+
     def __init__(self, api_key: str):
         self.places_wrapper = GooglePlacesAPIWrapper(gplaces_api_key=api_key)
-        self.places_tool = GooglePlacesTool(api_wrapper=self.places_wrapper)
+        if _GOOGLE_BASE_URL:
+            self.places_wrapper.google_map_client = googlemaps.Client(api_key, base_url=_GOOGLE_BASE_URL)
+
+    def _fetch(self, query: str) -> List[dict]:
+        response = self.places_wrapper.google_map_client.places(query)
+        return compact_places(response.get("results", []))
+
+    def _afetch(self, query: str):
+        # `to_thread` copies the context, so upstream spans nest under the search span
+        return asyncio.to_thread(self._fetch, query)
+
+    def cached(self, category: str, place: str) -> Optional[List[dict]]:
+        """
+        The cached result of `search`, or None when it would call GooglePlaces.
+        """
+        query = self.QUERIES[category].format(place=place)
+        return place_cache.get(f"google.{CACHE_VERSION}", category, place, lambda: self._fetch(query))
+
+    async def acached(self, category: str, place: str) -> Optional[List[dict]]:
+        """
+        Async variant of `cached`.
+        """
+        query = self.QUERIES[category].format(place=place)
+        return await place_cache.aget(f"google.{CACHE_VERSION}", category, place, lambda: self._afetch(query))
+
+    def search(self, category: str, place: str, lookup: bool = True) -> List[dict]:
+        """
+        Runs the GooglePlaces query for `category` (a key of `QUERIES`).
+
+        Pass `lookup=False` right after `cached` missed to skip a second cache read.
+        """
+        query = self.QUERIES[category].format(place=place)
+        return place_cache.get_or_fetch(f"google.{CACHE_VERSION}", category, place, lambda: self._fetch(query),
+                                        lookup=lookup)
+
+    async def asearch(self, category: str, place: str, lookup: bool = True) -> List[dict]:
+        """
+        Async variant of `search`.
+        """
+        query = self.QUERIES[category].format(place=place)
+        return await place_cache.aget_or_fetch(f"google.{CACHE_VERSION}", category, place,
+                                               lambda: self._afetch(query), lookup=lookup)
     
     def google_search_attractions(self, place: str) -> dict:
         """
         Searches for attractions in the specified place using GooglePlaces API.
         """
-        return self.places_tool.run(f"top attractive places in and around {place}")
+        return self.search("attractions", place)
     
     def google_search_restaurants(self, place: str) -> dict:
         """
         Searches for available restaurants in the specified place using GooglePlaces API.
         """
-        return self.places_tool.run(f"what are the top 10 restaurants and eateries in and around {place}?")
+        return self.search("restaurants", place)
     
     def google_search_activity(self, place: str) -> dict:
         """
         Searches for popular activities in the specified place using GooglePlaces API.
         """
-        return self.places_tool.run(f"Activities in and around {place}")
+        return self.search("activities", place)
 
     def google_search_transportation(self, place: str) -> dict:
         """
         Searches for available modes of transportation in the specified place using GooglePlaces API.
         """
-        return self.places_tool.run(f"What are the different modes of transportations available in {place}")
+        return self.search("transportation", place)
 
 class TavilyPlaceSearchTool:
+    QUERIES = {
+        "attractions": "top attractive places in and around {place}",
+        "restaurants": "what are the top 10 restaurants and eateries in and around {place}.",
+        "activities": "activities in and around {place}",
+        "transportation": "What are the different modes of transportations available in {place}",
+    }
+
     def __init__(self):
-        pass
+        defaults = {"topic": "general", "include_answer": "advanced", **_TAVILY_CONFIG.get("defaults", {})}
+        per_category = _TAVILY_CONFIG.get("categories", {})
+        # Clients are built on first use (see `get_tavily_client`)
+        self.params = {category: {**defaults, **per_category.get(category, {})} for category in self.QUERIES}
+
+    def _client(self, category: str) -> TavilySearch:
+        return get_tavily_client(**self.params[category])
+
+    def search(self, category: str, place: str) -> dict:
+        """
+        Runs the TavilySearch query for `category` (a key of `QUERIES`).
+        """
+        query = {"query": self.QUERIES[category].format(place=place)}
+        return place_cache.get_or_fetch(
+            f"tavily.{CACHE_VERSION}", category, place, lambda: compact_tavily(self._client(category).invoke(query)))
+
+    async def asearch(self, category: str, place: str) -> dict:
+        """
+        Async variant of `search`.
+        """
+        query = {"query": self.QUERIES[category].format(place=place)}
+
+        async def fetch():
+            return compact_tavily(await self._client(category).ainvoke(query))
+
+        return await place_cache.aget_or_fetch(f"tavily.{CACHE_VERSION}", category, place, fetch)
 
     def tavily_search_attractions(self, place: str) -> dict:
         """
         Searches for attractions in the specified place using TavilySearch.
         """
-        tavily_tool = TavilySearch(topic="general", include_answer="advanced")
-        result = tavily_tool.invoke({"query": f"top attractive places in and around {place}"})
-        if isinstance(result, dict) and result.get("answer"):
-            return result["answer"]
-        return result
+        return self.search("attractions", place)
     
     def tavily_search_restaurants(self, place: str) -> dict:
         """
         Searches for available restaurants in the specified place using TavilySearch.
         """
-        tavily_tool = TavilySearch(topic="general", include_answer="advanced")
-        result = tavily_tool.invoke({"query": f"what are the top 10 restaurants and eateries in and around {place}."})
-        if isinstance(result, dict) and result.get("answer"):
-            return result["answer"]
-        return result
+        return self.search("restaurants", place)
     
     def tavily_search_activity(self, place: str) -> dict:
         """
         Searches for popular activities in the specified place using TavilySearch.
         """
-        tavily_tool = TavilySearch(topic="general", include_answer="advanced")
-        result = tavily_tool.invoke({"query": f"activities in and around {place}"})
-        if isinstance(result, dict) and result.get("answer"):
-            return result["answer"]
-        return result
+        return self.search("activities", place)
 
     def tavily_search_transportation(self, place: str) -> dict:
         """
         Searches for available modes of transportation in the specified place using TavilySearch.
         """
-        tavily_tool = TavilySearch(topic="general", include_answer="advanced")
-        result = tavily_tool.invoke({"query": f"What are the different modes of transportations available in {place}"})
-        if isinstance(result, dict) and result.get("answer"):
-            return result["answer"]
-        return result
-    
\ No newline at end of file
+        return self.search("transportation", place)
@@ -0,0 +1,86 @@
+"""
+utils/prompt_prefix.py
+======================
+The static prompt prefix of an agent loop and its (memoised) token count.
+
+Every agent turn re-sends the same system prompt and tool schemas before the
+conversation, so on long tool loops that prefix is the largest repeated
+input.  Providers with automatic prompt caching (OpenAI caches prefixes of
+`PROMPT_CACHE_MIN_TOKENS` tokens and more) bill a repeated prefix at a
+discount – but only if it is byte-identical from turn to turn and request to
+request.  `GraphBuilder` therefore keeps the layout fixed:
+
+1. the system prompt (a module constant, nothing per-request in it);
+2. the tool definitions, bound in name order (`sort_tools`);
+3. the conversation, appended – earlier turns are never rewritten except by
+   the deterministic compaction of `utils/message_window.py`.
+
+`static_prefix(system_prompt, tools)` renders parts 1 and 2 the way they are
+sent and counts their tokens once per distinct prefix: with `tiktoken` when it
+is installed and its encoding is available, otherwise at ~4 characters per
+token.  The count is put on every `llm` span (`llm.static_prefix_tokens`) next
+to the cached / uncached input tokens the provider reports.
+"""
+import json
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Optional, Sequence
+
+from langchain_core.utils.function_calling import convert_to_openai_tool
+
+from logger.logging import get_logger
+from utils.config_loader import load_config
+from utils.message_window import CHARS_PER_TOKEN
+
+logger = get_logger(__name__)
+
+# Smallest prefix OpenAI's automatic prompt caching applies to
+PROMPT_CACHE_MIN_TOKENS = 1024
+_ENCODING = load_config().get("agent", {}).get("prompt_cache", {}).get("encoding", "o200k_base")
+
+
+@dataclass(frozen=True)
+class StaticPrefix:
+    text: str
+    tokens: int
+
+    @property
+    def cacheable(self) -> bool:
+        return self.tokens >= PROMPT_CACHE_MIN_TOKENS
+
+
+def sort_tools(tools: Sequence) -> list:
+    """Tools in name order, so the bound schemas are identical however they were registered."""
+    return sorted(tools, key=lambda tool: tool.name)
+
+
+@lru_cache(maxsize=4)
+def _encoding(name: Optional[str]):
+    if not name:
+        return None
+    try:
+        import tiktoken
+        return tiktoken.get_encoding(name)
+    except Exception as error:  # not installed, or the encoding file cannot be fetched
+        logger.info("Counting prefix tokens at ~%d chars/token (tiktoken %s unavailable: %s)",
+                    CHARS_PER_TOKEN, name, error)
+        return None
+
+
+@lru_cache(maxsize=64)
+def count_tokens(text: str, encoding: Optional[str] = _ENCODING) -> int:
+    """Token count of `text`, memoised per distinct text."""
+    tokenizer = _encoding(encoding)
+    return len(tokenizer.encode(text)) if tokenizer is not None else len(text) // CHARS_PER_TOKEN
+
+
+def render_prefix(system_prompt, tools: Sequence) -> str:
+    """The system prompt followed by the tool schemas, as sent on every turn."""
+    content = system_prompt.content if hasattr(system_prompt, "content") else str(system_prompt)
+    schemas = [convert_to_openai_tool(tool) for tool in sort_tools(tools)]
+    return f"{content}\n{json.dumps(schemas, ensure_ascii=False, separators=(',', ':'))}"
+
+
+def static_prefix(system_prompt, tools: Sequence) -> StaticPrefix:
+    text = render_prefix(system_prompt, tools)
+    return StaticPrefix(text=text, tokens=count_tokens(text))
@@ -0,0 +1,477 @@
+"""
+utils/response_cache.py
+=======================
+Response cache for whole trip-plan answers, consulted by `main.py` before the
+agent graph runs.
+
+Many questions are near-duplicates ("5 day trip to Goa", "Plan 5 days in Goa")
+and each one would otherwise pay for a full multi-turn agent loop.  Lookups go
+through up to three tiers:
+
+1. **Slots** – `extract_slots` pulls destination, duration (days), budget tier
+   and travel month out of the question; requests with the same slots share
+   one entry.  Multi-city questions ("10 days across Rome, Florence and
+   Venice", see `extract_legs`) use all legs as the destination.  Only plain
+   trip-plan requests are keyed by slots (`cache_slots`): every word must be
+   a slot or trip-request phrasing, so "weather in Goa", "vegan restaurants
+   in Goa" or "5 days in Goa with kids, no beaches" never share the generic
+   Goa plan.  Questions the extractor is unsure about – alternatives ("Goa or
+   Kerala"), ranges ("5-7 days") or conflicting durations, months and budgets
+   – are not keyed by slots either, rather than keyed by a guess.
+2. **Exact** – every other question falls back to its normalised text
+   (lower-cased, punctuation stripped).
+3. **Semantic** (optional, `response_cache.embeddings.enabled`) – the question
+   is embedded and compared against cached entries by cosine similarity; a
+   match above `similarity_threshold` is served.  When both questions have
+   slots they must agree, so "5 days in Goa" never answers "6 days in Goa".
+
+Entries expire after `ttl_seconds` (freshness window) and the cache is an LRU
+bounded by `max_entries`.
+
+Usage
+-----
+```
+cached = response_cache.get(question)          # -> CacheHit | None
+if cached is None:
+    answer = ...run the agent...
+    response_cache.set(question, answer)
+```
+"""
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, List, Optional
+
+import numpy as np
+
+from utils.config_loader import load_config
+
+_WORD_NUMBERS = {
+    "a": 1, "an": 1, "one": 1, "two": 2, "three": 3, "four": 4, "five": 5, "six": 6, "seven": 7,
+    "eight": 8, "nine": 9, "ten": 10, "eleven": 11, "twelve": 12, "fourteen": 14, "fifteen": 15,
+}
+_NUMBER = r"(\d+|" + "|".join(_WORD_NUMBERS) + r")"
+_DURATION_RE = re.compile(_NUMBER + r"[\s-]*(day|days|night|nights|week|weeks)\b")
+_DURATION_RANGE_RE = re.compile(r"\b" + _NUMBER + r"\s*(?:-|–|to)\s*" + _NUMBER + r"[\s-]*(?:day|night|week)s?\b")
+_WEEKEND_RE = re.compile(r"\bweekend\b")
+_DESTINATION_RE = re.compile(
+    r"\b(?:to|in|at|visit|visiting|around|explore|exploring)\s+"
+    r"(?!\d)([a-z][a-z .'-]*?)"
+    r"(?=\s+(?:for|in|on|with|during|under|within|from|next|this|trip|tour|vacation|holiday)\b|[,?!]|\s*\d|$)"
+)
+_BUDGET_AMOUNT_RE = re.compile(r"(?:[$€£₹]\s*(\d[\d,]*)|(\d[\d,]*)\s*(usd|eur|gbp|inr|dollars|euros|rupees))")
+_BUDGET_TIERS = {
+    "budget": ("budget", "cheap", "backpack", "backpacking", "affordable", "low cost", "low-cost"),
+    "luxury": ("luxury", "luxurious", "premium", "high end", "high-end", "5 star", "five star"),
+}
+_MONTH_RE = re.compile(
+    r"\b(?:in|during|this|next|early|mid|late)\s+(jan(?:uary)?|feb(?:ruary)?|mar(?:ch)?|apr(?:il)?|may|june?|july?|aug(?:ust)?|"
+    r"sep(?:t(?:ember)?)?|oct(?:ober)?|nov(?:ember)?|dec(?:ember)?)\b"
+)
+_FILLER_WORDS = {"the", "a", "an", "me", "my", "please", "trip", "plan", "days", "day"}
+
+# A question is keyed by its slots only if it asks for a trip plan and has no
+# words besides the slots and these
+_TRIP_INTENT_RE = re.compile(r"\b(?:trip|plan|planning|itinerary|vacation|holiday|getaway|tour)\b")
+_TRIP_PHRASE_WORDS = {
+    "plan", "planning", "trip", "itinerary", "vacation", "holiday", "getaway", "tour", "travel", "a", "an", "the",
+    "me", "my", "us", "our", "i", "we", "please", "want", "would", "like", "need", "can", "could", "you", "help",
+    "create", "make", "give", "build", "suggest", "to", "in", "at", "for", "of", "on", "visit", "visiting",
+    "explore", "exploring", "around", "across", "through", "covering", "and", "then", "day", "days", "night",
+    "nights", "week", "weeks", "weekend", "long", "early", "mid", "late", "next", "this", "during", "under",
+    "within", "usd", "eur", "gbp", "inr", "dollars", "euros", "rupees",
+}
+_QUESTION_TOKEN_RE = re.compile(r"[$€£₹]?\d[\d,.]*|[a-z]+")
+# The question offers a choice, so no single set of slots is right
+_ALTERNATIVE_RE = re.compile(r"\b(?:or|either|vs|versus|maybe|perhaps)\b|/")
+
+# Multi-city trips: "3 days in Rome, 4 in Florence and 3 in Venice" or
+# "10 days across Rome, Florence and Venice"
+_LEG_DURATION_RE = re.compile(
+    _NUMBER + r"[\s-]*(?:days?|nights?)?\s+(?:in|at)\s+([a-z][a-z .'-]*?)(?=\s*(?:,|;|\band\b|\bthen\b|\.|$))"
+)
+_PLACE_CHARS = r"(?:[a-z .']|-(?!>))*"
+_LEG_LIST_RE = re.compile(
+    r"\b(?:to|in|across|visiting|visit|between|through|covering|exploring|explore|around)\s+"
+    r"([a-z]" + _PLACE_CHARS + r"(?:\s*(?:,|&|->|→|\band\b|\bthen\b)\s*[a-z]" + _PLACE_CHARS + r")+)"
+)
+_LEG_LIST_END_RE = re.compile(
+    r"\s+(?:for|in|on|with|during|under|within|from|next|this|trip|tour|vacation|holiday|over|by|starting)\b.*$"
+)
+_LEG_SEPARATOR_RE = re.compile(r"\s*(,|&|->|→|\band\b|\bthen\b)\s*")
+_NOT_A_PLACE = {
+    "back", "home", "return", "suggest", "hotels", "hotel", "restaurants", "food", "things", "budget", "me", "us",
+    "family", "friends", "kids", "cost", "costs", "weather", "activities", "attractions", "itinerary", "plan",
+    "flights", "transport", "tips", "also", "include", "give", "show", "tell", "more", "days", "day", "nights",
+    # Verbs and prepositions: "go to Bali and relax", "fly to Goa and stay 5 days"
+    "go", "going", "stay", "staying", "relax", "relaxing", "rest", "chill", "fly", "flying", "drive", "driving",
+    "see", "eat", "enjoy", "spend", "shop", "shopping", "hike", "hiking", "swim", "swimming", "party", "work",
+    "come", "get", "take", "do", "book", "find", "rent", "leave", "visit", "explore", "travel", "want", "like",
+    "to", "from", "with", "for", "of", "by", "there",
+}
+# "City, Region" qualifiers that are part of one destination, not another leg
+_REGIONS = {
+    "usa", "us", "uk", "uae", "india", "france", "italy", "spain", "portugal", "germany", "austria", "switzerland",
+    "netherlands", "belgium", "greece", "turkey", "croatia", "czechia", "czech republic", "hungary", "poland",
+    "ireland", "scotland", "england", "iceland", "norway", "sweden", "denmark", "finland", "morocco", "egypt",
+    "kenya", "tanzania", "south africa", "japan", "china", "south korea", "korea", "thailand", "vietnam",
+    "indonesia", "malaysia", "singapore", "philippines", "sri lanka", "nepal", "bhutan", "maldives", "australia",
+    "new zealand", "canada", "mexico", "brazil", "argentina", "chile", "peru", "colombia", "cuba",
+    "united states", "united kingdom", "united arab emirates", "california", "florida", "texas",
+    "nevada", "hawaii", "alaska", "oregon", "colorado", "arizona", "illinois", "massachusetts",
+    "louisiana", "kerala", "rajasthan", "himachal pradesh", "uttarakhand", "tamil nadu", "karnataka",
+    "maharashtra", "tuscany", "provence", "andalusia", "bavaria", "ontario", "quebec",
+    "british columbia", "queensland", "new south wales",
+}
+
+
+@dataclass(frozen=True)
+class TripSlots:
+    destination: str
+    days: Optional[int] = None
+    budget: Optional[str] = None
+    month: Optional[str] = None
+
+    def key(self) -> str:
+        return f"slots:{self.destination}|{self.days or '-'}|{self.budget or '-'}|{self.month or '-'}"
+
+
+@dataclass(frozen=True)
+class Leg:
+    destination: str
+    days: Optional[int] = None
+
+
+@dataclass
+class CacheHit:
+    answer: str
+    match: str          # "slots" | "exact" | "semantic"
+    age_seconds: float
+    similarity: Optional[float] = None
+
+
+def normalize_question(question: str) -> str:
+    text = re.sub(r"[^\w\s$€£₹-]", " ", question.lower())
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def _to_int(token: str) -> int:
+    return int(token) if token.isdigit() else _WORD_NUMBERS[token]
+
+
+def _duration_days(duration_match: "re.Match") -> int:
+    days = _to_int(duration_match.group(1))
+    if duration_match.group(2).startswith("week"):
+        days *= 7
+    elif duration_match.group(2).startswith("night"):
+        days += 1
+    return days
+
+
+def _trip_days(text: str) -> Optional[int]:
+    duration_match = _DURATION_RE.search(text)
+    if duration_match:
+        return _duration_days(duration_match)
+    return 2 if _WEEKEND_RE.search(text) else None
+
+
+def _budget_signals(text: str):
+    """Distinct budget amounts and tiers mentioned in `text`."""
+    amounts = {(a or b).replace(",", "") for a, b, _ in _BUDGET_AMOUNT_RE.findall(text)}
+    tiers = {tier for tier, keywords in _BUDGET_TIERS.items() if any(keyword in text for keyword in keywords)}
+    return amounts, tiers
+
+
+def _unsure(text: str, slots: TripSlots, legs: List[Leg]) -> bool:
+    """True if the slots of `text` are a guess: alternatives, ranges or conflicting values."""
+    if _ALTERNATIVE_RE.search(text) or _DURATION_RANGE_RE.search(text):
+        return True
+    # "3 days in Rome and 4 days in Florence" names one duration per leg, not a conflict
+    if not (legs and all(leg.days for leg in legs)):
+        if len({_duration_days(match) for match in _DURATION_RE.finditer(text)}) > 1:
+            return True
+    if len({month[:3] for month in _MONTH_RE.findall(text)}) > 1:
+        return True
+    amounts, tiers = _budget_signals(text)
+    # An amount settles the budget, unless a tier other than "budget" pulls the other way
+    return len(amounts) > 1 or len(tiers) > 1 or bool(amounts and tiers - {"budget"})
+
+
+def _place(fragment: str) -> Optional[str]:
+    words = [word for word in fragment.strip(" .'-").split() if word not in _FILLER_WORDS]
+    if not words or len(words) > 3 or any(word in _NOT_A_PLACE for word in words):
+        return None
+    return " ".join(words)
+
+
+def _is_region(fragment: str) -> bool:
+    """"France", "Kerala", "NY", "D.C." – the qualifier in "City, Region"."""
+    name = fragment.strip(" .'-")
+    return name in _REGIONS or "." in name or len(name.replace(" ", "")) <= 2
+
+
+def _list_places(fragment: str) -> List[str]:
+    """Distinct places of a separated list, folding "City, Region" pairs into one place.
+
+    A single "X, Y" pair is always one destination ("Cusco, Peru"); any
+    fragment that is not a place makes the whole list a non-list.
+    """
+    tokens = _LEG_SEPARATOR_RE.split(fragment)
+    parts, separators = tokens[0::2], tokens[1::2]
+    if separators == [","]:
+        return []
+    places = []
+    for index, part in enumerate(parts):
+        if index and separators[index - 1] == "," and _is_region(part):
+            continue
+        place = _place(part)
+        if place is None:
+            return []
+        places.append(place)
+    return list(dict.fromkeys(places))
+
+
+def extract_legs(question: str) -> List[Leg]:
+    """Destinations of a multi-city trip in visiting order, with days per leg when known.
+
+    Returns an empty list unless at least two distinct places are found.  When
+    only the total duration is given it is split evenly, earlier legs taking
+    the remainder.
+    """
+    text = re.sub(r"\s+", " ", question.lower()).strip()
+
+    explicit = [(_place(place), _to_int(count)) for count, place in _LEG_DURATION_RE.findall(text)]
+    if len(explicit) >= 2 and all(place for place, _ in explicit):
+        return [Leg(place, days) for place, days in explicit]
+
+    for list_match in _LEG_LIST_RE.finditer(text):
+        places = _list_places(_LEG_LIST_END_RE.sub("", list_match.group(1)))
+        if len(places) < 2:
+            continue
+        total = _trip_days(text)
+        if total is None or total < len(places):
+            return [Leg(place) for place in places]
+        share, extra = divmod(total, len(places))
+        return [Leg(place, share + (index < extra)) for index, place in enumerate(places)]
+    return []
+
+
+def extract_slots(question: str) -> Optional[TripSlots]:
+    """Pull (destination, days, budget, month) out of a free-text trip request."""
+    text = re.sub(r"\s+", " ", question.lower()).strip()
+
+    legs = extract_legs(question)
+    if legs:
+        destination = "+".join(leg.destination for leg in legs)
+    else:
+        destination_match = _DESTINATION_RE.search(text)
+        if not destination_match:
+            return None
+        destination = _place(destination_match.group(1))
+        if destination is None:
+            return None
+
+    days = _trip_days(text)
+    if legs and all(leg.days for leg in legs):
+        days = sum(leg.days for leg in legs)
+
+    budget = None
+    amount_match = _BUDGET_AMOUNT_RE.search(text)
+    if amount_match:
+        amount = (amount_match.group(1) or amount_match.group(2)).replace(",", "")
+        budget = f"amount:{amount}"
+    else:
+        for tier, keywords in _BUDGET_TIERS.items():
+            if any(keyword in text for keyword in keywords):
+                budget = tier
+                break
+
+    month_match = _MONTH_RE.search(text)
+    month = month_match.group(1)[:3] if month_match else None
+
+    return TripSlots(destination=destination, days=days, budget=budget, month=month)
+
+
+def cache_slots(question: str) -> Optional[TripSlots]:
+    """`extract_slots(question)` if the question is a plain trip-plan request, else None.
+
+    Plain means it asks for a trip plan and nothing is left once the slots and
+    trip-request phrasing are removed – any extra constraint ("with kids",
+    "vegan restaurants", "convert 100 USD") would be lost in the slot key.
+    When the slots are a guess (see `_unsure`) the question is not keyed by
+    them either; it falls back to its exact normalised text.
+    """
+    slots = extract_slots(question)
+    if slots is None:
+        return None
+    text = re.sub(r"\s+", " ", question.lower()).strip()
+    if not (_TRIP_INTENT_RE.search(text) or _DURATION_RE.search(text)):
+        return None
+    if _unsure(text, slots, extract_legs(question)):
+        return None
+    allowed = set(_TRIP_PHRASE_WORDS) | set(_WORD_NUMBERS) | set(re.findall(r"[a-z]+", slots.destination))
+    for keywords in _BUDGET_TIERS.values():
+        allowed.update(word for keyword in keywords for word in re.findall(r"[a-z]+", keyword))
+    month_match = _MONTH_RE.search(text)
+    if month_match:
+        allowed.add(month_match.group(1))
+    for token in _QUESTION_TOKEN_RE.findall(text):
+        if token not in allowed and not token.lstrip("$€£₹")[:1].isdigit():
+            return None
+    return slots
+
+
+@dataclass
+class _Entry:
+    answer: str
+    created_at: float
+    slots: Optional[TripSlots]
+    embedding: Optional[Any] = None
+
+
+class ResponseCache:
+    def __init__(self, ttl_seconds: float = 6 * 3600, max_entries: int = 512, embeddings=None,
+                 similarity_threshold: float = 0.92, enabled: bool = True):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.embeddings = embeddings
+        self.similarity_threshold = similarity_threshold
+        self.enabled = enabled
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key_for(question: str, slots: Optional[TripSlots]) -> str:
+        return slots.key() if slots else f"q:{normalize_question(question)}"
+
+    def _fresh(self, entry: _Entry, now: float) -> bool:
+        return now - entry.created_at <= self.ttl_seconds
+
+    def _lookup_key(self, key: str, now: float) -> Optional[_Entry]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if not self._fresh(entry, now):
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def _lookup_similar(self, vector, slots: Optional[TripSlots], now: float):
+        with self._lock:
+            candidates = [(key, entry) for key, entry in self._entries.items()
+                          if entry.embedding is not None and self._fresh(entry, now)
+                          and (slots is None or entry.slots is None or entry.slots == slots)]
+        if not candidates:
+            return None
+        matrix = np.stack([entry.embedding for _, entry in candidates])
+        scores = matrix @ vector
+        best = int(np.argmax(scores))
+        if scores[best] < self.similarity_threshold:
+            return None
+        key, entry = candidates[best]
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+        return entry, float(scores[best])
+
+    @staticmethod
+    def _unit(vector) -> Any:
+        vector = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def _exact(self, question: str, now: float):
+        # Slots still guard the semantic tier, but only plain trip requests are keyed by them
+        slots = extract_slots(question)
+        key_slots = cache_slots(question)
+        entry = self._lookup_key(self.key_for(question, key_slots), now)
+        if entry is not None:
+            return slots, CacheHit(entry.answer, "slots" if key_slots else "exact", now - entry.created_at)
+        return slots, None
+
+    def get(self, question: str) -> Optional[CacheHit]:
+        """Return a fresh cached answer for `question`, or None."""
+        if not self.enabled:
+            return None
+        now = time.time()
+        slots, hit = self._exact(question, now)
+        if hit or self.embeddings is None:
+            return hit
+        match = self._lookup_similar(self._unit(self.embeddings.embed_query(question)), slots, now)
+        if match is None:
+            return None
+        entry, score = match
+        return CacheHit(entry.answer, "semantic", now - entry.created_at, similarity=score)
+
+    async def aget(self, question: str) -> Optional[CacheHit]:
+        """Async variant of `get` (embeds via `aembed_query`)."""
+        if not self.enabled:
+            return None
+        now = time.time()
+        slots, hit = self._exact(question, now)
+        if hit or self.embeddings is None:
+            return hit
+        match = self._lookup_similar(self._unit(await self.embeddings.aembed_query(question)), slots, now)
+        if match is None:
+            return None
+        entry, score = match
+        return CacheHit(entry.answer, "semantic", now - entry.created_at, similarity=score)
+
+    def _store(self, question: str, answer: str, embedding) -> None:
+        slots = extract_slots(question)
+        entry = _Entry(answer=answer, created_at=time.time(), slots=slots, embedding=embedding)
+        with self._lock:
+            key = self.key_for(question, cache_slots(question))
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def set(self, question: str, answer: str) -> None:
+        """Cache `answer` for `question` (empty answers are ignored)."""
+        if not self.enabled or not answer:
+            return
+        embedding = self._unit(self.embeddings.embed_query(question)) if self.embeddings is not None else None
+        self._store(question, answer, embedding)
+
+    async def aset(self, question: str, answer: str) -> None:
+        """Async variant of `set`."""
+        if not self.enabled or not answer:
+            return
+        embedding = self._unit(await self.embeddings.aembed_query(question)) if self.embeddings is not None else None
+        self._store(question, answer, embedding)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def _load_embeddings(config: dict):
+    if not config.get("enabled", False):
+        return None
+    # Imported lazily so the embedding tier stays an opt-in dependency
+    from langchain_openai import OpenAIEmbeddings
+
+    return OpenAIEmbeddings(model=config.get("model", "text-embedding-3-small"))
+
+
+def _build_response_cache() -> ResponseCache:
+    config = load_config().get("response_cache", {})
+    embeddings_config = config.get("embeddings", {})
+    return ResponseCache(
+        ttl_seconds=config.get("ttl_seconds", 6 * 3600),
+        max_entries=config.get("max_entries", 512),
+        embeddings=_load_embeddings(embeddings_config),
+        similarity_threshold=embeddings_config.get("similarity_threshold", 0.92),
+        enabled=config.get("enabled", True),
+    )
+
+
+response_cache = _build_response_cache()
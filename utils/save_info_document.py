@@ -16,6 +16,9 @@ pass it along.
 """
 import os
 import datetime
+from logger.logging import get_logger
+
+logger = get_logger(__name__)
 
 def save_document(response_text: str, directory: str = "./output"):
     """Export travel plan to Markdown file with proper formatting"""
@@ -43,14 +46,12 @@ def save_document(response_text: str, directory: str = "./output"):
         timestamp = datetime.datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
         filename = f"{directory}/AI_Trip_Planner_{timestamp}.md"
 
-        print(filename)
-
         with open(filename, 'w', encoding='utf-8') as f:
             f.write(markdown_content)
         
-        print(f"Markdown file saved as: {filename}")
+        logger.info("Markdown file saved as: %s", filename)
         return filename
         
     except Exception as e:
-        print(f"Error saving markdown file: {e}")
+        logger.exception("Error saving markdown file")
         return None
\ No newline at end of file
@@ -0,0 +1,255 @@
+"""
+utils/search_strategy.py
+========================
+Orchestrates the Google Places → Tavily fallback used by
+`tools/place_search_tool.py`.
+
+Three strategies are available (`place_search.strategy` in
+`config/config.yaml`):
+
+• **sequential** – ask Google; only if it fails or returns nothing, ask Tavily.
+  Cheapest, but a slow Google failure costs its full timeout *plus* Tavily.
+• **hedged** – ask Google; if it has not answered within the hedge delay, also
+  start Tavily and take whichever good answer arrives first.  The delay is the
+  rolling p95 of recent Google latencies (clamped to `hedge_delay_ms.min/max`),
+  so only the slowest ~5% of calls pay for a second request.  Every Google
+  call is sampled, failed ones included; a call that loses to Tavily is sampled
+  when it finishes (threads) or, once cancelled, at the time it was cut off
+  (async).
+• **race** – ask both at once; the first good answer wins and the loser is
+  cancelled.
+
+All three share one algorithm: the backup provider starts after `delay`
+seconds (0 for race, p95 for hedged, never for sequential) or as soon as the
+primary fails, whichever comes first.  Each upstream call holds its slot from
+`utils.concurrency.provider_limiter` and is recorded as a
+`place_search.<provider>` span (`utils/tracing.py`).
+
+A Google result already in the place cache (`GooglePlaceSearchTool.cached`)
+is returned before the strategy starts, so cache hits neither start Tavily nor
+enter the Google latency window that sets the hedge delay.
+
+Every search returns a `SearchOutcome` naming the winning provider and the
+latency of each provider that was tried, so the tool can report it.
+"""
+import asyncio
+import contextvars
+import math
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional
+
+from utils.concurrency import ProviderLimiter, provider_limiter
+from utils.config_loader import load_config
+from utils.metrics import UPSTREAM_ERRORS
+from utils.tracing import span
+
+STRATEGIES = ("sequential", "hedged", "race")
+
+# Provider name -> limiter key
+LIMITER_KEYS = {"google": "google_places", "tavily": "tavily"}
+
+
+@dataclass
+class SearchOutcome:
+    provider: Optional[str]
+    result: Any
+    latencies_ms: Dict[str, float] = field(default_factory=dict)
+    errors: Dict[str, str] = field(default_factory=dict)
+
+
+class LatencyTracker:
+    """Rolling window of latencies with a quantile read-out."""
+
+    def __init__(self, window: int = 200):
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+
+    def quantile(self, q: float) -> Optional[float]:
+        with self._lock:
+            samples = sorted(self._samples)
+        if not samples:
+            return None
+        return samples[min(len(samples) - 1, math.ceil(q * len(samples)) - 1)]
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+
+def is_useful(result: Any) -> bool:
+    """An empty place list or Tavily payload counts as a failed search."""
+    return bool(result)
+
+
+class PlaceSearchStrategy:
+    def __init__(self, google_search, tavily_search, strategy: Optional[str] = None,
+                 limiter: ProviderLimiter = provider_limiter):
+        config = load_config().get("place_search", {})
+        self.google_search = google_search
+        # A helper with a `cached` lookup has been checked before the strategy runs
+        self._google_options = {"lookup": False} if hasattr(google_search, "cached") else {}
+        self.tavily_search = tavily_search
+        self.strategy = strategy or config.get("strategy", "sequential")
+        if self.strategy not in STRATEGIES:
+            raise ValueError(f"Unknown place search strategy {self.strategy!r}; expected one of {STRATEGIES}")
+        delays = config.get("hedge_delay_ms", {})
+        self.initial_delay = delays.get("initial", 1500) / 1000
+        self.min_delay = delays.get("min", 200) / 1000
+        self.max_delay = delays.get("max", 5000) / 1000
+        self.min_samples = config.get("min_samples", 20)
+        self.hedge_quantile = config.get("hedge_quantile", 0.95)
+        self.google_latency = LatencyTracker(config.get("latency_window", 200))
+        self.limiter = limiter
+        self._executor = ThreadPoolExecutor(max_workers=config.get("max_workers", 16), thread_name_prefix="place-search")
+
+    def backup_delay(self) -> Optional[float]:
+        """Seconds before Tavily is started alongside Google (None = only on failure)."""
+        if self.strategy == "race":
+            return 0.0
+        if self.strategy == "sequential":
+            return None
+        p95 = self.google_latency.quantile(self.hedge_quantile) if len(self.google_latency) >= self.min_samples else None
+        return min(self.max_delay, max(self.min_delay, p95 if p95 is not None else self.initial_delay))
+
+    def _record(self, provider: str, seconds: float, outcome: SearchOutcome) -> None:
+        outcome.latencies_ms[provider] = round(seconds * 1000, 1)
+        if provider == "google":
+            # Failures count too: a slow error delays the answer as much as a slow success
+            self.google_latency.record(seconds)
+
+    def _record_loser(self, future) -> None:
+        """Sample a Google call that lost the race once it finishes in the background."""
+        if not future.cancelled():
+            self.google_latency.record(future.result()[2])
+
+    def _call(self, provider: str, category: str, place: str):
+        started = time.perf_counter()
+        with span(f"place_search.{provider}", **{"place_search.category": category}) as search_span:
+            try:
+                with self.limiter.limit(LIMITER_KEYS[provider]):
+                    if provider == "google":
+                        result = self.google_search.search(category, place, **self._google_options)
+                    else:
+                        result = self.tavily_search.search(category, place)
+                    return result, None, time.perf_counter() - started
+            except Exception as e:
+                search_span.record_error(e)
+                return None, e, time.perf_counter() - started
+
+    async def _acall(self, provider: str, category: str, place: str):
+        started = time.perf_counter()
+        with span(f"place_search.{provider}", **{"place_search.category": category}) as search_span:
+            try:
+                async with self.limiter.alimit(LIMITER_KEYS[provider]):
+                    if provider == "google":
+                        result = await self.google_search.asearch(category, place, **self._google_options)
+                    else:
+                        result = await self.tavily_search.asearch(category, place)
+                    return result, None, time.perf_counter() - started
+            except Exception as e:
+                search_span.record_error(e)
+                return None, e, time.perf_counter() - started
+
+    def _cached(self, category: str, place: str, started: float) -> Optional[SearchOutcome]:
+        lookup = getattr(self.google_search, "cached", None)
+        return self._from_cache(lookup and lookup(category, place), started)
+
+    async def _acached(self, category: str, place: str, started: float) -> Optional[SearchOutcome]:
+        lookup = getattr(self.google_search, "acached", None)
+        return self._from_cache(lookup and await lookup(category, place), started)
+
+    @staticmethod
+    def _from_cache(result, started: float) -> Optional[SearchOutcome]:
+        """A Google cache hit as an outcome; its latency is reported but not sampled."""
+        if not is_useful(result):
+            return None
+        return SearchOutcome(provider="google", result=result,
+                             latencies_ms={"google": round((time.perf_counter() - started) * 1000, 1)})
+
+    def _submit(self, provider: str, category: str, place: str):
+        # Copy the context so the provider span nests under the calling tool's span
+        return self._executor.submit(contextvars.copy_context().run, self._call, provider, category, place)
+
+    def _settle(self, provider: str, result, error, seconds: float, outcome: SearchOutcome) -> bool:
+        """Record one finished call; True if it produced a usable answer."""
+        ok = error is None and is_useful(result)
+        self._record(provider, seconds, outcome)
+        if ok:
+            outcome.provider, outcome.result = provider, result
+        else:
+            outcome.errors[provider] = str(error) if error is not None else "no results"
+            UPSTREAM_ERRORS.inc(LIMITER_KEYS[provider], "exception" if error is not None else "empty")
+        return ok
+
+    def search(self, category: str, place: str) -> SearchOutcome:
+        """Run the configured strategy on the thread pool (sync tools)."""
+        cached = self._cached(category, place, time.perf_counter())
+        if cached is not None:
+            return cached
+        outcome = SearchOutcome(provider=None, result=None)
+        delay = self.backup_delay()
+        started = time.monotonic()
+        pending = {self._submit("google", category, place): "google"}
+        if delay == 0:
+            pending[self._submit("tavily", category, place)] = "tavily"
+        backup_started = delay == 0
+
+        while pending:
+            timeout = None
+            if not backup_started and delay is not None:
+                timeout = max(0.0, delay - (time.monotonic() - started))
+            done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            for future in done:
+                provider = pending.pop(future)
+                if self._settle(provider, *future.result(), outcome):
+                    for loser, name in pending.items():
+                        # cancel() only succeeds if the call has not started yet
+                        if not loser.cancel() and name == "google":
+                            loser.add_done_callback(self._record_loser)
+                    return outcome
+            if not backup_started and (not pending or not done):
+                # Either Google failed or the hedge delay elapsed
+                pending[self._submit("tavily", category, place)] = "tavily"
+                backup_started = True
+        return outcome
+
+    async def asearch(self, category: str, place: str) -> SearchOutcome:
+        """Async counterpart of `search`; the losing request is cancelled."""
+        cached = await self._acached(category, place, time.perf_counter())
+        if cached is not None:
+            return cached
+        outcome = SearchOutcome(provider=None, result=None)
+        delay = self.backup_delay()
+        started = time.monotonic()
+        pending = {asyncio.ensure_future(self._acall("google", category, place)): "google"}
+        if delay == 0:
+            pending[asyncio.ensure_future(self._acall("tavily", category, place))] = "tavily"
+        backup_started = delay == 0
+
+        try:
+            while pending:
+                timeout = None
+                if not backup_started and delay is not None:
+                    timeout = max(0.0, delay - (time.monotonic() - started))
+                done, _ = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    provider = pending.pop(task)
+                    if self._settle(provider, *task.result(), outcome):
+                        return outcome
+                if not backup_started and (not pending or not done):
+                    pending[asyncio.ensure_future(self._acall("tavily", category, place))] = "tavily"
+                    backup_started = True
+            return outcome
+        finally:
+            for task, provider in pending.items():
+                task.cancel()
+                if provider == "google":
+                    # The call is cut short, so its latency is at least this long
+                    self.google_latency.record(time.monotonic() - started)
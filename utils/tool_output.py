@@ -0,0 +1,97 @@
+"""
+utils/tool_output.py
+====================
+Compact, budgeted serialisation of tool results before they go back to the LLM.
+
+Every tool output becomes part of the prompt of *every* later agent turn, so
+the tools return small typed payloads (top-N places with name, rating, price
+level and coordinates; one line per forecast day; ...) and `render` turns
+them into minified JSON that fits the tool's budget.
+
+Budgets are configured per tool under `tool_output` in `config/config.yaml`
+(`default` applies to tools without an entry):
+
+• `max_items` – lists are cut to their first N entries (payloads are already
+  ranked, so the tail is the least relevant part);
+• `max_text_chars` – long strings (Tavily answers, snippets) are shortened;
+• `max_tokens` – if the result is still too large, trailing items of the
+  longest list are dropped one by one, and as a last resort the JSON text is
+  cut and marked with `…[truncated]`.
+
+Truncation is deterministic, so the same result always renders to the same
+text and the prompt prefix stays stable across turns.
+
+Usage
+-----
+```python
+return render("search_attractions", {"place": "Goa", "items": [...]})
+```
+"""
+import json
+from typing import Any, Dict, Optional
+
+from utils.config_loader import load_config
+from utils.message_window import CHARS_PER_TOKEN
+
+TRUNCATED = "…[truncated]"
+
+
+def _dumps(payload: Any) -> str:
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":"), default=str)
+
+
+def _shorten(value: Any, max_items: Optional[int], max_text_chars: Optional[int]) -> Any:
+    """Apply the item and text limits recursively."""
+    if isinstance(value, str):
+        if max_text_chars and len(value) > max_text_chars:
+            return value[:max_text_chars].rstrip() + "…"
+        return value
+    if isinstance(value, list):
+        items = value[:max_items] if max_items else value
+        return [_shorten(item, max_items, max_text_chars) for item in items]
+    if isinstance(value, dict):
+        return {key: _shorten(item, max_items, max_text_chars) for key, item in value.items() if item is not None}
+    return value
+
+
+def _longest_list(value: Any) -> Optional[list]:
+    """The longest list inside `value` with more than one item (dropping from it loses the least)."""
+    best = value if isinstance(value, list) and len(value) > 1 else None
+    children = value.values() if isinstance(value, dict) else value if isinstance(value, list) else ()
+    for child in children:
+        candidate = _longest_list(child)
+        if candidate is not None and (best is None or len(candidate) > len(best)):
+            best = candidate
+    return best
+
+
+class ToolOutputBudget:
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        config = config or {}
+        self.default = config.get("default", {})
+        self.per_tool = config.get("per_tool", {})
+
+    def limits(self, tool_name: str) -> Dict[str, Any]:
+        return {**self.default, **self.per_tool.get(tool_name, {})}
+
+    def render(self, tool_name: str, payload: Any) -> str:
+        """Serialise `payload` for `tool_name` within its configured budget."""
+        limits = self.limits(tool_name)
+        payload = _shorten(payload, limits.get("max_items"), limits.get("max_text_chars"))
+        text = payload if isinstance(payload, str) else _dumps(payload)
+        max_chars = limits.get("max_tokens", 0) * CHARS_PER_TOKEN
+        if not max_chars:
+            return text
+        while len(text) > max_chars and not isinstance(payload, str):
+            longest = _longest_list(payload)
+            if longest is None:
+                break
+            longest.pop()
+            text = _dumps(payload)
+        if len(text) > max_chars:
+            text = text[:max_chars - len(TRUNCATED)] + TRUNCATED
+        return text
+
+
+tool_output_budget = ToolOutputBudget(load_config().get("tool_output", {}))
+render = tool_output_budget.render
@@ -0,0 +1,333 @@
+"""
+utils/tracing.py
+================
+Lightweight per-request tracing: where did the time of a `/query` go – the
+LLM, Google Places, the Tavily fallback, currency lookups?
+
+A **trace** is opened around one request (`start_trace`) and every
+instrumented step inside it records a **span** (`span`):
+
+| span name                   | recorded by                          | notable attributes                      |
+|-----------------------------|--------------------------------------|-----------------------------------------|
+| `llm`                       | `GraphBuilder.agent_function`        | `gen_ai.usage.input_tokens` / `output_tokens`, `llm.tool_calls` |
+| `tool.<name>`               | `agent.tool_executor.ParallelToolNode` | `tool.provider`                       |
+| `place_search.<provider>`   | `utils.search_strategy`              | `cache.place_search` (hit/stale/miss)   |
+| `http.<host>`               | `utils.http_client.get` / `aget`     | `http.status_code`, `http.retries`      |
+
+Cache lookups annotate the innermost open span (`record_cache`), and a span
+that raises is marked with status `ERROR` and the exception text.
+
+The active trace and span live in `contextvars`, so nesting follows both
+asyncio tasks and the thread pools that copy the context
+(`ParallelToolNode`, `PlaceSearchStrategy`).  Outside a trace, or with
+`tracing.enabled: false`, `span` is a no-op costing one context-var lookup.
+
+Export
+------
+Finished traces are handed to a background thread and written as
+OpenTelemetry **OTLP/JSON** (`resourceSpans` → `scopeSpans` → `spans`):
+• `exporter: file` – one JSON document per line in `tracing.path`
+  (the OTel Collector's file exporter format); the file is rotated to
+  `path.1` … `path.<backup_count>` once it would exceed `max_bytes`,
+• `exporter: otlp` – POSTed to `{tracing.endpoint}/v1/traces`,
+• `exporter: none` – not exported (the timing summary is still available).
+
+`Trace.summary()` condenses a trace into a `Server-Timing`-style string
+(`total;dur=5120.3, llm;dur=3012.8;n=3, tool.search_attractions;dur=...`),
+which `main.py` returns in the `X-Timing` header.  Durations of parallel
+spans are summed, so the parts may add up to more than `total`.
+"""
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional
+
+from logger.logging import get_logger
+from utils.config_loader import load_config
+
+logger = get_logger(__name__)
+
+_TRACING_CONFIG = load_config().get("tracing", {})
+
+# OTLP status codes
+STATUS_UNSET, STATUS_OK, STATUS_ERROR = 0, 1, 2
+
+
+def _new_id(n_bytes: int) -> str:
+    return os.urandom(n_bytes).hex()
+
+
+@dataclass
+class Span:
+    name: str
+    trace_id: str
+    parent_id: Optional[str] = None
+    span_id: str = field(default_factory=lambda: _new_id(8))
+    start_ns: int = field(default_factory=time.time_ns)
+    end_ns: Optional[int] = None
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    status: int = STATUS_UNSET
+    status_message: str = ""
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def record_error(self, error: BaseException) -> None:
+        self.status = STATUS_ERROR
+        self.status_message = f"{type(error).__name__}: {error}"
+
+    @property
+    def duration_ms(self) -> float:
+        end_ns = self.end_ns if self.end_ns is not None else time.time_ns()
+        return (end_ns - self.start_ns) / 1e6
+
+
+class _NoopSpan:
+    """Stand-in yielded by `span` when no trace is active."""
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def record_error(self, error: BaseException) -> None:
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class Trace:
+    def __init__(self, name: str, attributes: Optional[Dict[str, Any]] = None):
+        self.trace_id = _new_id(16)
+        self.root = Span(name=name, trace_id=self.trace_id, attributes=dict(attributes or {}))
+        self.spans: List[Span] = [self.root]
+        self._lock = threading.Lock()
+
+    def add(self, span: Span) -> None:
+        with self._lock:
+            self.spans.append(span)
+
+    def summary(self) -> str:
+        """`Server-Timing`-style breakdown: total, then summed durations per span name."""
+        totals: Dict[str, List[float]] = {}
+        with self._lock:
+            spans = [span for span in self.spans if span is not self.root and span.end_ns is not None]
+        for span in spans:
+            entry = totals.setdefault(span.name, [0.0, 0])
+            entry[0] += span.duration_ms
+            entry[1] += 1
+        parts = [f"total;dur={self.root.duration_ms:.1f}"]
+        for name, (duration, count) in sorted(totals.items(), key=lambda item: -item[1][0]):
+            parts.append(f"{name};dur={duration:.1f}" + (f";n={count}" if count > 1 else ""))
+        return ", ".join(parts)
+
+
+_current_trace: ContextVar[Optional[Trace]] = ContextVar("current_trace", default=None)
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+def current_trace() -> Optional[Trace]:
+    return _current_trace.get()
+
+
+def _reset(var: ContextVar, token) -> None:
+    """Restore `var`, unless the block is being finalised in another context.
+
+    That happens when an async generator holding the block (e.g. an SSE
+    stream) is closed by `aclose()` from a different task after the client
+    disconnects; the original context is gone, so there is nothing to restore.
+    """
+    try:
+        var.reset(token)
+    except ValueError:
+        pass
+
+
+@contextmanager
+def span(name: str, **attributes) -> Iterator[Any]:
+    """Record a child span of the current span (no-op outside a trace)."""
+    trace = _current_trace.get()
+    if trace is None:
+        yield _NOOP_SPAN
+        return
+    parent = _current_span.get()
+    child = Span(name=name, trace_id=trace.trace_id, parent_id=parent.span_id if parent else None,
+                 attributes=attributes)
+    token = _current_span.set(child)
+    try:
+        yield child
+    except BaseException as e:
+        child.record_error(e)
+        raise
+    finally:
+        child.end_ns = time.time_ns()
+        _reset(_current_span, token)
+        trace.add(child)
+
+
+def set_attribute(key: str, value: Any) -> None:
+    """Annotate the innermost open span, if any."""
+    current = _current_span.get()
+    if current is not None:
+        current.set_attribute(key, value)
+
+
+def record_cache(cache: str, status: str) -> None:
+    """Record a cache lookup result ("hit" | "stale" | "miss") on the current span."""
+    set_attribute(f"cache.{cache}", status)
+
+
+def record_usage(usage: Optional[dict]) -> None:
+    """Copy LangChain `usage_metadata` token counts onto the current span."""
+    if not usage:
+        return
+    set_attribute("gen_ai.usage.input_tokens", usage.get("input_tokens", 0))
+    set_attribute("gen_ai.usage.output_tokens", usage.get("output_tokens", 0))
+    set_attribute("gen_ai.usage.total_tokens", usage.get("total_tokens", 0))
+    set_attribute("gen_ai.usage.cache_read_input_tokens", cached_input_tokens(usage))
+
+
+def cached_input_tokens(usage: Optional[dict]) -> int:
+    """Input tokens the provider served from its prompt cache (0 when not reported)."""
+    details = (usage or {}).get("input_token_details") or {}
+    return details.get("cache_read") or 0
+
+
+# -- OTLP/JSON export ---------------------------------------------------------------
+def _otlp_value(value: Any) -> dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    if isinstance(value, (list, tuple)):
+        return {"arrayValue": {"values": [_otlp_value(item) for item in value]}}
+    return {"stringValue": str(value)}
+
+
+def _otlp_attributes(attributes: Dict[str, Any]) -> list:
+    return [{"key": key, "value": _otlp_value(value)} for key, value in attributes.items()]
+
+
+def to_otlp(trace: Trace, service_name: str) -> dict:
+    """Render a finished trace as an OTLP/JSON `ExportTraceServiceRequest`."""
+    spans = []
+    for item in trace.spans:
+        otlp_span = {
+            "traceId": item.trace_id,
+            "spanId": item.span_id,
+            "name": item.name,
+            "kind": 2 if item is trace.root else 1,  # SERVER for the request, INTERNAL otherwise
+            "startTimeUnixNano": str(item.start_ns),
+            "endTimeUnixNano": str(item.end_ns or item.start_ns),
+            "attributes": _otlp_attributes(item.attributes),
+            "status": {"code": item.status, **({"message": item.status_message} if item.status_message else {})},
+        }
+        if item.parent_id:
+            otlp_span["parentSpanId"] = item.parent_id
+        spans.append(otlp_span)
+    return {
+        "resourceSpans": [{
+            "resource": {"attributes": _otlp_attributes({"service.name": service_name})},
+            "scopeSpans": [{"scope": {"name": "travel_planner"}, "spans": spans}],
+        }]
+    }
+
+
+class TraceExporter:
+    """Write finished traces to a JSON-lines file or an OTLP/HTTP collector, off the request path."""
+
+    def __init__(self, exporter: str = "file", path: str = ".cache/traces.jsonl",
+                 endpoint: str = "http://localhost:4318", service_name: str = "travel-planner",
+                 max_bytes: int = 50 * 1024 * 1024, backup_count: int = 3):
+        self.exporter = exporter
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.endpoint = endpoint.rstrip("/")
+        self.service_name = service_name
+        self._file_lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="trace-export")
+
+    def _rotate_if_full(self, incoming: int) -> None:
+        """Shift `path` to `path.1` (… `path.<backup_count>`) when `incoming` bytes would exceed `max_bytes`."""
+        if not self.max_bytes:
+            return
+        try:
+            if os.path.getsize(self.path) + incoming <= self.max_bytes:
+                return
+        except OSError:
+            return  # nothing written yet
+        for index in range(self.backup_count - 1, 0, -1):
+            if os.path.exists(f"{self.path}.{index}"):
+                os.replace(f"{self.path}.{index}", f"{self.path}.{index + 1}")
+        if self.backup_count:
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+
+    def export(self, trace: Trace) -> None:
+        if self.exporter == "none":
+            return
+        self._executor.submit(self._export, trace)
+
+    def _export(self, trace: Trace) -> None:
+        try:
+            payload = to_otlp(trace, self.service_name)
+            if self.exporter == "otlp":
+                # Imported lazily: http_client itself records spans through this module
+                from utils.http_client import get_session
+
+                get_session().post(f"{self.endpoint}/v1/traces", json=payload, timeout=5)
+            else:
+                directory = os.path.dirname(self.path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                line = json.dumps(payload, separators=(",", ":"), default=str) + "\n"
+                with self._file_lock:
+                    self._rotate_if_full(len(line.encode("utf-8")))
+                    with open(self.path, "a", encoding="utf-8") as file:
+                        file.write(line)
+        except Exception:
+            logger.exception("Failed to export trace %s", trace.trace_id)
+
+
+TRACING_ENABLED: bool = _TRACING_CONFIG.get("enabled", True)
+
+exporter = TraceExporter(
+    exporter=_TRACING_CONFIG.get("exporter", "file"),
+    path=_TRACING_CONFIG.get("path", ".cache/traces.jsonl"),
+    endpoint=_TRACING_CONFIG.get("endpoint", "http://localhost:4318"),
+    service_name=_TRACING_CONFIG.get("service_name", "travel-planner"),
+    max_bytes=_TRACING_CONFIG.get("max_bytes", 50 * 1024 * 1024),
+    backup_count=_TRACING_CONFIG.get("backup_count", 3),
+)
+
+
+@contextmanager
+def start_trace(name: str, **attributes) -> Iterator[Optional[Trace]]:
+    """Open a trace for one request; it is exported when the block exits.
+
+    Yields None when tracing is disabled, so callers can skip the summary.
+    """
+    if not TRACING_ENABLED:
+        yield None
+        return
+    trace = Trace(name, attributes)
+    trace_token = _current_trace.set(trace)
+    span_token = _current_span.set(trace.root)
+    try:
+        yield trace
+    except BaseException as e:
+        trace.root.record_error(e)
+        raise
+    finally:
+        trace.root.end_ns = time.time_ns()
+        _reset(_current_span, span_token)
+        _reset(_current_trace, trace_token)
+        exporter.export(trace)
@@ -10,8 +10,37 @@ Usage
 ```
 weather = WeatherForecastTool(os.getenv("OPENWEATHERMAP_API_KEY"))
 weather.get_current_weather("Paris")
+weather.get_daily_forecast("Paris")           # per-day summary of the 5-day forecast
+await weather.aget_current_weather("Paris")   # non-blocking variant
 ```
 
+Caching
+-------
+Popular destinations are looked up on nearly every request, so responses are
+kept in process-wide TTL caches (`weather.current_ttl_seconds` /
+`weather.forecast_ttl_seconds` in `config/config.yaml`):
+• **Location normalisation** – queries are lower-cased and whitespace-trimmed
+  ("Paris , FR" → "paris,fr").  Once OpenWeatherMap resolves a query, the alias
+  is mapped to the city `id` it returned (its coordinates if there is no id),
+  so "Paris", "paris" and "Paris, FR" all share one cache entry while two
+  places with the same name and country (Springfield, IL / Springfield, MO)
+  never do.
+• **Request coalescing** – concurrent identical lookups, from any instance,
+  wait on a single in-flight request (`SingleFlight` / `AsyncSingleFlight`).
+• **Forecast → current** – if a cached forecast has a slot within
+  `weather.current_from_forecast_window_seconds` of now, "current" lookups are
+  answered from it without another request.
+
+Daily summaries
+---------------
+The forecast endpoint returns up to 40 three-hour slots (five days); the full
+horizon is always fetched.  `summarize_forecast` reduces them with *Pandas* to
+one row per local calendar day (the city's UTC offset is applied): min / max /
+mean temperature, the highest precipitation probability of the day and the
+most frequent condition.  `get_daily_forecast` caches the summary per
+resolved city for `weather.forecast_ttl_seconds`, so repeat lookups skip both
+the request and the aggregation.
+
 Extending
 ---------
 OpenWeatherMap exposes many other endpoints (historical data, UV index, etc.).
@@ -19,37 +48,205 @@ Add a new helper method that builds the URL + parameters and returns the JSON
 payload.  Keep the method stateless and handle exceptions gracefully so the
 agent has a predictable error surface.
 """
-import requests
+import time
+from typing import List, Optional
+
+import pandas as pd
+
+from utils.cache import AsyncSingleFlight, SingleFlight, TTLCache, normalize_location
+from utils.config_loader import load_config
+from utils.http_client import aget, get
+from utils.tracing import record_cache
+
+_WEATHER_CONFIG = load_config().get("weather", {})
+
+# Shared by all WeatherForecastTool instances, keyed by resolved location (`_location_id`)
+_current_cache = TTLCache(ttl_seconds=_WEATHER_CONFIG.get("current_ttl_seconds", 600), maxsize=1024)
+_forecast_cache = TTLCache(ttl_seconds=_WEATHER_CONFIG.get("forecast_ttl_seconds", 3600), maxsize=1024)
+_daily_cache = TTLCache(ttl_seconds=_WEATHER_CONFIG.get("forecast_ttl_seconds", 3600), maxsize=1024)
+# Normalised query -> location id of the place OpenWeatherMap resolved it to
+_location_aliases = TTLCache(ttl_seconds=24 * 3600, maxsize=4096)
+# In-flight requests, shared like the caches so every instance coalesces with every other
+_flights = SingleFlight()
+_async_flights = AsyncSingleFlight()
+
+
+def summarize_forecast(forecast: dict) -> List[dict]:
+    """
+    Reduce OpenWeatherMap 3-hour forecast slots to one summary per local day.
+
+    Args:
+        forecast (dict): Payload of the `/forecast` endpoint
+
+    Returns:
+        list: `{date, min_c, max_c, mean_c, pop_pct, condition}` per day, in date order
+    """
+    slots = forecast.get("list") or []
+    if not slots:
+        return []
+    offset = forecast.get("city", {}).get("timezone") or 0
+    frame = pd.DataFrame({
+        "dt": [slot.get("dt", 0) for slot in slots],
+        "temp": [slot.get("main", {}).get("temp") for slot in slots],
+        "pop": [slot.get("pop", 0) for slot in slots],
+        "condition": [(slot.get("weather") or [{}])[0].get("description") for slot in slots],
+    })
+    frame["date"] = pd.to_datetime(frame["dt"] + offset, unit="s").dt.strftime("%Y-%m-%d")
+    days = frame.groupby("date", sort=True).agg(
+        min_c=("temp", "min"), max_c=("temp", "max"), mean_c=("temp", "mean"), pop=("pop", "max"))
+    # Most frequent condition per day; ties go to the alphabetically first one
+    counts = frame.dropna(subset=["condition"]).groupby(["date", "condition"], sort=True).size()
+    counts = counts.reset_index(name="slots").sort_values(["date", "slots"], ascending=[True, False], kind="stable")
+    days["condition"] = counts.drop_duplicates("date").set_index("date")["condition"]
+    days[["min_c", "max_c", "mean_c"]] = days[["min_c", "max_c", "mean_c"]].round(1)
+    days["pop_pct"] = (days["pop"].fillna(0) * 100).round().astype(int)
+    days = days.drop(columns="pop").astype(object).where(days.notna(), None)
+    return [{"date": date, **row} for date, row in days.to_dict("index").items()]
+
 
 class WeatherForecastTool:
     def __init__(self, api_key:str):
         self.api_key = api_key
-        self.base_url = "https://api.openweathermap.org/data/2.5"
+        self.base_url = _WEATHER_CONFIG.get("base_url", "https://api.openweathermap.org/data/2.5")
+        self.current_from_forecast_window = _WEATHER_CONFIG.get("current_from_forecast_window_seconds", 5400)
+
+    def _params(self, place:str) -> dict:
+        return {
+            "q": place,
+            "appid": self.api_key,
+            "units": "metric"
+        }
+
+    @staticmethod
+    def _canonical(place:str) -> str:
+        key = normalize_location(place)
+        return _location_aliases.get(key, key)
+
+    @staticmethod
+    def _location_id(place_data:dict) -> Optional[str]:
+        """OpenWeatherMap's identity of a resolved place: its city id, else its coordinates."""
+        if place_data.get("id"):
+            return f"id:{place_data['id']}"
+        coord = place_data.get("coord") or {}
+        if coord.get("lat") is not None and coord.get("lon") is not None:
+            return f"coord:{round(coord['lat'], 2)},{round(coord['lon'], 2)}"
+        return None
+
+    @staticmethod
+    def _remember(place:str, location_id:Optional[str]) -> str:
+        """Map the query alias to the location OpenWeatherMap resolved."""
+        alias = normalize_location(place)
+        if not location_id:
+            return alias
+        _location_aliases.set(alias, location_id)
+        return location_id
+
+    def _store_current(self, place:str, data:dict) -> dict:
+        if data:
+            _current_cache.set(self._remember(place, self._location_id(data)), data)
+        return data
+
+    def _store_forecast(self, place:str, data:dict) -> dict:
+        if data:
+            _forecast_cache.set(self._remember(place, self._location_id(data.get("city", {}))), data)
+        return data
+
+    def _store_daily(self, place:str, forecast:dict) -> dict:
+        if not forecast or not forecast.get("list"):
+            return {}
+        city = forecast.get("city", {})
+        summary = {"city": city.get("name") or place, "country": city.get("country"),
+                   "days": summarize_forecast(forecast)}
+        _daily_cache.set(self._canonical(place), summary)
+        return summary
+
+    def _current_from_forecast(self, key:str) -> Optional[dict]:
+        """Answer a "current" lookup from the nearest cached forecast slot, if fresh enough."""
+        forecast = _forecast_cache.get(key)
+        if not forecast or not forecast.get("list"):
+            return None
+        now = time.time()
+        slot = min(forecast["list"], key=lambda item: abs(item.get("dt", 0) - now))
+        if abs(slot.get("dt", 0) - now) > self.current_from_forecast_window:
+            return None
+        city = forecast.get("city", {})
+        return {
+            "name": city.get("name"),
+            "sys": {"country": city.get("country")},
+            "dt": slot.get("dt"),
+            "main": slot.get("main", {}),
+            "weather": slot.get("weather", []),
+            "source": "forecast",
+        }
+
+    def _cached_current(self, place:str) -> Optional[dict]:
+        key = self._canonical(place)
+        cached = _current_cache.get(key) or self._current_from_forecast(key)
+        record_cache("weather_current", "hit" if cached else "miss")
+        return cached
+
+    def _cached_forecast(self, place:str) -> Optional[dict]:
+        cached = _forecast_cache.get(self._canonical(place))
+        record_cache("weather_forecast", "hit" if cached else "miss")
+        return cached
+
+    def _cached_daily(self, place:str) -> Optional[dict]:
+        cached = _daily_cache.get(self._canonical(place))
+        record_cache("weather_daily", "hit" if cached else "miss")
+        return cached
 
     def get_current_weather(self, place:str):
         """Get current weather of a place"""
-        try:
-            url = f"{self.base_url}/weather"
-            params = {
-                "q": place,
-                "appid": self.api_key,
-            }
-            response = requests.get(url, params=params)
-            return response.json() if response.status_code == 200 else {}
-        except Exception as e:
-            raise e
-    
+        cached = self._cached_current(place)
+        if cached:
+            return cached
+
+        def fetch():
+            response = get(f"{self.base_url}/weather", params=self._params(place))
+            return self._store_current(place, response.json() if response.status_code == 200 else {})
+
+        return _flights.do(("current", self._canonical(place)), fetch)
+
     def get_forecast_weather(self, place:str):
         """Get weather forecast of a place"""
-        try:
-            url = f"{self.base_url}/forecast"
-            params = {
-                "q": place,
-                "appid": self.api_key,
-                "cnt": 10,
-                "units": "metric"
-            }
-            response = requests.get(url, params=params)
-            return response.json() if response.status_code == 200 else {}
-        except Exception as e:
-            raise e
\ No newline at end of file
+        cached = self._cached_forecast(place)
+        if cached:
+            return cached
+
+        def fetch():
+            response = get(f"{self.base_url}/forecast", params=self._params(place))
+            return self._store_forecast(place, response.json() if response.status_code == 200 else {})
+
+        return _flights.do(("forecast", self._canonical(place)), fetch)
+
+    def get_daily_forecast(self, place:str) -> dict:
+        """Get the per-day summary of the 5-day forecast of a place"""
+        return self._cached_daily(place) or self._store_daily(place, self.get_forecast_weather(place))
+
+    async def aget_current_weather(self, place:str):
+        """Async variant of `get_current_weather`"""
+        cached = self._cached_current(place)
+        if cached:
+            return cached
+
+        async def fetch():
+            response = await aget(f"{self.base_url}/weather", params=self._params(place))
+            return self._store_current(place, response.json() if response.status_code == 200 else {})
+
+        return await _async_flights.do(("current", self._canonical(place)), fetch)
+
+    async def aget_forecast_weather(self, place:str):
+        """Async variant of `get_forecast_weather`"""
+        cached = self._cached_forecast(place)
+        if cached:
+            return cached
+
+        async def fetch():
+            response = await aget(f"{self.base_url}/forecast", params=self._params(place))
+            return self._store_forecast(place, response.json() if response.status_code == 200 else {})
+
+        return await _async_flights.do(("forecast", self._canonical(place)), fetch)
+
+    async def aget_daily_forecast(self, place:str) -> dict:
+        """Async variant of `get_daily_forecast`"""
+        return self._cached_daily(place) or self._store_daily(place, await self.aget_forecast_weather(place))